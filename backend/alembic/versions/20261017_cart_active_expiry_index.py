@@ -0,0 +1,30 @@
+"""cart_active_expiry_index
+
+Revision ID: 20261017_cart_expiry
+Revises: 20261017_image_variants
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_cart_expiry'
+down_revision = '20261017_image_variants'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The expiry sweep only ever looks at ACTIVE carts; checked-out and
+    # abandoned rows (almost all of the table) stay out of the index
+    op.create_index(
+        'idx_cart_active_expires', 'carts', ['expires_at'],
+        postgresql_where=sa.text("status = 'ACTIVE'")
+    )
+    op.drop_index('idx_cart_expires', table_name='carts')
+
+
+def downgrade():
+    op.create_index('idx_cart_expires', 'carts', ['expires_at', 'status'], unique=False)
+    op.drop_index('idx_cart_active_expires', table_name='carts')
@@ -0,0 +1,39 @@
+"""escrow_release_claims
+
+Revision ID: 20261017_escrow_release
+Revises: 20261017_cart_expiry
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_escrow_release'
+down_revision = '20261017_cart_expiry'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lease taken by the auto-release job so concurrent runs skip the row
+    op.add_column('escrow_transactions', sa.Column('release_claimed_until', sa.DateTime(), nullable=True))
+
+    # Payout reference, stored before the transfer is sent so a retry reuses it
+    op.add_column('escrow_transactions', sa.Column('transfer_reference', sa.String(length=255), nullable=True))
+    op.create_unique_constraint('uq_escrow_transfer_reference', 'escrow_transactions', ['transfer_reference'])
+
+    # Due escrows are always HELD; released/refunded history stays out of the index
+    op.create_index(
+        'idx_escrow_release_due', 'escrow_transactions', ['auto_release_date'],
+        postgresql_where=sa.text("status = 'HELD'")
+    )
+    op.drop_index('idx_escrow_auto_release', table_name='escrow_transactions')
+
+
+def downgrade():
+    op.create_index('idx_escrow_auto_release', 'escrow_transactions', ['auto_release_date', 'status'], unique=False)
+    op.drop_index('idx_escrow_release_due', table_name='escrow_transactions')
+    op.drop_constraint('uq_escrow_transfer_reference', 'escrow_transactions', type_='unique')
+    op.drop_column('escrow_transactions', 'transfer_reference')
+    op.drop_column('escrow_transactions', 'release_claimed_until')
@@ -0,0 +1,25 @@
+"""product_image_variants
+
+Revision ID: 20261017_image_variants
+Revises: 20261017_search_vector_db
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = '20261017_image_variants'
+down_revision = '20261017_search_vector_db'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Resized JPEG/WebP URLs per image, keyed by the image's primary URL
+    op.add_column('products', sa.Column('image_variants', JSONB(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('products', 'image_variants')
@@ -0,0 +1,48 @@
+"""product_keyset_pagination
+
+Revision ID: 20261017_product_keyset
+Revises: 20251226_add_pickup_confirmation
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_product_keyset'
+down_revision = '20251226_add_pickup_confirmation'
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = {
+    'idx_product_status_created_id': ['status', 'created_at', 'id'],
+    'idx_product_status_price_id': ['status', 'price_per_unit', 'id'],
+    'idx_product_status_name_id': ['status', 'product_name', 'id'],
+    'idx_product_status_quantity_id': ['status', 'quantity_available', 'id'],
+}
+
+
+def upgrade():
+    # Composite indexes so cursor pages seek on (status, sort column, id)
+    for name, columns in KEYSET_INDEXES.items():
+        op.create_index(name, 'products', columns, if_not_exists=True)
+
+    # Row-count estimate from the planner (used by count=estimated)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_estimate(query text)
+        RETURNS bigint AS $$
+        DECLARE
+            plan jsonb;
+        BEGIN
+            EXECUTE 'EXPLAIN (FORMAT JSON) ' || query INTO plan;
+            RETURN (plan -> 0 -> 'Plan' ->> 'Plan Rows')::bigint;
+        END;
+        $$ LANGUAGE plpgsql VOLATILE STRICT;
+    """)
+
+
+def downgrade():
+    op.execute("DROP FUNCTION IF EXISTS count_estimate(text)")
+    for name in KEYSET_INDEXES:
+        op.drop_index(name, table_name='products', if_exists=True)
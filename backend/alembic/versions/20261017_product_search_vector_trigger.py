@@ -0,0 +1,64 @@
+"""product_search_vector_trigger
+
+Revision ID: 20261017_search_vector_db
+Revises: 20261017_product_keyset
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261017_search_vector_db'
+down_revision = '20261017_product_keyset'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Weighted vector: name (A) > variety (B) > description (C) > category (D).
+    # IMMUTABLE so it can back an index or generated column later, and shared
+    # by the trigger and the batched backfill (backfill_search_vector.py).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION product_search_vector(
+            p_name text, p_variety text, p_description text, p_category productcategory
+        )
+        RETURNS tsvector AS $$
+            SELECT
+                setweight(to_tsvector('english'::regconfig, coalesce(p_name, '')), 'A') ||
+                setweight(to_tsvector('english'::regconfig, coalesce(p_variety, '')), 'B') ||
+                setweight(to_tsvector('english'::regconfig, coalesce(p_description, '')), 'C') ||
+                setweight(to_tsvector('english'::regconfig, coalesce(product_category_to_text(p_category), '')), 'D');
+        $$ LANGUAGE sql IMMUTABLE;
+    """)
+
+    # A trigger rather than GENERATED ALWAYS AS ... STORED: adding a stored
+    # generated column rewrites the whole table under an ACCESS EXCLUSIVE lock,
+    # whereas the trigger is a catalog-only change and existing rows are
+    # re-vectorized in small batches by the backfill command.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION products_search_vector_refresh()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := product_search_vector(
+                NEW.product_name, NEW.variety, NEW.description, NEW.category
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS trg_products_search_vector ON products")
+    op.execute("""
+        CREATE TRIGGER trg_products_search_vector
+        BEFORE INSERT OR UPDATE OF product_name, variety, description, category
+        ON products
+        FOR EACH ROW
+        EXECUTE FUNCTION products_search_vector_refresh();
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_products_search_vector ON products")
+    op.execute("DROP FUNCTION IF EXISTS products_search_vector_refresh()")
+    op.execute("DROP FUNCTION IF EXISTS product_search_vector(text, text, text, productcategory)")
@@ -0,0 +1,71 @@
+"""
+Redis cart backfill
+Copies ACTIVE, unexpired carts from Postgres into Redis so buyers keep the
+carts they had before live carts moved to Redis. Run once on deploy, before
+traffic reaches the new code; running it again is harmless because a buyer
+who already has a Redis cart keeps it.
+
+Carts are read newest first in id batches, so when a buyer has more than one
+ACTIVE row the most recent one wins.
+
+Usage:
+    python backfill_redis_carts.py [--batch-size 500]
+"""
+from datetime import datetime
+from sqlalchemy.orm import selectinload
+import argparse
+import logging
+
+from database import SessionLocal
+from models import Cart
+from modules.cart.store import cart_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_redis_carts(db, batch_size: int = 500) -> int:
+    """
+    Load active Postgres carts into Redis batch by batch
+
+    Args:
+        db: Database session
+        batch_size: Carts read per query
+
+    Returns:
+        Number of carts loaded into Redis
+    """
+    now = datetime.utcnow()
+    last_id = None
+    restored = 0
+
+    while True:
+        query = db.query(Cart).options(selectinload(Cart.items)).filter(
+            Cart.status == "ACTIVE",
+            Cart.expires_at > now
+        )
+        if last_id is not None:
+            query = query.filter(Cart.id < last_id)
+        carts = query.order_by(Cart.id.desc()).limit(batch_size).all()
+        if not carts:
+            break
+
+        restored += cart_store.restore(carts)
+        last_id = carts[-1].id
+        db.expunge_all()
+        logger.info(f"Loaded carts down to id {last_id} ({restored} restored)")
+
+    return restored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy active Postgres carts into Redis")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = backfill_redis_carts(db, batch_size=args.batch_size)
+        logger.info(f"✅ Redis cart backfill complete: {total} carts restored")
+    finally:
+        db.close()
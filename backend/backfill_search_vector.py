@@ -0,0 +1,72 @@
+"""
+Search vector backfill
+Re-vectorizes products.search_vector in primary-key batches so existing rows
+pick up the weighted vector maintained by trg_products_search_vector.
+
+Each batch is its own short transaction: only the rows in the batch are
+locked, and rows that are already up to date are skipped.
+
+Usage:
+    python backfill_search_vector.py [--batch-size 1000] [--pause 0.1]
+"""
+from sqlalchemy import text
+import argparse
+import logging
+import time
+
+from database import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SQL = text("""
+    UPDATE products
+    SET search_vector = product_search_vector(product_name, variety, description, category)
+    WHERE id > :last_id AND id <= :last_id + :batch_size
+      AND search_vector IS DISTINCT FROM
+          product_search_vector(product_name, variety, description, category)
+""")
+
+
+def backfill_search_vectors(db, batch_size: int = 1000, pause: float = 0.1) -> int:
+    """
+    Recompute stale search vectors batch by batch
+
+    Args:
+        db: Database session
+        batch_size: Width of each primary-key range
+        pause: Seconds to sleep between batches (lets autovacuum/replicas keep up)
+
+    Returns:
+        Number of rows updated
+    """
+    max_id = db.execute(text("SELECT coalesce(max(id), 0) FROM products")).scalar()
+    last_id = 0
+    updated = 0
+
+    while last_id < max_id:
+        result = db.execute(BACKFILL_BATCH_SQL, {"last_id": last_id, "batch_size": batch_size})
+        db.commit()
+
+        updated += result.rowcount
+        last_id += batch_size
+        logger.info(f"Re-vectorized ids up to {min(last_id, max_id)}/{max_id} ({updated} updated)")
+
+        if pause:
+            time.sleep(pause)
+
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill products.search_vector in batches")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.1)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = backfill_search_vectors(db, batch_size=args.batch_size, pause=args.pause)
+        logger.info(f"✅ Search vector backfill complete: {total} products updated")
+    finally:
+        db.close()
@@ -0,0 +1,85 @@
+"""
+Cold-start import benchmark
+Times `import main` (building main:app) in fresh interpreters, the way a
+Cloud Run instance pays for it on its first request, and lists the modules
+with the largest cumulative import time.
+
+Run it with the same STORAGE_TYPE/env as the deployment being measured;
+only the configured storage driver's SDK should show up in the top list.
+
+Usage:
+    python benchmark_import_time.py [--runs 10] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_import(module: str = "main") -> float:
+    """Seconds to import a module in a fresh interpreter"""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    return time.perf_counter() - started
+
+
+def slowest_imports(module: str = "main", top: int = 15):
+    """
+    Top-level packages by cumulative import time (from -X importtime)
+
+    Returns:
+        List of (package, cumulative microseconds), slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+
+    packages = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            continue  # Nested import, already counted in its parent
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(cumulative)
+
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main:app import time")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = [time_import() for _ in range(args.runs)]
+    print(f"STORAGE_TYPE={os.getenv('STORAGE_TYPE', 'local')}  runs={args.runs}")
+    print(
+        f"import main: median {statistics.median(timings) * 1000:.0f}ms  "
+        f"min {min(timings) * 1000:.0f}ms  max {max(timings) * 1000:.0f}ms"
+    )
+
+    print("\nSlowest top-level imports:")
+    for package, microseconds in slowest_imports(top=args.top):
+        print(f"  {package:<30} {microseconds / 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Order list serialization benchmark
+Times turning one page of orders into the GET /orders JSON body:
+
+- legacy: per-order dict built from ORM objects, validated into
+  OrderResponse/OrderListResponse, then dumped and re-validated the way
+  FastAPI handles a response_model before encoding
+- projected: rows shaped by build_order_dict and encoded once by
+  serialize_order_list
+
+No database is involved; rows are synthesized for buyer, farmer and admin
+pages (admins see mixed orders with escrow notes and more items).
+
+Usage:
+    python benchmark_order_list.py [--page-size 100] [--rounds 200]
+"""
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+import argparse
+import json
+import random
+import time
+
+from models import OrderStatus, PaymentStatus, DeliveryMethod
+from modules.orders.routes import serialize_order_list
+from modules.orders.schemas import OrderResponse, OrderListResponse
+from modules.orders.service import build_order_dict, ORDER_RESPONSE_FIELDS
+
+
+class FakeRow(SimpleNamespace):
+    """Stands in for a SQLAlchemy Row (attribute access plus _mapping)"""
+
+    @property
+    def _mapping(self):
+        return self.__dict__
+
+
+def make_order(order_id: int, item_count: int, with_notes: bool) -> dict:
+    created = datetime(2026, 10, 1) + timedelta(minutes=order_id)
+    items = [
+        {
+            "id": order_id * 10 + i,
+            "product_id": 100 + i,
+            "product_name_snapshot": f"Product {i}",
+            "unit_of_measure_snapshot": "KG",
+            "product_image": f"/uploads/products/{order_id:064x}.jpg",
+            "quantity": 5.0,
+            "unit_price": 12.5,
+            "subtotal": 62.5,
+        }
+        for i in range(item_count)
+    ]
+    return {
+        "id": order_id,
+        "order_number": f"ORD-20261001-{order_id:04d}",
+        "buyer_id": 7,
+        "seller_id": 9,
+        "product_id": None,
+        "quantity": Decimal("5.00"),
+        "unit_price": Decimal("12.50"),
+        "subtotal": Decimal("62.50"),
+        "delivery_fee": Decimal("20.00"),
+        "platform_fee": Decimal("3.13"),
+        "total_amount": Decimal("82.50"),
+        "status": random.choice(list(OrderStatus)),
+        "payment_status": PaymentStatus.PAID,
+        "delivery_method": DeliveryMethod.DELIVERY,
+        "delivery_address": "123 Main Street, Near the Market",
+        "delivery_region": "Greater Accra",
+        "delivery_district": "Accra Metro",
+        "delivery_gps_address": "AK-039-5832",
+        "delivery_phone": "+233545142039",
+        "tracking_number": "VIP123456",
+        "carrier": "VIP Transport",
+        "shipped_at": created + timedelta(days=1),
+        "delivered_at": None,
+        "estimated_delivery_date": date(2026, 10, 5),
+        "buyer_notes": "Please deliver between 9am-5pm",
+        "seller_notes": None,
+        "pickup_confirmed_by_farmer": False,
+        "pickup_confirmed_by_buyer": False,
+        "pickup_confirmed_at": None,
+        "created_at": created,
+        "updated_at": created,
+        "admin_notes": "Checked by support" if with_notes else None,
+        "buyer_full_name": "Ama Mensah",
+        "buyer_phone_number": "+233545142039",
+        "buyer_email": "ama@example.com",
+        "seller_full_name": "Kofi Boateng",
+        "seller_phone_number": "+233201234567",
+        "items": items,
+    }
+
+
+def legacy_page(orders: list) -> bytes:
+    """Previous path: ORM-shaped objects -> dict -> OrderResponse -> response_model round trip"""
+    responses = []
+    for data in orders:
+        o = SimpleNamespace(**data)
+        order_dict = {
+            field: getattr(o, field) for field in ORDER_RESPONSE_FIELDS
+        }
+        for field in ("quantity", "unit_price", "subtotal", "delivery_fee", "platform_fee", "total_amount"):
+            order_dict[field] = float(order_dict[field]) if order_dict[field] else 0
+        for field in ("status", "payment_status", "delivery_method"):
+            value = order_dict[field]
+            order_dict[field] = value.value if hasattr(value, "value") else str(value)
+        order_dict["delivery_town_city"] = o.delivery_district
+        order_dict["admin_notes"] = o.admin_notes
+        order_dict["buyer_name"] = o.buyer_full_name
+        order_dict["buyer_phone"] = o.buyer_phone_number
+        order_dict["buyer"] = {"id": o.buyer_id, "full_name": o.buyer_full_name,
+                               "phone_number": o.buyer_phone_number, "email": o.buyer_email}
+        order_dict["seller_name"] = o.seller_full_name
+        order_dict["seller_phone"] = o.seller_phone_number
+        if o.items:
+            order_dict["items"] = [
+                {**item, "product_image_snapshot": item["product_image"]} for item in o.items
+            ]
+            order_dict["product_name"] = o.items[0]["product_name_snapshot"]
+            order_dict["product_image"] = o.items[0]["product_image"]
+        responses.append(OrderResponse(**order_dict))
+
+    payload = OrderListResponse(total=1000, page=1, page_size=len(orders), total_pages=10, orders=responses)
+    # FastAPI response_model handling: dump, validate again, encode
+    revalidated = OrderListResponse.model_validate(payload.model_dump())
+    return json.dumps(revalidated.model_dump(mode="json")).encode()
+
+
+def projected_page(orders: list) -> bytes:
+    """New path: build_order_dict on projected rows, encoded once"""
+    page = []
+    for data in orders:
+        row = FakeRow(**{**data, "items": [dict(item) for item in data["items"]]})
+        order = build_order_dict(row, row.items)
+        order["admin_notes"] = row.admin_notes
+        order["buyer_name"] = row.buyer_full_name
+        order["buyer_phone"] = row.buyer_phone_number
+        order["buyer"] = {"id": row.buyer_id, "full_name": row.buyer_full_name,
+                          "phone_number": row.buyer_phone_number, "email": row.buyer_email}
+        order["seller_name"] = row.seller_full_name
+        order["seller_phone"] = row.seller_phone_number
+        page.append(order)
+    return serialize_order_list(page, total=1000, page=1, page_size=len(orders), total_pages=10).body
+
+
+def run(label: str, fn, orders: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(orders)
+    per_page = (time.perf_counter() - started) / rounds * 1000
+    print(f"  {label:<10} {per_page:>8.2f}ms/page")
+    return per_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GET /orders serialization")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    random.seed(1)
+
+    pages = {
+        "buyer": [make_order(i, item_count=2, with_notes=False) for i in range(args.page_size)],
+        "farmer": [make_order(i, item_count=1, with_notes=False) for i in range(args.page_size)],
+        "admin": [make_order(i, item_count=random.randint(0, 5), with_notes=i % 3 == 0) for i in range(args.page_size)],
+    }
+
+    for role, orders in pages.items():
+        legacy = json.loads(legacy_page(orders))
+        projected = json.loads(projected_page(orders))
+        print(f"\n{role} page ({args.page_size} orders), identical output: {legacy == projected}")
+        before = run("legacy", legacy_page, orders, args.rounds)
+        after = run("projected", projected_page, orders, args.rounds)
+        print(f"  speedup    {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
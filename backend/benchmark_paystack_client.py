@@ -0,0 +1,162 @@
+"""
+Paystack client benchmark
+Runs PaystackClient against a local stub of the Paystack API and compares the
+shared connection pool with the previous pattern of opening a fresh
+httpx.AsyncClient for every call.
+
+The stub is a small keep-alive HTTP/1.1 server on 127.0.0.1 that answers
+transaction/verify and transfer like Paystack does, optionally after a delay
+and with a 503 on every Nth verify to exercise retries. Against the real API
+each fresh client also pays a TLS handshake, so the gap there is larger.
+
+Usage:
+    python benchmark_paystack_client.py [--calls 500] [--concurrency 20] [--latency-ms 5] [--fail-every 0]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from integrations.paystack import PaystackClient
+
+
+class StubPaystack:
+    """Minimal Paystack stand-in over raw asyncio streams"""
+
+    def __init__(self, latency_ms: float, fail_every: int):
+        self.latency = latency_ms / 1000
+        self.fail_every = fail_every
+        self.connections = 0
+        self.requests = 0
+        self.verify_calls = 0
+
+    def respond(self, method: str, path: str):
+        if path.startswith("/transaction/verify/"):
+            self.verify_calls += 1
+            if self.fail_every and self.verify_calls % self.fail_every == 0:
+                return 503, {"status": False, "message": "Service unavailable"}
+            reference = path.rsplit("/", 1)[-1]
+            return 200, {"status": True, "data": {
+                "status": "success", "amount": 15000, "reference": reference,
+                "paid_at": "2026-10-17T12:00:00.000Z", "channel": "mobile_money",
+                "customer": {"email": "buyer@example.com"}, "metadata": {}
+            }}
+        if method == "POST" and path == "/transfer":
+            return 200, {"status": True, "data": {
+                "transfer_code": "TRF_stub", "reference": "stub", "status": "pending"
+            }}
+        return 404, {"status": False, "message": "Not found"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                length = 0
+                keep_alive = True
+                while True:
+                    line = (await reader.readline()).decode().strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                    elif name.lower() == "connection" and value.strip().lower() == "close":
+                        keep_alive = False
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, body = self.respond(method, path)
+                payload = json.dumps(body).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def fresh_client_verify(base_url: str, reference: str):
+    """The old pattern: a new client (and connection) per call"""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(f"{base_url}/transaction/verify/{reference}")
+        response.raise_for_status()
+        return response.json()
+
+
+async def run_case(name: str, call, calls: int, concurrency: int, stub: StubPaystack):
+    """Issue calls with bounded concurrency and print throughput and latency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await call(f"ref-{i}")
+                if isinstance(result, dict) and result.get("success") is False:
+                    failures += 1
+            except httpx.HTTPError:
+                failures += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    stub.connections = stub.requests = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"  {name:<28} {calls / elapsed:>8.0f} calls/s  "
+        f"p50 {statistics.median(latencies):6.1f}ms  p95 {latencies[int(len(latencies) * 0.95) - 1]:6.1f}ms  "
+        f"connections {stub.connections:>4}  requests {stub.requests:>5}  failed {failures}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Paystack client against a local stub")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Stub response delay")
+    parser.add_argument("--fail-every", type=int, default=0, help="503 on every Nth verify (0 = never)")
+    args = parser.parse_args()
+
+    stub = StubPaystack(args.latency_ms, args.fail_every)
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    pooled = PaystackClient()
+    pooled.BASE_URL = base_url
+    await pooled.start()
+
+    print(f"Stub Paystack on {base_url}: {args.calls} verify calls, concurrency {args.concurrency}")
+    try:
+        await run_case("fresh client per call", lambda ref: fresh_client_verify(base_url, ref),
+                       args.calls, args.concurrency, stub)
+        await run_case("shared pool (PaystackClient)", pooled.verify_transaction,
+                       args.calls, args.concurrency, stub)
+    finally:
+        await pooled.close()
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
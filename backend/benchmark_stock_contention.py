@@ -0,0 +1,115 @@
+"""
+Stock contention benchmark
+Many simultaneous buyers take stock from one listing, comparing:
+
+- read-check-write: load the product, compare quantity_available in Python,
+  subtract and commit (the previous checkout path)
+- conditional: ProductService.reserve_stock, a single
+  UPDATE ... WHERE quantity_available >= :qty RETURNING
+
+Reports throughput and whether more was sold than the listing held.
+Runs against DATABASE_URL on an existing product whose stock/status are
+overwritten for the run and restored afterwards; use a scratch listing.
+
+Usage:
+    python benchmark_stock_contention.py --product-id 1 [--buyers 50] [--stock 100] [--quantity 1]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import argparse
+import threading
+import time
+
+from database import SessionLocal
+from models import Product, ProductStatus
+from modules.products.service import ProductService, StockUnavailableError
+
+
+def read_check_write(product_id: int, quantity: Decimal) -> bool:
+    db = SessionLocal()
+    try:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if product.status != ProductStatus.AVAILABLE or product.quantity_available < quantity:
+            return False
+        product.quantity_available -= quantity
+        if product.quantity_available <= 0:
+            product.status = ProductStatus.OUT_OF_STOCK
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def conditional(product_id: int, quantity: Decimal) -> bool:
+    db = SessionLocal()
+    try:
+        ProductService.reserve_stock(db, {product_id: quantity})
+        db.commit()
+        return True
+    except StockUnavailableError:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def set_stock(product_id: int, quantity: Decimal, status: ProductStatus):
+    db = SessionLocal()
+    try:
+        db.query(Product).filter(Product.id == product_id).update(
+            {"quantity_available": quantity, "status": status}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def get_stock(product_id: int):
+    db = SessionLocal()
+    try:
+        return db.query(Product.quantity_available, Product.status).filter(Product.id == product_id).one()
+    finally:
+        db.close()
+
+
+def run(label: str, strategy, args) -> None:
+    set_stock(args.product_id, Decimal(args.stock), ProductStatus.AVAILABLE)
+    quantity = Decimal(args.quantity)
+    attempts = args.buyers * args.rounds
+    start_gate = threading.Barrier(args.buyers)
+
+    def buyer(_):
+        start_gate.wait()  # Release every buyer at once
+        return sum(strategy(args.product_id, quantity) for _ in range(args.rounds))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.buyers) as pool:
+        sold = sum(pool.map(buyer, range(args.buyers)))
+    elapsed = time.perf_counter() - started
+
+    remaining, status = get_stock(args.product_id)
+    oversold = sold * quantity - Decimal(args.stock)
+    print(f"\n{label}")
+    print(f"  attempts {attempts}  succeeded {sold}  {attempts / elapsed:.0f} attempts/s")
+    print(f"  stock left {remaining} ({status.value})  sold beyond stock: {max(oversold, 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent stock reservation")
+    parser.add_argument("--product-id", type=int, required=True)
+    parser.add_argument("--buyers", type=int, default=50, help="Concurrent buyers (keep <= DB pool size + overflow)")
+    parser.add_argument("--rounds", type=int, default=4, help="Checkouts per buyer")
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--quantity", type=int, default=1)
+    args = parser.parse_args()
+
+    original_quantity, original_status = get_stock(args.product_id)
+    try:
+        run("read-check-write", read_check_write, args)
+        run("conditional UPDATE", conditional, args)
+    finally:
+        set_stock(args.product_id, original_quantity, original_status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Local upload serving benchmark
+Compares the /uploads server (LocalUploadFiles) with a plain StaticFiles
+mount over the same temporary files: full downloads, a seek-style range
+request and a cache revalidation (If-None-Match).
+
+Requests go through httpx's in-process ASGI transport, so this measures the
+serving code itself; behind uvicorn the gap on full downloads is larger when
+the server offers zero-copy sendfile.
+
+Usage:
+    python benchmark_uploads.py [--size-mb 5] [--requests 200]
+"""
+from fastapi.staticfiles import StaticFiles
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from modules.storage.local_files import LocalUploadFiles
+
+
+async def run_case(app, path: str, headers: dict, requests: int):
+    """
+    Issue the same request repeatedly
+
+    Returns:
+        Tuple of (requests per second, status code, response headers)
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(path, headers=headers)
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path, headers=headers)
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, response.status_code, response.headers
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark local upload serving")
+    parser.add_argument("--size-mb", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "voice"))
+        with open(os.path.join(directory, "voice", "note.webm"), "wb") as f:
+            f.write(os.urandom(args.size_mb * 1024 * 1024))
+
+        servers = {
+            "StaticFiles": StaticFiles(directory=directory),
+            "LocalUploadFiles": LocalUploadFiles(directory=directory, max_age=31536000),
+        }
+
+        for name, app in servers.items():
+            _, _, headers = await run_case(app, "/voice/note.webm", {}, 1)
+            etag = headers.get("etag", '"none"')
+            cases = {
+                f"full GET ({args.size_mb}MB)": {},
+                "range GET (64KB seek)": {"Range": "bytes=1048576-1114111"},
+                "revalidate (If-None-Match)": {"If-None-Match": etag},
+            }
+
+            print(f"\n{name}")
+            print(f"  cache-control: {headers.get('cache-control')}  etag: {etag}")
+            for label, request_headers in cases.items():
+                rate, status, _ = await run_case(app, "/voice/note.webm", request_headers, args.requests)
+                print(f"  {label:<30} {status}  {rate:>8.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -27,6 +27,20 @@ class Settings(BaseSettings):
     PAYSTACK_SECRET_KEY: Optional[str] = None
     PAYSTACK_PUBLIC_KEY: Optional[str] = None
     PAYSTACK_CALLBACK_URL: Optional[str] = None  # Will be set dynamically based on environment
+    PAYSTACK_TIMEOUT_SECONDS: float = 30.0
+    PAYSTACK_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    PAYSTACK_MAX_CONNECTIONS: int = 20
+    PAYSTACK_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PAYSTACK_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    PAYSTACK_MAX_RETRIES: int = 2
+    PAYSTACK_RETRY_BASE_SECONDS: float = 0.25
+    PAYSTACK_RETRY_MAX_SECONDS: float = 2.0
+    PAYSTACK_EVENTS_WORKER_ENABLED: bool = True
+    PAYSTACK_EVENTS_BATCH_SIZE: int = 10
+    PAYSTACK_EVENTS_BLOCK_MS: int = 2000  # Below the Redis socket timeout
+    PAYSTACK_EVENTS_CLAIM_IDLE_SECONDS: int = 60
+    PAYSTACK_EVENTS_MAX_DELIVERIES: int = 5
+    PAYSTACK_EVENTS_STREAM_MAXLEN: int = 100000
     MNOTIFY_API_KEY: Optional[str] = None
     MNOTIFY_GATEWAY_URL: str = "https://api.mnotify.com/api/sms/quick"
     MNOTIFY_DEFAULT_SENDER: str = "SmartAgro"
@@ -38,6 +52,7 @@ class Settings(BaseSettings):
     
     # Local storage
     LOCAL_STORAGE_PATH: str = "./uploads"  # Relative to backend folder
+    LOCAL_UPLOADS_MAX_AGE_SECONDS: int = 31536000  # Upload names are UUIDs/hashes, never rewritten
     
     # DO Spaces
     SPACES_ACCESS_KEY: Optional[str] = None
@@ -74,9 +89,33 @@ class Settings(BaseSettings):
     RATE_LIMIT_PER_MINUTE: int = 100
     AUTH_RATE_LIMIT_PER_MINUTE: int = 30
     
+    # Response Cache (public catalog endpoints)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    FACETS_CACHE_TTL_SECONDS: int = 30
+
+    # Seller card cache (per process, product detail seller block)
+    SELLER_CARD_CACHE_SIZE: int = 1024
+    SELLER_CARD_CACHE_TTL_SECONDS: int = 300
+
+    # Product view counters (buffered in Redis, flushed to Postgres)
+    VIEW_COUNT_FLUSH_SECONDS: int = 60
+    VIEW_COUNT_FLUSH_BATCH_SIZE: int = 500
+
+    # Shopping carts (held in Redis, snapshotted to Postgres)
+    CART_EXPIRY_HOURS: int = 8  # Redis TTL and carts.expires_at, refreshed on every change
+    CART_SNAPSHOT_SECONDS: int = 60
+    CART_SNAPSHOT_BATCH_SIZE: int = 200
+    CART_EXPIRY_SWEEP_SECONDS: int = 60
+    CART_EXPIRY_BATCH_SIZE: int = 500
+
     # Escrow
     PLATFORM_FEE_PERCENTAGE: float = 5.0
     AUTO_RELEASE_DAYS: int = 7
+    ESCROW_RELEASE_BATCH_SIZE: int = 100  # Escrows claimed per batch
+    ESCROW_RELEASE_CONCURRENCY: int = 10  # Releases (or Paystack calls) in flight
+    ESCROW_RELEASE_LEASE_MINUTES: int = 30  # Failed releases are retried after this
+    ESCROW_RELEASE_BULK_TRANSFERS: bool = False  # Needs transfer OTP disabled on Paystack
     DISPUTE_DEADLINE_DAYS: int = 3
     
     # OTP
@@ -88,6 +127,14 @@ class Settings(BaseSettings):
     MAX_IMAGE_SIZE_MB: int = 5
     MAX_VOICE_NOTE_SIZE_MB: int = 10
     MAX_DOCUMENT_SIZE_MB: int = 20
+    DIRECT_UPLOAD_EXPIRY_SECONDS: int = 900  # Presigned upload URL lifetime
+    IMAGE_PROCESS_WORKERS: int = 2  # Process pool size for resizing/encoding
+    IMAGE_PROCESS_MAX_PENDING: int = 8  # Images decoding or queued at once
+
+    # Product spreadsheet import
+    PRODUCT_IMPORT_BATCH_SIZE: int = 100
+    PRODUCT_IMPORT_MAX_ERRORS: int = 500  # Row errors kept per job
+    PRODUCT_IMPORT_JOB_TTL_HOURS: int = 24
     
     # AI Agent
     AGENT_MODEL: str = "google/gemini-2.5-flash-preview-09-2025"
@@ -145,6 +192,19 @@ def get_database_url() -> str:
     return url
 
 
+def get_async_database_url() -> str:
+    """Get database URL for the asyncpg driver"""
+    url = get_database_url()
+    if not url:
+        return ""
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif url.startswith("postgresql+psycopg2://"):
+        url = url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    # asyncpg takes ssl=<mode> instead of libpq's sslmode=<mode>
+    return url.replace("sslmode=", "ssl=")
+
+
 def is_production() -> bool:
     """Check if running in production"""
     return settings.ENVIRONMENT == "production"
@@ -3,10 +3,11 @@ Database connection management
 """
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from pymongo import MongoClient
 import redis
-from config import settings, get_database_url
-from typing import Generator
+from config import settings, get_database_url, get_async_database_url
+from typing import Generator, AsyncGenerator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,44 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# ==================== POSTGRESQL (ASYNC) ====================
+# asyncpg-backed engine for `async def` routes. Services keep their Session-based
+# code and are invoked through AsyncSession.run_sync(), which drives the same ORM
+# calls on the asyncpg connection without parking the event loop on the socket.
+
+ASYNC_DATABASE_URL = get_async_database_url()
+
+if ASYNC_DATABASE_URL:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_timeout=10,
+        echo=settings.DEBUG,
+        connect_args={
+            "timeout": 25,  # asyncpg connect timeout in seconds
+        }
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False  # Attributes stay readable after commit without a lazy reload
+    )
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency for async PostgreSQL session"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database not initialized")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # ==================== MONGODB ====================
 
 mongo_client = None
@@ -143,6 +182,12 @@ def init_databases():
             logger.warning(f"⚠️ Redis health check failed: {e}")
 
 
+async def close_async_databases():
+    """Dispose the async PostgreSQL pool"""
+    if async_engine:
+        await async_engine.dispose()
+
+
 def close_databases():
     """Close all database connections"""
     if mongo_client:
@@ -2,24 +2,39 @@
 Paystack Payment Integration
 Client for Paystack payment processing, transfers, and refunds
 """
+import asyncio
+import importlib.util
+import random
+import time
 import httpx
 import hmac
 import hashlib
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from config import settings, get_paystack_callback_url
+from utils.latency_histogram import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
+# Per-endpoint call latency, read by GET /admin/metrics/paystack
+paystack_latency = LatencyHistogram("paystack_latency")
+
+# Errors where the request never reached Paystack, so any call may be resent
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
 
 class PaystackClient:
     """Client for Paystack payment API"""
 
     BASE_URL = "https://api.paystack.co"
 
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.secret_key = settings.PAYSTACK_SECRET_KEY
         self.public_key = settings.PAYSTACK_PUBLIC_KEY
+        self._transport = transport  # Tests pass an httpx.MockTransport
+        # One pool per event loop: the app's, plus any a scheduler job runs
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
 
     def _get_headers(self) -> Dict[str, str]:
         """Get authorization headers for Paystack API"""
@@ -28,6 +43,95 @@ class PaystackClient:
             "Content-Type": "application/json"
         }
 
+    def _new_client(self) -> httpx.AsyncClient:
+        """Pooled client; HTTP/2 when the h2 package is installed"""
+        return httpx.AsyncClient(
+            base_url=self.BASE_URL,
+            headers=self._get_headers(),
+            http2=importlib.util.find_spec("h2") is not None,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=settings.PAYSTACK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAYSTACK_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.PAYSTACK_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(
+                settings.PAYSTACK_TIMEOUT_SECONDS,
+                connect=settings.PAYSTACK_CONNECT_TIMEOUT_SECONDS
+            )
+        )
+
+    async def start(self) -> httpx.AsyncClient:
+        """Open the connection pool for the running event loop (called from the app lifespan)"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = self._new_client()
+        return client
+
+    async def close(self) -> None:
+        """Close the running event loop's connection pool"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        idempotent: bool = False,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Send one API call on the shared pool and return the decoded body
+
+        Calls that never reached Paystack are always retried. Idempotent
+        calls are also retried on timeouts, 429 and 5xx responses. Retries
+        wait with full jitter.
+
+        Args:
+            method: HTTP method
+            endpoint: Label for the latency histogram (path without IDs)
+            path: Request path
+            json: JSON body
+            idempotent: Whether the call may be resent after reaching Paystack
+            timeout: Read timeout for this call (seconds)
+
+        Raises:
+            httpx.HTTPError: When the call still fails after retries
+        """
+        client = await self.start()
+        request_timeout = httpx.Timeout(
+            timeout or settings.PAYSTACK_TIMEOUT_SECONDS,
+            connect=settings.PAYSTACK_CONNECT_TIMEOUT_SECONDS
+        )
+        attempts = settings.PAYSTACK_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=json, timeout=request_timeout)
+            except httpx.TransportError as e:
+                paystack_latency.observe(endpoint, time.perf_counter() - started, error=True)
+                retryable = isinstance(e, UNSENT_ERRORS) or (idempotent and isinstance(e, httpx.TimeoutException))
+                if not retryable or attempt == attempts - 1:
+                    raise
+                logger.warning(f"Paystack {endpoint} attempt {attempt + 1} failed ({e!r}), retrying")
+            else:
+                paystack_latency.observe(
+                    endpoint, time.perf_counter() - started, error=response.status_code >= 400
+                )
+                if not (idempotent and response.status_code in RETRYABLE_STATUS) or attempt == attempts - 1:
+                    response.raise_for_status()
+                    return response.json()
+                logger.warning(f"Paystack {endpoint} returned {response.status_code}, retrying")
+
+            # Full jitter: uniform over an exponentially growing window
+            backoff = min(settings.PAYSTACK_RETRY_MAX_SECONDS, settings.PAYSTACK_RETRY_BASE_SECONDS * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, backoff))
+
     async def initialize_transaction(
         self,
         email: str,
@@ -62,30 +166,27 @@ class PaystackClient:
                 "metadata": metadata or {}
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/transaction/initialize",
-                    json=payload,
-                    headers=self._get_headers()
-                )
-
-                response.raise_for_status()
-                result = response.json()
+            # Not resent once delivered: a second initialize with the same
+            # reference is rejected as a duplicate
+            result = await self._request(
+                "POST", "transaction/initialize", "/transaction/initialize",
+                json=payload, timeout=15.0
+            )
 
-                if result.get("status"):
-                    logger.info(f"Payment initialized: {reference}")
-                    return {
-                        "success": True,
-                        "authorization_url": result["data"]["authorization_url"],
-                        "access_code": result["data"]["access_code"],
-                        "reference": result["data"]["reference"]
-                    }
-                else:
-                    logger.error(f"Payment initialization failed: {result.get('message')}")
-                    return {
-                        "success": False,
-                        "error": result.get("message", "Failed to initialize payment")
-                    }
+            if result.get("status"):
+                logger.info(f"Payment initialized: {reference}")
+                return {
+                    "success": True,
+                    "authorization_url": result["data"]["authorization_url"],
+                    "access_code": result["data"]["access_code"],
+                    "reference": result["data"]["reference"]
+                }
+            else:
+                logger.error(f"Payment initialization failed: {result.get('message')}")
+                return {
+                    "success": False,
+                    "error": result.get("message", "Failed to initialize payment")
+                }
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error initializing payment: {e}")
@@ -111,32 +212,28 @@ class PaystackClient:
             Dict with transaction details
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/transaction/verify/{reference}",
-                    headers=self._get_headers()
-                )
+            result = await self._request(
+                "GET", "transaction/verify", f"/transaction/verify/{reference}",
+                idempotent=True, timeout=10.0
+            )
 
-                response.raise_for_status()
-                result = response.json()
-
-                if result.get("status"):
-                    data = result["data"]
-                    return {
-                        "success": True,
-                        "status": data["status"],
-                        "amount": data["amount"] / 100,  # Convert from kobo to GHS
-                        "reference": data["reference"],
-                        "paid_at": data.get("paid_at"),
-                        "channel": data.get("channel"),
-                        "customer": data.get("customer"),
-                        "metadata": data.get("metadata", {})
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": result.get("message", "Verification failed")
-                    }
+            if result.get("status"):
+                data = result["data"]
+                return {
+                    "success": True,
+                    "status": data["status"],
+                    "amount": data["amount"] / 100,  # Convert from kobo to GHS
+                    "reference": data["reference"],
+                    "paid_at": data.get("paid_at"),
+                    "channel": data.get("channel"),
+                    "customer": data.get("customer"),
+                    "metadata": data.get("metadata", {})
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("message", "Verification failed")
+                }
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error verifying transaction: {e}")
@@ -177,26 +274,23 @@ class PaystackClient:
                 "currency": "GHS"
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/transferrecipient",
-                    json=payload,
-                    headers=self._get_headers()
-                )
+            # Paystack returns the existing recipient for the same account,
+            # so this is safe to resend
+            result = await self._request(
+                "POST", "transferrecipient", "/transferrecipient",
+                json=payload, idempotent=True, timeout=15.0
+            )
 
-                response.raise_for_status()
-                result = response.json()
-
-                if result.get("status"):
-                    return {
-                        "success": True,
-                        "recipient_code": result["data"]["recipient_code"]
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": result.get("message", "Failed to create recipient")
-                    }
+            if result.get("status"):
+                return {
+                    "success": True,
+                    "recipient_code": result["data"]["recipient_code"]
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("message", "Failed to create recipient")
+                }
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error creating recipient: {e}")
@@ -242,37 +336,143 @@ class PaystackClient:
                 "reference": reference
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/transfer",
-                    json=payload,
-                    headers=self._get_headers()
-                )
+            result = await self._request(
+                "POST", "transfer", "/transfer", json=payload, timeout=30.0
+            )
+
+            if result.get("status"):
+                return {
+                    "success": True,
+                    "transfer_code": result["data"]["transfer_code"],
+                    "reference": result["data"]["reference"],
+                    "status": result["data"]["status"]
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("message", "Transfer failed")
+                }
 
-                response.raise_for_status()
-                result = response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error initiating transfer: {e}")
+            return {
+                "success": False,
+                "error": f"HTTP error: {str(e)}"
+            }
+        except Exception as e:
+            logger.error(f"Error initiating transfer: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": f"Unexpected error: {str(e)}"
+            }
 
-                if result.get("status"):
-                    return {
-                        "success": True,
-                        "transfer_code": result["data"]["transfer_code"],
-                        "reference": result["data"]["reference"],
-                        "status": result["data"]["status"]
+    async def verify_transfer(self, reference: str) -> Dict[str, Any]:
+        """
+        Look up a transfer by its reference
+
+        Args:
+            reference: Reference the transfer was initiated with
+
+        Returns:
+            Dict with transfer_code and status; not_found is True when Paystack
+            has no transfer with this reference
+        """
+        try:
+            result = await self._request(
+                "GET", "transfer/verify", f"/transfer/verify/{reference}",
+                idempotent=True, timeout=10.0
+            )
+
+            if result.get("status"):
+                return {
+                    "success": True,
+                    "transfer_code": result["data"].get("transfer_code"),
+                    "status": result["data"].get("status")
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("message", "Transfer verification failed")
+                }
+
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 404):
+                return {"success": False, "not_found": True, "error": "Transfer not found"}
+            logger.error(f"HTTP error verifying transfer: {e}")
+            return {
+                "success": False,
+                "error": f"HTTP error: {str(e)}"
+            }
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error verifying transfer: {e}")
+            return {
+                "success": False,
+                "error": f"HTTP error: {str(e)}"
+            }
+        except Exception as e:
+            logger.error(f"Error verifying transfer: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": f"Unexpected error: {str(e)}"
+            }
+
+    async def initiate_bulk_transfer(self, transfers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Initiate up to 100 transfers in one call
+
+        Requires transfer OTP to be disabled on the Paystack account.
+
+        Args:
+            transfers: Dicts with amount (GHS), recipient_code, reason, reference
+
+        Returns:
+            Dict with per-transfer results keyed by reference
+            (transfer_code, status)
+        """
+        try:
+            payload = {
+                "currency": "GHS",
+                "source": "balance",
+                "transfers": [
+                    {
+                        "amount": int(transfer["amount"] * 100),  # Convert to kobo
+                        "recipient": transfer["recipient_code"],
+                        "reason": transfer["reason"],
+                        "reference": transfer["reference"]
                     }
-                else:
-                    return {
-                        "success": False,
-                        "error": result.get("message", "Transfer failed")
+                    for transfer in transfers
+                ]
+            }
+
+            result = await self._request(
+                "POST", "transfer/bulk", "/transfer/bulk", json=payload, timeout=60.0
+            )
+
+            if result.get("status"):
+                return {
+                    "success": True,
+                    "transfers": {
+                        item["reference"]: {
+                            "transfer_code": item.get("transfer_code"),
+                            "status": item.get("status")
+                        }
+                        for item in result.get("data") or []
                     }
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("message", "Bulk transfer failed")
+                }
 
         except httpx.HTTPError as e:
-            logger.error(f"HTTP error initiating transfer: {e}")
+            logger.error(f"HTTP error initiating bulk transfer: {e}")
             return {
                 "success": False,
                 "error": f"HTTP error: {str(e)}"
             }
         except Exception as e:
-            logger.error(f"Error initiating transfer: {e}", exc_info=True)
+            logger.error(f"Error initiating bulk transfer: {e}", exc_info=True)
             return {
                 "success": False,
                 "error": f"Unexpected error: {str(e)}"
@@ -301,27 +501,21 @@ class PaystackClient:
             if amount:
                 payload["amount"] = int(amount * 100)  # Convert to kobo
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/refund",
-                    json=payload,
-                    headers=self._get_headers()
-                )
+            result = await self._request(
+                "POST", "refund", "/refund", json=payload, timeout=30.0
+            )
 
-                response.raise_for_status()
-                result = response.json()
-
-                if result.get("status"):
-                    return {
-                        "success": True,
-                        "refund_id": result["data"]["id"],
-                        "status": result["data"]["status"]
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": result.get("message", "Refund failed")
-                    }
+            if result.get("status"):
+                return {
+                    "success": True,
+                    "refund_id": result["data"]["id"],
+                    "status": result["data"]["status"]
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": result.get("message", "Refund failed")
+                }
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error processing refund: {e}")
@@ -368,99 +562,52 @@ paystack_client = PaystackClient()
 
 
 # Webhook router (imported in main.py)
-from fastapi import APIRouter, Request, HTTPException, status as http_status, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Request, HTTPException, status as http_status
+import json
 
 router = APIRouter()
 
 
 @router.post("/paystack")
-async def paystack_webhook(
-    request: Request,
-    db: Session = Depends(get_db)
-):
+async def paystack_webhook(request: Request):
     """
     Paystack webhook endpoint
 
-    Handles payment notifications from Paystack
+    Verifies the signature and queues the event; the escrow updates and SMS
+    notifications run in the event worker (integrations/paystack_events.py),
+    so Paystack gets its 200 without waiting on them.
     """
-    try:
-        # Get raw body for signature verification
-        body = await request.body()
-        signature = request.headers.get("x-paystack-signature", "")
-
-        # Verify signature
-        if not PaystackClient.verify_webhook_signature(body, signature, settings.PAYSTACK_SECRET_KEY):
-            logger.warning("Invalid Paystack webhook signature")
-            raise HTTPException(
-                status_code=http_status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid signature"
-            )
-
-        # Parse payload
-        import json
-        payload = json.loads(body)
-
-        event = payload.get("event")
-        data = payload.get("data", {})
-
-        logger.info(f"Paystack webhook received: {event}")
+    # Get raw body for signature verification
+    body = await request.body()
+    signature = request.headers.get("x-paystack-signature", "")
+
+    # Verify signature
+    if not PaystackClient.verify_webhook_signature(body, signature, settings.PAYSTACK_SECRET_KEY):
+        logger.warning("Invalid Paystack webhook signature")
+        raise HTTPException(
+            status_code=http_status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature"
+        )
 
-        # Handle different event types
-        if event == "charge.success":
-            # Payment successful
-            reference = data.get("reference")
-            amount = data.get("amount", 0) / 100  # Convert from kobo
-            customer_email = data.get("customer", {}).get("email")
-
-            # Import here to avoid circular imports
-            from modules.escrow.service import EscrowService
-
-            # Process payment
-            await EscrowService.process_payment_webhook(
-                db=db,
-                reference=reference,
-                amount=amount,
-                customer_email=customer_email,
-                metadata=data.get("metadata", {})
-            )
-
-            logger.info(f"Payment processed: {reference}")
-
-        elif event == "transfer.success":
-            # Transfer successful
-            reference = data.get("reference")
-
-            from modules.escrow.service import EscrowService
-
-            await EscrowService.process_transfer_webhook(
-                db=db,
-                reference=reference,
-                status="success"
-            )
-
-            logger.info(f"Transfer successful: {reference}")
-
-        elif event == "transfer.failed":
-            # Transfer failed
-            reference = data.get("reference")
-
-            from modules.escrow.service import EscrowService
-
-            await EscrowService.process_transfer_webhook(
-                db=db,
-                reference=reference,
-                status="failed"
-            )
-
-            logger.warning(f"Transfer failed: {reference}")
+    try:
+        event = json.loads(body).get("event")
+    except (ValueError, AttributeError):
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Invalid payload"
+        )
 
-        return {"status": "success"}
+    from integrations.paystack_events import paystack_events
 
-    except HTTPException:
-        raise
+    try:
+        entry_id = paystack_events.append(body)
     except Exception as e:
-        logger.error(f"Webhook processing error: {e}", exc_info=True)
-        # Return 200 to prevent Paystack from retrying
-        return {"status": "error", "message": str(e)}
+        # Not stored: fail so Paystack delivers it again
+        logger.error(f"Failed to queue Paystack webhook {event}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event not queued"
+        )
+
+    logger.info(f"Paystack webhook queued: {event} ({entry_id})")
+    return {"status": "success"}
@@ -0,0 +1,311 @@
+"""
+Paystack webhook event queue
+The webhook only verifies the signature and appends the raw event to a Redis
+Stream; a worker thread in each app process (with its own event loop, so the
+handlers' synchronous database work never blocks requests) consumes the
+stream through a consumer group and runs the escrow handlers. Each event is applied at most once per
+(event, reference) and is retried from the pending list if a worker dies
+mid-way.
+"""
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from config import settings
+from database import SessionLocal, get_redis
+from utils.latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "paystack:events"
+DEAD_LETTER_KEY = "paystack:events:dead"
+GROUP = "escrow"
+DONE_KEY = "paystack:event_done:{key}"
+STATS_KEY = "paystack:events:stats"
+DONE_TTL_SECONDS = 7 * 24 * 3600  # Paystack retries for up to 72 hours
+MAX_BACKOFF_SECONDS = 30  # Ceiling for the wait after a Redis failure
+
+# Handler duration per event type, plus "queue_lag" (received -> handled)
+event_latency = LatencyHistogram("paystack_event_latency")
+
+
+def idempotency_key(payload: Dict[str, Any]) -> str:
+    """(event, reference) identifies one Paystack notification across its retries"""
+    data = payload.get("data") or {}
+    return f"{payload.get('event')}:{data.get('reference') or data.get('id')}"
+
+
+async def handle_event(payload: Dict[str, Any]) -> None:
+    """
+    Apply one Paystack event
+
+    Handlers tolerate replays: a payment already recorded as escrow (by the
+    callback verification or an earlier delivery) is skipped.
+    """
+    # Import here to avoid circular imports
+    from modules.escrow.service import EscrowService
+
+    event = payload.get("event")
+    data = payload.get("data") or {}
+    reference = data.get("reference")
+
+    db = SessionLocal()
+    try:
+        if event == "charge.success":
+            try:
+                await EscrowService.process_payment_webhook(
+                    db=db,
+                    reference=reference,
+                    amount=data.get("amount", 0) / 100,  # Convert from kobo
+                    customer_email=(data.get("customer") or {}).get("email"),
+                    metadata=data.get("metadata") or {}
+                )
+            except IntegrityError:
+                # Escrow was created concurrently by the payment callback
+                db.rollback()
+                logger.info(f"Payment {reference} already recorded")
+            logger.info(f"Payment processed: {reference}")
+
+        elif event in ("transfer.success", "transfer.failed"):
+            await EscrowService.process_transfer_webhook(
+                db=db,
+                reference=reference,
+                status="success" if event == "transfer.success" else "failed"
+            )
+            logger.info(f"Transfer {event.split('.')[1]}: {reference}")
+
+        else:
+            logger.debug(f"Ignoring Paystack event {event}")
+    finally:
+        db.close()
+
+
+class PaystackEventQueue:
+    """Redis Stream of verified webhook events with a consumer-group worker"""
+
+    def __init__(
+        self,
+        batch_size: int,
+        block_ms: int,
+        claim_idle_ms: int,
+        max_deliveries: int,
+        maxlen: int,
+        handler: Callable[[Dict[str, Any]], Awaitable[None]] = handle_event
+    ):
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.maxlen = maxlen
+        self.handler = handler
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @staticmethod
+    def _redis():
+        return get_redis()
+
+    def append(self, body: bytes) -> str:
+        """
+        Durably queue a verified webhook body
+
+        Returns:
+            Stream entry ID
+
+        Raises:
+            redis.RedisError: If the event could not be stored (Paystack retries)
+        """
+        return self._redis().xadd(
+            STREAM_KEY,
+            {"body": body.decode(), "received_at": f"{time.time():.3f}"},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+
+    def ensure_group(self) -> None:
+        """Create the stream and consumer group if needed"""
+        try:
+            self._redis().xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _count(self, field: str, amount: int = 1) -> None:
+        self._redis().hincrby(STATS_KEY, field, amount)
+
+    async def _process(self, entry_id: str, fields: Dict[str, str], deliveries: int = 1) -> None:
+        """Handle one entry and acknowledge it unless it should be retried"""
+        client = self._redis()
+        try:
+            payload = json.loads(fields["body"])
+        except (KeyError, ValueError):
+            logger.error(f"Dropping malformed Paystack event {entry_id}")
+            client.xack(STREAM_KEY, GROUP, entry_id)
+            self._count("malformed")
+            return
+
+        done_key = DONE_KEY.format(key=idempotency_key(payload))
+        if client.exists(done_key):
+            client.xack(STREAM_KEY, GROUP, entry_id)
+            self._count("duplicates")
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.handler(payload)
+        except Exception as e:
+            event_latency.observe(payload.get("event") or "unknown", time.perf_counter() - started, error=True)
+            if deliveries >= self.max_deliveries:
+                logger.error(f"Paystack event {entry_id} failed {deliveries} times, dead-lettered: {e}", exc_info=True)
+                pipe = client.pipeline()
+                pipe.xadd(DEAD_LETTER_KEY, {**fields, "error": str(e)[:500], "stream_id": entry_id})
+                pipe.xack(STREAM_KEY, GROUP, entry_id)
+                pipe.hincrby(STATS_KEY, "dead_lettered", 1)
+                pipe.execute()
+            else:
+                # Left pending; reclaimed once idle for claim_idle_ms
+                logger.warning(f"Paystack event {entry_id} failed (attempt {deliveries}): {e}")
+                self._count("failures")
+            return
+
+        event_latency.observe(payload.get("event") or "unknown", time.perf_counter() - started)
+        received_at = float(fields.get("received_at") or time.time())
+        event_latency.observe("queue_lag", time.time() - received_at)
+
+        pipe = client.pipeline()
+        pipe.set(done_key, entry_id, ex=DONE_TTL_SECONDS)
+        pipe.xack(STREAM_KEY, GROUP, entry_id)
+        pipe.hincrby(STATS_KEY, "processed", 1)
+        pipe.execute()
+
+    async def _reclaim(self) -> int:
+        """Take over entries another consumer left pending for too long"""
+        client = self._redis()
+        _, entries, *_ = await asyncio.to_thread(
+            client.xautoclaim, STREAM_KEY, GROUP, self.consumer,
+            self.claim_idle_ms, "0-0", self.batch_size
+        )
+        if not entries:
+            return 0
+
+        pending = client.xpending_range(
+            STREAM_KEY, GROUP, min=entries[0][0], max=entries[-1][0],
+            count=len(entries), consumername=self.consumer
+        )
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        for entry_id, fields in entries:
+            if fields:  # None when the entry was trimmed from the stream
+                await self._process(entry_id, fields, deliveries.get(entry_id, 1))
+            else:
+                client.xack(STREAM_KEY, GROUP, entry_id)
+        return len(entries)
+
+    async def poll(self) -> int:
+        """
+        One consumer step: take over stale pending entries, or else read new ones
+
+        Returns:
+            Number of entries handled
+        """
+        reclaimed = await self._reclaim()
+        if reclaimed:
+            return reclaimed
+
+        client = self._redis()
+        response = await asyncio.to_thread(
+            client.xreadgroup, GROUP, self.consumer, {STREAM_KEY: ">"},
+            count=self.batch_size, block=self.block_ms
+        )
+        handled = 0
+        for _, entries in response or []:
+            for entry_id, fields in entries:
+                await self._process(entry_id, fields)
+                handled += 1
+        return handled
+
+    async def run(self) -> None:
+        """Consume the stream until stop() is called"""
+        group_ready = False
+        failures = 0
+
+        while not self._stopping.is_set():
+            try:
+                if not group_ready:
+                    self.ensure_group()
+                    group_ready = True
+                    logger.info(f"✅ Paystack event worker {self.consumer} started")
+
+                await self.poll()
+                failures = 0
+
+            except Exception as e:
+                if "NOGROUP" in str(e):
+                    # Stream or group deleted under us: recreate it
+                    group_ready = False
+                failures += 1
+                backoff = min(MAX_BACKOFF_SECONDS, 2 ** (failures - 1))
+                logger.error(f"Paystack event worker error (retrying in {backoff}s): {e}", exc_info=failures == 1)
+                self._stopping.wait(backoff)
+
+    def start(self) -> None:
+        """Run the worker on its own thread and event loop (called from the app lifespan)"""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=asyncio.run, args=(self.run(),), name="paystack-events", daemon=True
+            )
+            self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the worker; unacknowledged entries stay pending for the next consumer"""
+        if self._thread is not None:
+            self._stopping.set()
+            # Finishes the current event, at most one blocking read later
+            await asyncio.to_thread(self._thread.join, self.block_ms / 1000 + 5)
+            self._thread = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Backlog and lag of the event stream
+
+        Returns:
+            Dict with stream length, entries not yet delivered (lag), pending
+            (delivered, unacknowledged) count, oldest pending age, dead-letter
+            size, outcome counters and handler/queue-lag latency
+        """
+        client = self._redis()
+        groups = {g["name"]: g for g in client.xinfo_groups(STREAM_KEY)} if client.exists(STREAM_KEY) else {}
+        group = groups.get(GROUP, {})
+
+        pending = client.xpending(STREAM_KEY, GROUP) if group else {"pending": 0, "min": None}
+        oldest_pending_seconds = None
+        if pending.get("min"):
+            oldest_ms = int(pending["min"].split("-")[0])
+            oldest_pending_seconds = round(time.time() - oldest_ms / 1000, 1)
+
+        return {
+            "stream_length": client.xlen(STREAM_KEY),
+            "lag": group.get("lag"),
+            "pending": pending.get("pending", 0),
+            "oldest_pending_seconds": oldest_pending_seconds,
+            "consumers": group.get("consumers", 0),
+            "dead_lettered": client.xlen(DEAD_LETTER_KEY),
+            "counters": {k: int(v) for k, v in client.hgetall(STATS_KEY).items()},
+            "latency": event_latency.snapshot()
+        }
+
+
+paystack_events = PaystackEventQueue(
+    batch_size=settings.PAYSTACK_EVENTS_BATCH_SIZE,
+    block_ms=settings.PAYSTACK_EVENTS_BLOCK_MS,
+    claim_idle_ms=settings.PAYSTACK_EVENTS_CLAIM_IDLE_SECONDS * 1000,
+    max_deliveries=settings.PAYSTACK_EVENTS_MAX_DELIVERIES,
+    maxlen=settings.PAYSTACK_EVENTS_STREAM_MAXLEN
+)
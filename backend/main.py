@@ -3,7 +3,6 @@ SmartAgro Backend API
 Main FastAPI application entry point
 """
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
@@ -13,7 +12,7 @@ import os
 from datetime import datetime
 
 from config import settings, get_cors_origins, is_production
-from database import init_databases, close_databases, get_db, get_mongo_db, get_redis
+from database import init_databases, close_databases, close_async_databases, get_db, get_mongo_db, get_redis
 from middleware.error_handler import setup_error_handlers
 from middleware.rate_limiter import setup_rate_limiter
 
@@ -59,6 +58,15 @@ async def lifespan(app: FastAPI):
         # Initialize databases
         init_databases()
         
+        # Shared Paystack connection pool
+        from integrations.paystack import paystack_client
+        await paystack_client.start()
+
+        # Paystack webhook event worker
+        if settings.PAYSTACK_EVENTS_WORKER_ENABLED:
+            from integrations.paystack_events import paystack_events
+            paystack_events.start()
+
         # Start background jobs if enabled
         if settings.ENABLE_BACKGROUND_JOBS:
             from utils.background_jobs import start_scheduler
@@ -89,7 +97,14 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down...")
+    from integrations.paystack_events import paystack_events
+    await paystack_events.stop()
     close_databases()
+    await close_async_databases()
+    from integrations.paystack import paystack_client
+    await paystack_client.close()
+    from modules.storage.service import image_pool
+    image_pool.shutdown()
     logger.info("✅ Shutdown complete")
 
 
@@ -118,7 +133,12 @@ app.add_middleware(
 if settings.STORAGE_TYPE == "local":
     upload_path = settings.LOCAL_STORAGE_PATH
     if os.path.exists(upload_path):
-        app.mount("/uploads", StaticFiles(directory=upload_path), name="uploads")
+        from modules.storage.local_files import LocalUploadFiles
+        app.mount(
+            "/uploads",
+            LocalUploadFiles(directory=upload_path, max_age=settings.LOCAL_UPLOADS_MAX_AGE_SECONDS),
+            name="uploads"
+        )
         logger.info(f"✅ Serving static files from {upload_path}")
 
 
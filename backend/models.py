@@ -1,7 +1,7 @@
 # backend/models.py
 from sqlalchemy import (
     Column, Integer, String, Text, DECIMAL, DateTime, Boolean, 
-    Date, ForeignKey, Enum as SQLEnum, ARRAY, Index
+    Date, ForeignKey, Enum as SQLEnum, ARRAY, Index, FetchedValue, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Session
@@ -281,8 +281,13 @@ class Product(Base):
     expected_shelf_life_days = Column(Integer, nullable=True)
     expiry_alert_days = Column(Integer, default=3, nullable=False)  # Alert when X days before expiry
     
-    # Search Vector
-    search_vector = Column(TSVECTOR, nullable=True)
+    # Search Vector (maintained by the trg_products_search_vector trigger)
+    search_vector = Column(
+        TSVECTOR,
+        nullable=True,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue()
+    )
     
     # Location (Farm location, may differ from seller's address)
     farm_location = Column(String(255), nullable=True)
@@ -293,6 +298,7 @@ class Product(Base):
     # Images (stored in DO Spaces)
     primary_image_url = Column(Text, nullable=True)
     additional_images = Column(ARRAY(Text), nullable=True)  # Array of image URLs
+    image_variants = Column(JSONB, nullable=True)  # {image_url: {variant: {format: url}}}
     
     # Quality & Certification
     is_organic = Column(Boolean, default=False, nullable=False)
@@ -323,6 +329,11 @@ class Product(Base):
         Index('idx_product_seller_status', 'seller_id', 'status'),
         Index('idx_product_created', 'created_at'),
         Index('idx_product_search_vector', 'search_vector', postgresql_using='gin'),
+        # Keyset pagination: (status, sort column, id) for each allowed sort_by
+        Index('idx_product_status_created_id', 'status', 'created_at', 'id'),
+        Index('idx_product_status_price_id', 'status', 'price_per_unit', 'id'),
+        Index('idx_product_status_name_id', 'status', 'product_name', 'id'),
+        Index('idx_product_status_quantity_id', 'status', 'quantity_available', 'id'),
     )
 
 
@@ -475,6 +486,7 @@ class EscrowTransaction(Base):
     paystack_reference = Column(String(255), unique=True, nullable=True, index=True)
     paystack_status = Column(String(50), nullable=True)
     paystack_transfer_code = Column(String(255), nullable=True)
+    transfer_reference = Column(String(255), unique=True, nullable=True)  # Payout reference, saved before the transfer is sent
     paystack_paid_at = Column(DateTime, nullable=True)
     
     # Escrow Status
@@ -483,6 +495,7 @@ class EscrowTransaction(Base):
     # Auto-action Timeouts
     auto_release_date = Column(DateTime, nullable=True)  # Auto-release after 7 days
     dispute_deadline = Column(DateTime, nullable=True)   # Buyer can dispute within X days
+    release_claimed_until = Column(DateTime, nullable=True)  # Auto-release job lease
     
     # Resolution Details
     released_at = Column(DateTime, nullable=True)
@@ -505,7 +518,8 @@ class EscrowTransaction(Base):
     # Indexes
     __table_args__ = (
         Index('idx_escrow_status', 'status'),
-        Index('idx_escrow_auto_release', 'auto_release_date', 'status'),
+        # Auto-release claims scan only HELD escrows
+        Index('idx_escrow_release_due', 'auto_release_date', postgresql_where=text("status = 'HELD'")),
         Index('idx_escrow_buyer', 'buyer_id', 'status'),
         Index('idx_escrow_seller', 'seller_id', 'status'),
     )
@@ -564,7 +578,8 @@ class Cart(Base):
 
     __table_args__ = (
         Index('idx_cart_buyer_status', 'buyer_id', 'status'),
-        Index('idx_cart_expires', 'expires_at', 'status'),
+        # Expiry sweep scans only ACTIVE carts
+        Index('idx_cart_active_expires', 'expires_at', postgresql_where=text("status = 'ACTIVE'")),
     )
 
 
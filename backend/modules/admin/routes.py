@@ -1059,3 +1059,119 @@ async def update_system_config(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update configuration"
         )
+
+
+# ==================== METRICS ====================
+
+@router.get("/metrics/cache")
+async def get_cache_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Get response cache counters
+
+    **Requires admin authentication**
+
+    Returns hit/miss counts per cached endpoint and the hit ratio.
+    """
+    from utils.response_cache import response_cache
+
+    counters = response_cache.get_stats()
+
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    for field, value in counters.items():
+        namespace, _, outcome = field.rpartition(":")
+        if outcome not in ("hit", "miss"):
+            continue
+        entry = endpoints.setdefault(namespace, {"hit": 0, "miss": 0})
+        entry[outcome] = value
+
+    for entry in endpoints.values():
+        lookups = entry["hit"] + entry["miss"]
+        entry["hit_ratio"] = round(entry["hit"] / lookups, 4) if lookups else None
+
+    return {
+        "success": True,
+        "endpoints": endpoints,
+        "invalidations": counters.get("invalidations", 0)
+    }
+
+
+@router.get("/metrics/paystack")
+async def get_paystack_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Get Paystack API latency per endpoint
+
+    **Requires admin authentication**
+
+    Returns call and error counts, average latency, p50/p95/p99 bucket
+    bounds in milliseconds and the raw bucket counts. Retried attempts are
+    counted individually.
+    """
+    from integrations.paystack import paystack_latency
+
+    return {
+        "success": True,
+        "endpoints": paystack_latency.snapshot()
+    }
+
+
+@router.get("/metrics/webhooks")
+async def get_webhook_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Get Paystack webhook queue backlog and lag
+
+    **Requires admin authentication**
+
+    Returns the stream length, entries not yet delivered to the worker (lag),
+    delivered-but-unacknowledged entries and the age of the oldest one,
+    dead-lettered events, outcome counters, and handler and queue-lag latency.
+    """
+    from integrations.paystack_events import paystack_events
+
+    try:
+        metrics = paystack_events.metrics()
+    except Exception as e:
+        logger.error(f"Webhook metrics error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webhook queue unavailable"
+        )
+
+    return {
+        "success": True,
+        **metrics
+    }
+
+
+@router.get("/metrics/escrow-release")
+async def get_escrow_release_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Get the outcome of the last escrow auto-release run
+
+    **Requires admin authentication**
+
+    Returns the release mode, escrows claimed, released and failed, run time
+    in seconds and releases per second.
+    """
+    from modules.escrow.auto_release import escrow_release_engine
+
+    try:
+        last_run = escrow_release_engine.last_run()
+    except Exception as e:
+        logger.error(f"Escrow release metrics error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Escrow release metrics unavailable"
+        )
+
+    return {
+        "success": True,
+        "last_run": last_run
+    }
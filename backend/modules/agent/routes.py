@@ -27,7 +27,7 @@ from modules.agent.service import (
     stream_agent_response
 )
 from modules.agent.knowledge_service import KnowledgeService
-from modules.storage.service import StorageService
+from modules.storage.service import storage_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -254,21 +254,11 @@ async def send_message_with_upload(
             media_type = "video"
             max_size = 50 * 1024 * 1024  # 50MB
 
-        # Read file
-        file_bytes = await file.read()
-        if len(file_bytes) > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Max size for {media_type}: {max_size // (1024*1024)}MB"
-            )
-
-        # Upload to storage
-        storage = StorageService()
-        upload_result = await storage.upload_file(
-            file_bytes=file_bytes,
-            filename=file.filename,
-            content_type=content_type,
-            folder=f"agent/{media_type}s"
+        # Stream to storage (size limit enforced while reading)
+        upload_result = await storage_service.upload_file(
+            file=file,
+            folder=f"agent/{media_type}s",
+            max_size_bytes=max_size
         )
 
         # Create media attachment
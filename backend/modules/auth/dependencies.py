@@ -18,13 +18,16 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
-async def get_current_user(
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Get current authenticated user from JWT token
 
+    Declared sync so FastAPI runs the Redis/Postgres lookups in its threadpool
+    instead of on the event loop.
+
     Args:
         credentials: HTTP Bearer credentials
         db: Database session
@@ -231,7 +234,7 @@ async def get_current_admin(
     return current_user
 
 
-async def get_optional_current_user(
+def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
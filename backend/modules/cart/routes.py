@@ -4,10 +4,11 @@ API endpoints for shopping cart operations
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import logging
 
-from database import get_db
+from database import get_db, get_async_db
 from models import User
 from modules.auth.dependencies import get_current_user, get_current_buyer
 from modules.cart.service import CartService, DifferentFarmerError
@@ -26,9 +27,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _build_cart_response(cart):
-    """Helper to build CartResponse from Cart model"""
-    totals = CartService.calculate_totals(cart)
+def _build_cart_response(cart, db: Session):
+    """Helper to build CartResponse from a stored cart"""
+    farmer, products = CartService.get_cart_details(cart, db)
+    # Lines whose product was deleted can't be shown or checked out
+    items = [item for item in cart.items if item.product_id in products]
+    totals = CartService.calculate_totals(items)
     # Calculate time remaining in seconds
     time_remaining = (cart.expires_at - datetime.utcnow()).total_seconds()
     time_remaining_seconds = int(max(0, time_remaining))
@@ -36,17 +40,17 @@ def _build_cart_response(cart):
 
     # Build farmer location string
     farmer_location = "Unknown"
-    if cart.farmer.town_city and cart.farmer.region:
-        farmer_location = f"{cart.farmer.town_city}, {cart.farmer.region}"
-    elif cart.farmer.region:
-        farmer_location = cart.farmer.region
-    elif cart.farmer.town_city:
-        farmer_location = cart.farmer.town_city
+    if farmer.town_city and farmer.region:
+        farmer_location = f"{farmer.town_city}, {farmer.region}"
+    elif farmer.region:
+        farmer_location = farmer.region
+    elif farmer.town_city:
+        farmer_location = farmer.town_city
 
     return CartResponse(
         id=cart.id,
         farmer_id=cart.farmer_id,
-        farmer_name=cart.farmer.full_name,
+        farmer_name=farmer.full_name,
         farmer_location=farmer_location,
         status=cart.status,
         items=[
@@ -57,15 +61,15 @@ def _build_cart_response(cart):
                 unit_price_snapshot=item.unit_price_snapshot,
                 subtotal=item.quantity * item.unit_price_snapshot,
                 product={
-                    "product_name": item.product.product_name,
-                    "primary_image_url": item.product.primary_image_url,
-                    "unit_of_measure": item.product.unit_of_measure.value,
-                    "quantity_available": item.product.quantity_available
+                    "product_name": products[item.product_id].product_name,
+                    "primary_image_url": products[item.product_id].primary_image_url,
+                    "unit_of_measure": products[item.product_id].unit_of_measure.value,
+                    "quantity_available": products[item.product_id].quantity_available
                 }
             )
-            for item in cart.items
+            for item in items
         ],
-        items_count=len(cart.items),
+        items_count=len(items),
         subtotal=totals["subtotal"],
         platform_fee=totals["platform_fee"],
         delivery_fee=totals["delivery_fee"],
@@ -79,14 +83,14 @@ def _build_cart_response(cart):
 @router.get("", response_model=CartResponse)
 async def get_cart(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's active cart
 
     Returns cart with all items, totals, and expiry time
     """
-    cart = CartService.get_active_cart(current_user.id, db)
+    cart = CartService.get_active_cart(current_user.id)
 
     if not cart:
         raise HTTPException(
@@ -97,14 +101,14 @@ async def get_cart(
             }
         )
 
-    return _build_cart_response(cart)
+    return await db.run_sync(lambda session: _build_cart_response(cart, session))
 
 
 @router.post("/items", response_model=CartResponse)
 async def add_to_cart(
     request: AddToCartRequest,
     current_user: User = Depends(get_current_buyer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a product to cart
@@ -115,14 +119,16 @@ async def add_to_cart(
     - Refreshes cart expiry time
     """
     try:
-        cart = CartService.add_to_cart(
-            buyer_id=current_user.id,
-            product_id=request.product_id,
-            quantity=request.quantity,
-            db=db
-        )
+        def _add_to_cart(session: Session):
+            cart = CartService.add_to_cart(
+                buyer_id=current_user.id,
+                product_id=request.product_id,
+                quantity=request.quantity,
+                db=session
+            )
+            return _build_cart_response(cart, session)
 
-        return _build_cart_response(cart)
+        return await db.run_sync(_add_to_cart)
 
     except DifferentFarmerError as e:
         raise HTTPException(
@@ -156,23 +162,26 @@ async def update_cart_item(
     item_id: int,
     request: UpdateCartItemRequest,
     current_user: User = Depends(get_current_buyer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update cart item quantity
 
+    - **item_id**: Product ID of the cart line (cart lines are keyed by product)
     - Validates stock availability
     - Refreshes cart expiry time
     """
     try:
-        cart = CartService.update_cart_item(
-            buyer_id=current_user.id,
-            item_id=item_id,
-            quantity=request.quantity,
-            db=db
-        )
+        def _update_cart_item(session: Session):
+            cart = CartService.update_cart_item(
+                buyer_id=current_user.id,
+                item_id=item_id,
+                quantity=request.quantity,
+                db=session
+            )
+            return _build_cart_response(cart, session)
 
-        return _build_cart_response(cart)
+        return await db.run_sync(_update_cart_item)
 
     except ValueError as e:
         raise HTTPException(
@@ -196,19 +205,19 @@ async def update_cart_item(
 @router.delete("/items/{item_id}", response_model=MessageResponse)
 async def remove_from_cart(
     item_id: int,
-    current_user: User = Depends(get_current_buyer),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_buyer)
 ):
     """
     Remove item from cart
 
-    If removing the last item, cart status changes to ABANDONED
+    - **item_id**: Product ID of the cart line
+
+    If removing the last item, the cart is deleted
     """
     try:
         cart = CartService.remove_from_cart(
             buyer_id=current_user.id,
-            item_id=item_id,
-            db=db
+            item_id=item_id
         )
 
         if cart is None:
@@ -244,8 +253,7 @@ async def remove_from_cart(
 
 @router.delete("", response_model=MessageResponse)
 async def clear_cart(
-    current_user: User = Depends(get_current_buyer),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_buyer)
 ):
     """
     Clear all items from cart
@@ -253,7 +261,7 @@ async def clear_cart(
     Marks cart as ABANDONED
     """
     try:
-        CartService.clear_cart(current_user.id, db)
+        CartService.clear_cart(current_user.id)
 
         return MessageResponse(
             success=True,
@@ -76,7 +76,7 @@ class ProductSummary(BaseModel):
 
 class CartItemResponse(BaseModel):
     """Cart item response"""
-    id: int
+    id: int  # Same as product_id: a cart holds one line per product
     product_id: int
     quantity: float
     unit_price_snapshot: float
@@ -4,22 +4,24 @@ Business logic for shopping cart operations
 """
 import logging
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, insert, select, update, values, column, Integer, Numeric, String
+from sqlalchemy.orm import Session, aliased
 
 from models import (
-    Cart, CartItem, Product, User, Order, OrderItem,
+    Cart, Product, User, Order, OrderItem,
     OrderStatus, PaymentStatus, ProductStatus, DeliveryMethod
 )
 from config import settings
+from modules.products.service import ProductService, StockUnavailableError
+from modules.cart.store import cart_store, CartStoreError, StoredCart
 
 logger = logging.getLogger(__name__)
 
 # Cart configuration
-CART_EXPIRY_HOURS = 8
 PLATFORM_FEE_PERCENTAGE = Decimal('0.05')  # 5%
 BASE_DELIVERY_FEE = Decimal('20.00')
 
@@ -29,34 +31,101 @@ class DifferentFarmerError(ValueError):
     pass
 
 
+def order_with_items_statement(order_values: Dict[str, Any], item_rows: List[tuple]):
+    """
+    Insert an order and all of its items in one statement
+
+    The order insert is a data-modifying CTE; the items are inserted from a
+    VALUES list joined to its RETURNING id, and the new order is selected back
+    as an Order entity. Python-side column defaults aren't applied inside
+    CTEs, so callers pass every timestamp explicitly.
+
+    Args:
+        order_values: Column values for the order (including created_at/updated_at)
+        item_rows: (product_id, quantity, unit_price, subtotal, name, unit) per item
+    """
+    new_order = insert(Order).values(**order_values).returning(*Order.__table__.c).cte("new_order")
+
+    rows = values(
+        column("product_id", Integer),
+        column("quantity", Numeric),
+        column("unit_price", Numeric),
+        column("subtotal", Numeric),
+        column("product_name_snapshot", String),
+        column("unit_of_measure_snapshot", String),
+        name="item_rows"
+    ).data(item_rows)
+
+    new_items = insert(OrderItem).from_select(
+        [
+            "order_id", "product_id", "quantity", "unit_price", "subtotal",
+            "product_name_snapshot", "unit_of_measure_snapshot", "created_at"
+        ],
+        select(
+            new_order.c.id,
+            rows.c.product_id,
+            rows.c.quantity,
+            rows.c.unit_price,
+            rows.c.subtotal,
+            rows.c.product_name_snapshot,
+            rows.c.unit_of_measure_snapshot,
+            new_order.c.created_at
+        )
+    ).returning(OrderItem.id).cte("new_items")
+
+    return select(aliased(Order, new_order)).add_cte(new_items)
+
+
 class CartService:
     """Shopping cart service"""
 
     @staticmethod
-    def get_active_cart(buyer_id: int, db: Session) -> Optional[Cart]:
+    def get_active_cart(buyer_id: int) -> Optional[StoredCart]:
         """
         Get user's active cart if exists and not expired
 
+        Carts live in Redis and expire by TTL, so this is a single read.
+
         Args:
             buyer_id: Buyer's user ID
-            db: Database session
 
         Returns:
-            Cart object or None
+            StoredCart or None
         """
-        cart = db.query(Cart).filter(
-            Cart.buyer_id == buyer_id,
-            Cart.status == "ACTIVE"
-        ).first()
-
-        if cart and cart.expires_at < datetime.utcnow():
-            # Cart has expired
-            cart.status = "EXPIRED"
-            db.commit()
-            logger.info(f"Cart {cart.id} expired for user {buyer_id}")
-            return None
+        return cart_store.get(buyer_id)
 
-        return cart
+    @staticmethod
+    def get_cart_details(cart: StoredCart, db: Session) -> Tuple[Any, Dict[int, Any]]:
+        """
+        Load the farmer and the products shown for a cart in one query
+
+        Args:
+            cart: Active cart
+            db: Database session
+
+        Returns:
+            (farmer row, product ID -> product row); products that no longer
+            exist are missing from the dict
+        """
+        product_ids = [item.product_id for item in cart.items]
+        rows = db.query(
+            User.full_name,
+            User.town_city,
+            User.region,
+            Product.id,
+            Product.product_name,
+            Product.primary_image_url,
+            Product.unit_of_measure,
+            Product.quantity_available
+        ).outerjoin(
+            Product, and_(Product.seller_id == User.id, Product.id.in_(product_ids))
+        ).filter(User.id == cart.farmer_id).all()
+
+        if not rows:
+            raise ValueError("Farmer not found")
+
+        products = {row.id: row for row in rows if row.id is not None}
+        return rows[0], products
 
     @staticmethod
     def add_to_cart(
@@ -64,7 +133,7 @@ class CartService:
         product_id: int,
         quantity: Decimal,
         db: Session
-    ) -> Cart:
+    ) -> StoredCart:
         """
         Add product to cart
 
@@ -74,6 +143,9 @@ class CartService:
         - If product already in cart, update quantity
         - Refresh expiry on any cart update
 
+        Takes one product read and one Redis script call; a new cart also
+        allocates its ID from the carts sequence.
+
         Args:
             buyer_id: Buyer's user ID
             product_id: Product ID to add
@@ -81,14 +153,21 @@ class CartService:
             db: Database session
 
         Returns:
-            Updated Cart object
+            Updated cart
 
         Raises:
             ValueError: If validation fails
             DifferentFarmerError: If cart has items from different farmer
         """
         # Get and validate product
-        product = db.query(Product).filter(Product.id == product_id).first()
+        product = db.query(
+            Product.seller_id,
+            Product.status,
+            Product.quantity_available,
+            Product.minimum_order_quantity,
+            Product.price_per_unit,
+            Product.unit_of_measure
+        ).filter(Product.id == product_id).first()
         if not product:
             raise ValueError("Product not found")
 
@@ -109,62 +188,36 @@ class CartService:
         if product.seller_id == buyer_id:
             raise ValueError("Cannot add your own product to cart")
 
-        # Get or create cart
-        cart = CartService.get_active_cart(buyer_id, db)
-
-        if cart:
-            # Check if same farmer
-            if cart.farmer_id != product.seller_id:
-                raise ValueError(
+        item = dict(
+            buyer_id=buyer_id,
+            farmer_id=product.seller_id,
+            product_id=product_id,
+            quantity=quantity,
+            unit_price=product.price_per_unit,
+            quantity_available=product.quantity_available
+        )
+        try:
+            try:
+                cart = cart_store.add_item(**item)
+            except CartStoreError as e:
+                if e.code != "new_cart":
+                    raise
+                # No cart yet: take an ID for it and retry (the script still
+                # applies the farmer rule if another request created one)
+                cart = cart_store.add_item(**item, cart_id=cart_store.allocate_cart_id(db))
+                logger.info(f"Created new cart {cart.id} for user {buyer_id}")
+        except CartStoreError as e:
+            if e.code == "different_farmer":
+                raise DifferentFarmerError(
                     "Your cart contains items from a different farmer. "
                     "Please checkout or clear your cart first to buy from another farmer."
                 )
-        else:
-            # Create new cart
-            cart = Cart(
-                buyer_id=buyer_id,
-                farmer_id=product.seller_id,
-                status="ACTIVE",
-                expires_at=datetime.utcnow() + timedelta(hours=CART_EXPIRY_HOURS)
-            )
-            db.add(cart)
-            db.flush()  # Get cart ID
-            logger.info(f"Created new cart {cart.id} for user {buyer_id}")
-
-        # Check if product already in cart
-        existing_item = db.query(CartItem).filter(
-            CartItem.cart_id == cart.id,
-            CartItem.product_id == product_id
-        ).first()
-
-        if existing_item:
-            # Update quantity
-            new_quantity = existing_item.quantity + quantity
-            if new_quantity > product.quantity_available:
-                raise ValueError(
-                    f"Cannot add more. Only {product.quantity_available} {product.unit_of_measure.value} available. "
-                    f"You already have {existing_item.quantity} in cart."
-                )
-            existing_item.quantity = new_quantity
-            existing_item.updated_at = datetime.utcnow()
-            logger.info(f"Updated cart item {existing_item.id}: quantity {new_quantity}")
-        else:
-            # Add new item
-            cart_item = CartItem(
-                cart_id=cart.id,
-                product_id=product_id,
-                quantity=quantity,
-                unit_price_snapshot=product.price_per_unit
+            raise ValueError(
+                f"Cannot add more. Only {product.quantity_available} {product.unit_of_measure.value} available. "
+                f"You already have {e.current} in cart."
             )
-            db.add(cart_item)
-            logger.info(f"Added new item to cart {cart.id}: product {product_id}, qty {quantity}")
-
-        # Refresh cart expiry
-        cart.expires_at = datetime.utcnow() + timedelta(hours=CART_EXPIRY_HOURS)
-        cart.updated_at = datetime.utcnow()
 
-        db.commit()
-        db.refresh(cart)
+        logger.info(f"Added to cart {cart.id}: product {product_id}, qty {quantity}")
 
         return cart
 
@@ -174,126 +227,101 @@ class CartService:
         item_id: int,
         quantity: Decimal,
         db: Session
-    ) -> Cart:
+    ) -> StoredCart:
         """
         Update quantity of a cart item
 
         Args:
             buyer_id: Buyer's user ID
-            item_id: Cart item ID
+            item_id: Cart item ID (the product ID)
             quantity: New quantity
             db: Database session
 
         Returns:
-            Updated Cart object
+            Updated cart
 
         Raises:
             ValueError: If validation fails
         """
-        cart = CartService.get_active_cart(buyer_id, db)
-        if not cart:
-            raise ValueError("No active cart found")
+        product = db.query(
+            Product.quantity_available,
+            Product.minimum_order_quantity,
+            Product.unit_of_measure
+        ).filter(Product.id == item_id).first()
 
-        item = db.query(CartItem).filter(
-            CartItem.id == item_id,
-            CartItem.cart_id == cart.id
-        ).first()
-
-        if not item:
+        if not product:
             raise ValueError("Item not found in cart")
 
         # Check availability
-        if quantity > item.product.quantity_available:
+        if quantity > product.quantity_available:
             raise ValueError(
-                f"Only {item.product.quantity_available} {item.product.unit_of_measure.value} available"
+                f"Only {product.quantity_available} {product.unit_of_measure.value} available"
             )
 
         # Check minimum order quantity
-        if item.product.minimum_order_quantity and quantity < item.product.minimum_order_quantity:
+        if product.minimum_order_quantity and quantity < product.minimum_order_quantity:
             raise ValueError(
-                f"Minimum order quantity is {item.product.minimum_order_quantity}"
+                f"Minimum order quantity is {product.minimum_order_quantity}"
             )
 
-        item.quantity = quantity
-        item.updated_at = datetime.utcnow()
-
-        # Refresh cart expiry
-        cart.expires_at = datetime.utcnow() + timedelta(hours=CART_EXPIRY_HOURS)
-        cart.updated_at = datetime.utcnow()
-
-        db.commit()
-        db.refresh(cart)
+        try:
+            cart = cart_store.set_quantity(buyer_id, item_id, quantity)
+        except CartStoreError as e:
+            if e.code == "no_cart":
+                raise ValueError("No active cart found")
+            raise ValueError("Item not found in cart")
 
         logger.info(f"Updated cart item {item_id}: quantity {quantity}")
 
         return cart
 
     @staticmethod
-    def remove_from_cart(buyer_id: int, item_id: int, db: Session) -> Optional[Cart]:
+    def remove_from_cart(buyer_id: int, item_id: int) -> Optional[StoredCart]:
         """
         Remove item from cart
 
         Args:
             buyer_id: Buyer's user ID
-            item_id: Cart item ID
-            db: Database session
+            item_id: Cart item ID (the product ID)
 
         Returns:
-            Updated Cart object, or None if cart becomes empty
+            Updated cart, or None if cart becomes empty
 
         Raises:
             ValueError: If item not found
         """
-        cart = CartService.get_active_cart(buyer_id, db)
-        if not cart:
-            raise ValueError("No active cart found")
-
-        item = db.query(CartItem).filter(
-            CartItem.id == item_id,
-            CartItem.cart_id == cart.id
-        ).first()
-
-        if not item:
+        try:
+            cart = cart_store.remove_item(buyer_id, item_id)
+        except CartStoreError as e:
+            if e.code == "no_cart":
+                raise ValueError("No active cart found")
             raise ValueError("Item not found in cart")
 
-        db.delete(item)
-        db.commit()
-
-        logger.info(f"Removed item {item_id} from cart {cart.id}")
-
-        # Check if cart is now empty
-        remaining_items = db.query(CartItem).filter(CartItem.cart_id == cart.id).count()
-        if remaining_items == 0:
-            cart.status = "ABANDONED"
-            db.commit()
-            logger.info(f"Cart {cart.id} abandoned (empty)")
+        if cart is None:
+            logger.info(f"Cart for user {buyer_id} abandoned (empty)")
             return None
 
-        db.refresh(cart)
+        logger.info(f"Removed item {item_id} from cart {cart.id}")
         return cart
 
     @staticmethod
-    def clear_cart(buyer_id: int, db: Session) -> None:
+    def clear_cart(buyer_id: int) -> None:
         """
         Clear all items from cart
 
         Args:
             buyer_id: Buyer's user ID
-            db: Database session
         """
-        cart = CartService.get_active_cart(buyer_id, db)
-        if cart:
-            cart.status = "ABANDONED"
-            db.commit()
-            logger.info(f"Cart {cart.id} cleared by user {buyer_id}")
+        if cart_store.clear(buyer_id):
+            logger.info(f"Cart cleared by user {buyer_id}")
 
     @staticmethod
-    def calculate_totals(cart: Cart, delivery_method: str = "DELIVERY") -> Dict[str, Decimal]:
+    def calculate_totals(items: Iterable[Any], delivery_method: str = "DELIVERY") -> Dict[str, Decimal]:
         """
         Calculate cart totals
 
         Args:
-            cart: Cart object with items loaded
+            items: Cart items (anything with quantity and unit_price_snapshot)
             delivery_method: "DELIVERY" or "PICKUP"
 
         Returns:
@@ -301,7 +329,7 @@ class CartService:
         """
         subtotal = sum(
             item.quantity * item.unit_price_snapshot
-            for item in cart.items
+            for item in items
         )
 
         platform_fee = subtotal * PLATFORM_FEE_PERCENTAGE
@@ -343,24 +371,28 @@ class CartService:
         Raises:
             ValueError: If validation fails
         """
-        cart = CartService.get_active_cart(buyer_id, db)
-        if not cart:
+        try:
+            cart = cart_store.claim_for_checkout(buyer_id)
+        except CartStoreError as e:
+            if e.code == "in_progress":
+                raise ValueError("Checkout already in progress")
             raise ValueError("No active cart found")
 
+        try:
+            order = CartService._place_order(cart, checkout_data, db)
+        except Exception:
+            cart_store.release_checkout(buyer_id)
+            raise
+
+        cart_store.finish_checkout(buyer_id)
+        return order
+
+    @staticmethod
+    def _place_order(cart: StoredCart, checkout_data: Dict[str, Any], db: Session) -> Order:
+        """Reserve stock, create the order and record the checked-out cart"""
         if not cart.items:
             raise ValueError("Cart is empty")
 
-        # Validate stock availability for all items
-        for item in cart.items:
-            product = item.product
-            if product.quantity_available < item.quantity:
-                raise ValueError(
-                    f"Insufficient stock for {product.product_name}. "
-                    f"Available: {product.quantity_available} {product.unit_of_measure.value}"
-                )
-            if product.status != ProductStatus.AVAILABLE:
-                raise ValueError(f"Product '{product.product_name}' is no longer available")
-
         # Determine delivery method
         delivery_method_str = checkout_data.get("delivery_method", "DELIVERY")
         try:
@@ -368,87 +400,112 @@ class CartService:
         except KeyError:
             raise ValueError(f"Invalid delivery method: {delivery_method_str}")
 
+        # Reserve stock for every item in one conditional UPDATE; no row
+        # changes unless it's available and still holds enough
+        quantities = {item.product_id: item.quantity for item in cart.items}
+        try:
+            reserved = ProductService.reserve_stock(db, quantities)
+        except StockUnavailableError:
+            db.rollback()
+            raise
+        products = {row.id: row for row in reserved}
+
         # Calculate totals
-        totals = CartService.calculate_totals(cart, delivery_method=delivery_method_str)
+        totals = CartService.calculate_totals(cart.items, delivery_method=delivery_method_str)
 
         # Generate order number
-        timestamp = int(datetime.utcnow().timestamp())
+        now = datetime.utcnow()
+        timestamp = int(now.timestamp())
         random_suffix = uuid.uuid4().hex[:6].upper()
         order_number = f"ORD-{timestamp}-{random_suffix}"
 
-        # Create order
-        order = Order(
-            order_number=order_number,
-            buyer_id=buyer_id,
-            seller_id=cart.farmer_id,
-            product_id=None,  # Multi-item order
-            quantity_ordered=sum(item.quantity for item in cart.items),
-            unit_price=Decimal('0'),  # N/A for multi-item
-            subtotal=totals["subtotal"],
-            platform_fee=totals["platform_fee"],
-            delivery_fee=totals["delivery_fee"],
-            total_amount=totals["total"],
-            delivery_method=delivery_method,
-            delivery_address=checkout_data.get("delivery_address") or ("PICKUP" if delivery_method == DeliveryMethod.PICKUP else ""),
-            delivery_region=checkout_data.get("delivery_region"),
-            delivery_district=checkout_data.get("delivery_district"),
-            delivery_phone=checkout_data.get("delivery_phone"),
-            delivery_notes=checkout_data.get("delivery_notes"),
-            status=OrderStatus.PENDING,
-            payment_status=PaymentStatus.PENDING,
-            payment_method="PAYSTACK"
-        )
-        db.add(order)
-        db.flush()  # Get order ID
-
-        # Create order items and reserve stock
-        for cart_item in cart.items:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=cart_item.product_id,
-                quantity=cart_item.quantity,
-                unit_price=cart_item.unit_price_snapshot,
-                subtotal=cart_item.quantity * cart_item.unit_price_snapshot,
-                product_name_snapshot=cart_item.product.product_name,
-                unit_of_measure_snapshot=cart_item.product.unit_of_measure.value
-            )
-            db.add(order_item)
-
-            # Reserve stock (reduce available quantity)
-            cart_item.product.quantity_available -= cart_item.quantity
-
-            logger.info(
-                f"Created order item for product {cart_item.product_id}: "
-                f"qty {cart_item.quantity}, subtotal {order_item.subtotal}"
+        # Create order and items in one round trip
+        order_values = {
+            "order_number": order_number,
+            "buyer_id": cart.buyer_id,
+            "seller_id": cart.farmer_id,
+            "product_id": None,  # Multi-item order
+            "quantity_ordered": sum(item.quantity for item in cart.items),
+            "unit_price": Decimal('0'),  # N/A for multi-item
+            "subtotal": totals["subtotal"],
+            "platform_fee": totals["platform_fee"],
+            "delivery_fee": totals["delivery_fee"],
+            "total_amount": totals["total"],
+            "delivery_method": delivery_method,
+            "delivery_address": checkout_data.get("delivery_address") or ("PICKUP" if delivery_method == DeliveryMethod.PICKUP else ""),
+            "delivery_region": checkout_data.get("delivery_region"),
+            "delivery_district": checkout_data.get("delivery_district"),
+            "delivery_phone": checkout_data.get("delivery_phone"),
+            "delivery_notes": checkout_data.get("delivery_notes"),
+            "status": OrderStatus.PENDING,
+            "payment_status": PaymentStatus.PENDING,
+            "payment_method": "PAYSTACK",
+            "created_at": now,
+            "updated_at": now
+        }
+        item_rows = [
+            (
+                item.product_id,
+                item.quantity,
+                item.unit_price_snapshot,
+                item.quantity * item.unit_price_snapshot,
+                products[item.product_id].product_name,
+                products[item.product_id].unit_of_measure.value
             )
+            for item in cart.items
+        ]
+        order = db.execute(order_with_items_statement(order_values, item_rows)).scalar_one()
+        logger.info(f"Created order {order.order_number} with {len(item_rows)} items")
 
-        # Mark cart as checked out
-        cart.status = "CHECKED_OUT"
+        # The cart reaches Postgres here, already checked out
+        cart_store.write_carts(db, [cart], status="CHECKED_OUT")
 
+        # Detach so the returned order stays readable without a post-commit refresh
+        db.expunge(order)
         db.commit()
-        db.refresh(order)
+
+        for product in reserved:
+            ProductService.invalidate_catalog_cache(product)
 
         logger.info(f"Checkout complete: Order {order.order_number} created from cart {cart.id}")
 
         return order
 
     @staticmethod
-    def expire_old_carts(db: Session) -> int:
+    def expire_old_carts(db: Session, batch_size: int = settings.CART_EXPIRY_BATCH_SIZE) -> int:
         """
-        Background task: expire old carts
+        Background task: expire cart snapshot rows past their expiry
+
+        The live cart has already left Redis with its TTL; this closes the
+        matching ACTIVE rows in short batches found through the partial
+        idx_cart_active_expires index. Rows locked by a running snapshot or
+        checkout are skipped and picked up on the next run.
 
         Args:
             db: Database session
+            batch_size: Rows updated per transaction
 
         Returns:
             Number of carts expired
         """
-        expired_count = db.query(Cart).filter(
+        now = datetime.utcnow()
+        due = select(Cart.id).where(
             Cart.status == "ACTIVE",
-            Cart.expires_at < datetime.utcnow()
-        ).update({"status": "EXPIRED"})
-
-        db.commit()
+            Cart.expires_at < now
+        ).order_by(Cart.expires_at).limit(batch_size).with_for_update(skip_locked=True)
+
+        expired_count = 0
+        while True:
+            expired = db.execute(
+                update(Cart).where(Cart.id.in_(due.scalar_subquery())).values(
+                    status="EXPIRED",
+                    updated_at=now
+                ).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            expired_count += expired
+            if expired < batch_size:
+                break
 
         if expired_count > 0:
             logger.info(f"Expired {expired_count} carts")
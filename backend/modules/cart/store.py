@@ -0,0 +1,482 @@
+"""
+Redis-resident shopping carts
+Each active cart is one Redis hash (cart:<buyer_id>) that expires
+settings.CART_EXPIRY_HOURS after its last change. The carts/cart_items tables
+are only written by the periodic snapshot and at checkout.
+
+Hash fields:
+    id, farmer_id, created_at, updated_at, expires_at
+    qty:<product_id>, price:<product_id>, added:<product_id>  (one set per line)
+"""
+from sqlalchemy import case, delete, insert, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from config import settings
+from database import get_redis
+from models import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+CART_KEY = "cart:{buyer_id}"
+CHECKOUT_KEY = "cart:{buyer_id}:checkout"
+DIRTY_KEY = "carts:dirty"
+SNAPSHOTTING_KEY = "carts:snapshotting"
+
+QUANTITY_STEP = Decimal("0.01")  # cart_items.quantity is DECIMAL(10, 2)
+
+# Single-farmer rule, stock check and write in one atomic step.
+# ARGV: buyer_id, farmer_id, cart_id ('' if none allocated yet), product_id,
+#       quantity, unit_price, quantity_available, now, expires_at, ttl
+ADD_ITEM_SCRIPT = """
+local farmer = redis.call('HGET', KEYS[1], 'farmer_id')
+if farmer and farmer ~= ARGV[2] then
+    return {'different_farmer'}
+end
+if not farmer and ARGV[3] == '' then
+    return {'new_cart'}
+end
+local qty_field = 'qty:' .. ARGV[4]
+local current = redis.call('HGET', KEYS[1], qty_field)
+local quantity = tonumber(current or '0') + tonumber(ARGV[5])
+if quantity > tonumber(ARGV[7]) then
+    return {'insufficient', current or '0'}
+end
+if not farmer then
+    redis.call('HSET', KEYS[1], 'id', ARGV[3], 'farmer_id', ARGV[2], 'created_at', ARGV[8])
+end
+if not current then
+    redis.call('HSET', KEYS[1], 'price:' .. ARGV[4], ARGV[6], 'added:' .. ARGV[4], ARGV[8])
+end
+redis.call('HSET', KEYS[1], qty_field, tostring(quantity), 'updated_at', ARGV[8], 'expires_at', ARGV[9])
+redis.call('EXPIRE', KEYS[1], ARGV[10])
+redis.call('SADD', KEYS[2], ARGV[1])
+local cart = redis.call('HGETALL', KEYS[1])
+table.insert(cart, 1, 'ok')
+return cart
+"""
+
+# ARGV: buyer_id, product_id, quantity, now, expires_at, ttl
+SET_QUANTITY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'no_cart'}
+end
+local qty_field = 'qty:' .. ARGV[2]
+if redis.call('HEXISTS', KEYS[1], qty_field) == 0 then
+    return {'no_item'}
+end
+redis.call('HSET', KEYS[1], qty_field, ARGV[3], 'updated_at', ARGV[4], 'expires_at', ARGV[5])
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+redis.call('SADD', KEYS[2], ARGV[1])
+local cart = redis.call('HGETALL', KEYS[1])
+table.insert(cart, 1, 'ok')
+return cart
+"""
+
+# Removing the last line deletes the cart. ARGV: buyer_id, product_id, now
+REMOVE_ITEM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'no_cart'}
+end
+if redis.call('HDEL', KEYS[1], 'qty:' .. ARGV[2], 'price:' .. ARGV[2], 'added:' .. ARGV[2]) == 0 then
+    return {'no_item'}
+end
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[3])
+local cart = redis.call('HGETALL', KEYS[1])
+for i = 1, #cart, 2 do
+    if string.sub(cart[i], 1, 4) == 'qty:' then
+        table.insert(cart, 1, 'ok')
+        return cart
+    end
+end
+redis.call('DEL', KEYS[1])
+return {'empty'}
+"""
+
+# Move the cart aside so a concurrent checkout or edit can't see it
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return {'in_progress'}
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'no_cart'}
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+local cart = redis.call('HGETALL', KEYS[2])
+table.insert(cart, 1, 'ok')
+return cart
+"""
+
+
+# Load a cart saved in Postgres unless the buyer already has a live one.
+# ARGV: expires_at (unix seconds), then field/value pairs
+RESTORE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIREAT', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class CartStoreError(ValueError):
+    """Raised when a cart operation is rejected by the store (code says why)"""
+
+    def __init__(self, code: str, current: Optional[Decimal] = None):
+        self.code = code
+        self.current = current
+        super().__init__(code)
+
+
+class StoredCartItem:
+    """One cart line; its id is the product ID (one line per product)"""
+
+    def __init__(self, product_id: int, quantity: Decimal, unit_price_snapshot: Decimal, added_at: datetime):
+        self.id = product_id
+        self.product_id = product_id
+        self.quantity = quantity
+        self.unit_price_snapshot = unit_price_snapshot
+        self.added_at = added_at
+
+
+class StoredCart:
+    """Active cart as read from its Redis hash"""
+
+    status = "ACTIVE"
+
+    def __init__(self, buyer_id: int, fields: Dict[str, str]):
+        self.buyer_id = buyer_id
+        self.id = int(fields["id"])
+        self.farmer_id = int(fields["farmer_id"])
+        self.created_at = datetime.fromisoformat(fields["created_at"])
+        self.updated_at = datetime.fromisoformat(fields["updated_at"])
+        self.expires_at = datetime.fromisoformat(fields["expires_at"])
+
+        items = [
+            StoredCartItem(
+                product_id=int(field[4:]),
+                quantity=Decimal(value).quantize(QUANTITY_STEP),
+                unit_price_snapshot=Decimal(fields[f"price:{field[4:]}"]),
+                added_at=datetime.fromisoformat(fields[f"added:{field[4:]}"])
+            )
+            for field, value in fields.items()
+            if field.startswith("qty:")
+        ]
+        self.items = sorted(items, key=lambda item: (item.added_at, item.product_id))
+
+
+def _pairs(reply: List[str]) -> Dict[str, str]:
+    """Flat HGETALL reply from a script -> dict"""
+    return dict(zip(reply[::2], reply[1::2]))
+
+
+class CartStore:
+    """Active carts in Redis with periodic Postgres snapshots"""
+
+    def __init__(self, ttl_hours: int, snapshot_batch_size: int):
+        self.ttl_seconds = ttl_hours * 3600
+        self.snapshot_batch_size = snapshot_batch_size
+        self._scripts = {}
+
+    @staticmethod
+    def _redis():
+        return get_redis()
+
+    def _script(self, source: str):
+        """Registered script (EVALSHA with automatic reload)"""
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self._redis().register_script(source)
+        return script
+
+    def _expiry(self):
+        """(now, expires_at) as ISO strings for a cart touched now"""
+        now = datetime.utcnow()
+        return now.isoformat(), (now + timedelta(seconds=self.ttl_seconds)).isoformat()
+
+    def _result(self, buyer_id: int, reply: List[str]) -> StoredCart:
+        status, fields = reply[0], reply[1:]
+        if status != "ok":
+            raise CartStoreError(status, Decimal(fields[0]) if fields else None)
+        return StoredCart(buyer_id, _pairs(fields))
+
+    def get(self, buyer_id: int) -> Optional[StoredCart]:
+        """
+        Read a buyer's active cart (one HGETALL, never writes)
+
+        Args:
+            buyer_id: Buyer's user ID
+
+        Returns:
+            StoredCart or None if there is no unexpired cart
+        """
+        fields = self._redis().hgetall(CART_KEY.format(buyer_id=buyer_id))
+        if "id" not in fields:
+            return None
+        return StoredCart(buyer_id, fields)
+
+    def add_item(
+        self,
+        buyer_id: int,
+        farmer_id: int,
+        product_id: int,
+        quantity: Decimal,
+        unit_price: Decimal,
+        quantity_available: Decimal,
+        cart_id: Optional[int] = None
+    ) -> StoredCart:
+        """
+        Add quantity of a product, creating the cart if cart_id is given
+
+        Raises:
+            CartStoreError: different_farmer, new_cart (no cart yet and no
+                cart_id) or insufficient (current quantity in .current)
+        """
+        now, expires_at = self._expiry()
+        reply = self._script(ADD_ITEM_SCRIPT)(
+            keys=[CART_KEY.format(buyer_id=buyer_id), DIRTY_KEY],
+            args=[
+                buyer_id, farmer_id, cart_id or "", product_id,
+                str(quantity), str(unit_price), str(quantity_available),
+                now, expires_at, self.ttl_seconds
+            ]
+        )
+        return self._result(buyer_id, reply)
+
+    def set_quantity(self, buyer_id: int, product_id: int, quantity: Decimal) -> StoredCart:
+        """
+        Replace a line's quantity and refresh the cart's expiry
+
+        Raises:
+            CartStoreError: no_cart or no_item
+        """
+        now, expires_at = self._expiry()
+        reply = self._script(SET_QUANTITY_SCRIPT)(
+            keys=[CART_KEY.format(buyer_id=buyer_id), DIRTY_KEY],
+            args=[buyer_id, product_id, str(quantity), now, expires_at, self.ttl_seconds]
+        )
+        return self._result(buyer_id, reply)
+
+    def remove_item(self, buyer_id: int, product_id: int) -> Optional[StoredCart]:
+        """
+        Remove a line; the cart is deleted with its last line
+
+        Returns:
+            Remaining cart, or None if it is now empty
+
+        Raises:
+            CartStoreError: no_cart or no_item
+        """
+        reply = self._script(REMOVE_ITEM_SCRIPT)(
+            keys=[CART_KEY.format(buyer_id=buyer_id), DIRTY_KEY],
+            args=[buyer_id, product_id, datetime.utcnow().isoformat()]
+        )
+        if reply[0] == "empty":
+            return None
+        return self._result(buyer_id, reply)
+
+    def clear(self, buyer_id: int) -> bool:
+        """Delete a buyer's cart; returns whether there was one"""
+        pipe = self._redis().pipeline()
+        pipe.delete(CART_KEY.format(buyer_id=buyer_id))
+        pipe.sadd(DIRTY_KEY, buyer_id)
+        deleted, _ = pipe.execute()
+        return bool(deleted)
+
+    def claim_for_checkout(self, buyer_id: int) -> StoredCart:
+        """
+        Take the cart out of circulation while an order is created from it
+
+        Raises:
+            CartStoreError: no_cart or in_progress
+        """
+        reply = self._script(CLAIM_SCRIPT)(
+            keys=[CART_KEY.format(buyer_id=buyer_id), CHECKOUT_KEY.format(buyer_id=buyer_id)],
+            args=[]
+        )
+        return self._result(buyer_id, reply)
+
+    def release_checkout(self, buyer_id: int) -> None:
+        """Put a claimed cart back after a failed checkout"""
+        client = self._redis()
+        checkout_key = CHECKOUT_KEY.format(buyer_id=buyer_id)
+        try:
+            restored = client.renamenx(checkout_key, CART_KEY.format(buyer_id=buyer_id))
+        except Exception:
+            # Claimed cart expired meanwhile
+            return
+        if not restored:
+            # A new cart was started meanwhile; it wins
+            client.delete(checkout_key)
+
+    def finish_checkout(self, buyer_id: int) -> None:
+        """Drop a claimed cart once its order is committed"""
+        self._redis().delete(CHECKOUT_KEY.format(buyer_id=buyer_id))
+
+    def restore(self, carts: Iterable[Cart]) -> int:
+        """
+        Load ACTIVE Postgres carts (with their items) into Redis
+
+        Used to carry carts across the move to Redis. A buyer who already has
+        a Redis cart keeps it, and each hash expires at the row's expires_at.
+
+        Args:
+            carts: Cart rows with items loaded
+
+        Returns:
+            Number of carts loaded
+        """
+        restore = self._script(RESTORE_SCRIPT)
+        now = datetime.utcnow()
+        restored = 0
+
+        for cart in carts:
+            if not cart.items or cart.expires_at <= now:
+                continue
+            fields = {
+                "id": cart.id,
+                "farmer_id": cart.farmer_id,
+                "created_at": cart.created_at.isoformat(),
+                "updated_at": cart.updated_at.isoformat(),
+                "expires_at": cart.expires_at.isoformat()
+            }
+            for item in cart.items:
+                fields[f"qty:{item.product_id}"] = str(item.quantity)
+                fields[f"price:{item.product_id}"] = str(item.unit_price_snapshot)
+                fields[f"added:{item.product_id}"] = item.added_at.isoformat()
+
+            expires_at = int((cart.expires_at - datetime(1970, 1, 1)).total_seconds())
+            args = [expires_at] + [value for pair in fields.items() for value in pair]
+            restored += restore(keys=[CART_KEY.format(buyer_id=cart.buyer_id)], args=args)
+
+        return restored
+
+    @staticmethod
+    def write_carts(db: Session, carts: Iterable[StoredCart], status: str = "ACTIVE") -> None:
+        """
+        Upsert carts and replace their items (caller commits)
+
+        A row already CHECKED_OUT is never reopened, so a snapshot that read a
+        cart just before its checkout can't undo it.
+
+        Args:
+            db: Database session
+            carts: Carts to write
+            status: Status to record on the cart rows
+        """
+        carts = list(carts)
+        if not carts:
+            return
+
+        statement = pg_insert(Cart).values([
+            {
+                "id": cart.id,
+                "buyer_id": cart.buyer_id,
+                "farmer_id": cart.farmer_id,
+                "status": status,
+                "created_at": cart.created_at,
+                "updated_at": cart.updated_at,
+                "expires_at": cart.expires_at
+            }
+            for cart in carts
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[Cart.id],
+            set_={
+                "status": statement.excluded.status,
+                "updated_at": statement.excluded.updated_at,
+                "expires_at": statement.excluded.expires_at
+            },
+            where=Cart.status != "CHECKED_OUT"
+        ))
+
+        db.execute(delete(CartItem).where(CartItem.cart_id.in_([cart.id for cart in carts])))
+        rows = [
+            {
+                "cart_id": cart.id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price_snapshot": item.unit_price_snapshot,
+                "added_at": item.added_at,
+                "updated_at": cart.updated_at
+            }
+            for cart in carts
+            for item in cart.items
+        ]
+        if rows:
+            db.execute(insert(CartItem), rows)
+
+    @staticmethod
+    def _close_stale_rows(db: Session, buyer_ids: List[int], live_cart_ids: List[int]) -> None:
+        """Close ACTIVE rows of these buyers whose Redis cart is gone"""
+        now = datetime.utcnow()
+        db.execute(
+            update(Cart).where(
+                Cart.buyer_id.in_(buyer_ids),
+                Cart.status == "ACTIVE",
+                Cart.id.notin_(live_cart_ids)
+            ).values(
+                status=case((Cart.expires_at < now, "EXPIRED"), else_="ABANDONED"),
+                updated_at=now
+            ).execution_options(synchronize_session=False)
+        )
+
+    def _claim_dirty(self, client) -> List[int]:
+        """Move the dirty set aside (a leftover from a failed run goes first)"""
+        if not client.exists(SNAPSHOTTING_KEY):
+            try:
+                client.rename(DIRTY_KEY, SNAPSHOTTING_KEY)
+            except Exception:
+                # No cart changed since the last snapshot
+                return []
+        return sorted(int(buyer_id) for buyer_id in client.smembers(SNAPSHOTTING_KEY))
+
+    def snapshot(self, db: Session) -> int:
+        """
+        Write carts changed since the last snapshot to Postgres
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of buyers whose cart rows were refreshed
+        """
+        client = self._redis()
+        buyer_ids = self._claim_dirty(client)
+
+        for start in range(0, len(buyer_ids), self.snapshot_batch_size):
+            batch = buyer_ids[start:start + self.snapshot_batch_size]
+
+            pipe = client.pipeline(transaction=False)
+            for buyer_id in batch:
+                pipe.hgetall(CART_KEY.format(buyer_id=buyer_id))
+            carts = [
+                StoredCart(buyer_id, fields)
+                for buyer_id, fields in zip(batch, pipe.execute())
+                if "id" in fields
+            ]
+
+            self.write_carts(db, carts)
+            self._close_stale_rows(db, batch, [cart.id for cart in carts])
+            db.commit()
+            client.srem(SNAPSHOTTING_KEY, *batch)
+
+        client.delete(SNAPSHOTTING_KEY)
+        return len(buyer_ids)
+
+    @staticmethod
+    def allocate_cart_id(db: Session) -> int:
+        """Take the next carts.id so the snapshot row keeps the ID the buyer saw"""
+        return db.execute(text("SELECT nextval(pg_get_serial_sequence('carts', 'id'))")).scalar_one()
+
+
+cart_store = CartStore(
+    ttl_hours=settings.CART_EXPIRY_HOURS,
+    snapshot_batch_size=settings.CART_SNAPSHOT_BATCH_SIZE
+)
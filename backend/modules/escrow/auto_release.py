@@ -0,0 +1,239 @@
+"""
+Escrow auto-release engine
+Claims due HELD escrows in batches and pays them out with bounded
+concurrency. Each claim sets a short lease on the rows (taken with
+FOR UPDATE SKIP LOCKED) so two scheduler processes never release the same
+escrow, and an escrow whose release failed is retried once the lease ends.
+The scheduler runs the engine on its own event loop, so the synchronous
+database work here never blocks request handling.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+import asyncio
+import json
+import logging
+import time
+
+from config import settings
+from database import SessionLocal, get_redis
+from integrations.paystack import paystack_client
+from models import EscrowTransaction, EscrowStatus, Order, User
+from modules.escrow.service import EscrowService
+
+logger = logging.getLogger(__name__)
+
+BULK_TRANSFER_LIMIT = 100  # Paystack's maximum per /transfer/bulk call
+LAST_RUN_KEY = "escrow_release:last_run"
+
+
+class EscrowReleaseEngine:
+    """Batched, concurrent release of escrows past their auto-release date"""
+
+    def __init__(self, batch_size: int, concurrency: int, lease_minutes: int, bulk_transfers: bool):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.lease = timedelta(minutes=lease_minutes)
+        self.bulk_transfers = bulk_transfers
+
+    def claim_batch(self, db: Session) -> List[int]:
+        """
+        Lease the next batch of due escrows to this run
+
+        Args:
+            db: Database session (committed before returning)
+
+        Returns:
+            Claimed escrow IDs, oldest auto-release date first
+        """
+        now = datetime.utcnow()
+        due = (
+            select(EscrowTransaction.id)
+            .where(
+                EscrowTransaction.status == EscrowStatus.HELD,
+                EscrowTransaction.auto_release_date <= now,
+                or_(
+                    EscrowTransaction.release_claimed_until.is_(None),
+                    EscrowTransaction.release_claimed_until < now
+                )
+            )
+            .order_by(EscrowTransaction.auto_release_date, EscrowTransaction.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = db.execute(
+            update(EscrowTransaction)
+            .where(EscrowTransaction.id.in_(due.scalar_subquery()))
+            .values(release_claimed_until=now + self.lease)
+            .returning(EscrowTransaction.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        return list(claimed)
+
+    async def _release_one(self, escrow_id: int, semaphore: asyncio.Semaphore) -> bool:
+        """Release one escrow through the regular single-transfer path"""
+        async with semaphore:
+            db = SessionLocal()
+            try:
+                await EscrowService.release_escrow(db, escrow_id)
+                return True
+            except Exception as e:
+                db.rollback()
+                detail = getattr(e, "detail", None) or str(e)
+                logger.error(f"Failed to auto-release escrow {escrow_id}: {detail}")
+                return False
+            finally:
+                db.close()
+
+    async def _release_individually(self, escrow_ids: List[int]) -> int:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._release_one(escrow_id, semaphore) for escrow_id in escrow_ids))
+        return sum(results)
+
+    async def _release_bulk(self, escrow_ids: List[int]) -> int:
+        """Release a batch with one Paystack bulk transfer per 100 escrows"""
+        db = SessionLocal()
+        try:
+            rows = db.query(EscrowTransaction, Order, User).join(
+                Order, Order.id == EscrowTransaction.order_id
+            ).join(
+                User, User.id == Order.seller_id
+            ).filter(
+                EscrowTransaction.id.in_(escrow_ids),
+                EscrowTransaction.status == EscrowStatus.HELD
+            ).all()
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            released = []
+
+            # Transfers an earlier attempt sent but never recorded (Paystack calls only)
+            async def check_prior(escrow: EscrowTransaction):
+                async with semaphore:
+                    try:
+                        return await EscrowService.prior_transfer(escrow)
+                    except Exception as e:
+                        logger.error(f"Could not check earlier transfer for escrow {escrow.id}: {getattr(e, 'detail', e)}")
+                        return False
+
+            retried = [row for row in rows if row[0].transfer_reference]
+            priors = await asyncio.gather(*(check_prior(escrow) for escrow, _, _ in retried))
+            skipped = set()
+            for (escrow, order, _), prior in zip(retried, priors):
+                if prior is False:
+                    skipped.add(escrow.id)  # Unknown outcome: leave it for the lease to expire
+                elif prior is not None:
+                    EscrowService.mark_released(escrow, order, prior.get("transfer_code"))
+                    released.append(escrow)
+                    skipped.add(escrow.id)
+
+            # First payouts are rare, so recipients are created one after another on this session
+            pending = [row for row in rows if row[0].id not in skipped]
+            for seller in {seller.id: seller for _, _, seller in pending if not seller.paystack_recipient_code}.values():
+                try:
+                    await EscrowService.ensure_transfer_recipient(db, seller)
+                except Exception as e:
+                    logger.error(f"Failed to create transfer recipient for seller {seller.id}: {getattr(e, 'detail', e)}")
+
+            payable = [(escrow, order, seller) for escrow, order, seller in pending if seller.paystack_recipient_code]
+
+            # Persist every reference before Paystack can act on it
+            for escrow, _, _ in payable:
+                EscrowService.assign_transfer_reference(escrow)
+            db.commit()
+
+            for start in range(0, len(payable), BULK_TRANSFER_LIMIT):
+                chunk = payable[start:start + BULK_TRANSFER_LIMIT]
+                result = await paystack_client.initiate_bulk_transfer([
+                    {
+                        "amount": float(escrow.seller_payout),
+                        "recipient_code": seller.paystack_recipient_code,
+                        "reason": f"Payment for order #{order.order_number}",
+                        "reference": escrow.transfer_reference
+                    }
+                    for escrow, order, seller in chunk
+                ])
+
+                if not result["success"]:
+                    logger.error(f"Bulk transfer of {len(chunk)} escrows failed: {result.get('error')}")
+                    continue
+
+                for escrow, order, _ in chunk:
+                    transfer = result["transfers"].get(escrow.transfer_reference)
+                    if transfer is None or transfer["status"] == "failed":
+                        logger.error(f"Bulk transfer for escrow {escrow.id} was not queued")
+                        continue
+                    EscrowService.mark_released(escrow, order, transfer["transfer_code"])
+                    released.append(escrow)
+
+            db.commit()
+
+            async def notify(escrow: EscrowTransaction):
+                async with semaphore:
+                    await EscrowService.notify_released(escrow)
+
+            await asyncio.gather(*(notify(escrow) for escrow in released))
+            return len(released)
+
+        finally:
+            db.close()
+
+    def _record(self, stats: Dict[str, Any]) -> None:
+        try:
+            get_redis().set(LAST_RUN_KEY, json.dumps(stats))
+        except Exception as e:
+            logger.warning(f"Could not store escrow release stats: {e}")
+
+    def last_run(self) -> Dict[str, Any]:
+        """Stats of the most recent run across all processes (empty if none)"""
+        raw = get_redis().get(LAST_RUN_KEY)
+        return json.loads(raw) if raw else {}
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Release every due escrow, one claimed batch at a time
+
+        Returns:
+            Dict with claimed, released and failed counts, elapsed seconds
+            and releases per second
+        """
+        started = time.perf_counter()
+        claimed = released = 0
+
+        while True:
+            db = SessionLocal()
+            try:
+                escrow_ids = self.claim_batch(db)
+            finally:
+                db.close()
+
+            if not escrow_ids:
+                break
+
+            claimed += len(escrow_ids)
+            if self.bulk_transfers:
+                released += await self._release_bulk(escrow_ids)
+            else:
+                released += await self._release_individually(escrow_ids)
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            "mode": "bulk" if self.bulk_transfers else "individual",
+            "claimed": claimed,
+            "released": released,
+            "failed": claimed - released,
+            "seconds": round(elapsed, 2),
+            "per_second": round(released / elapsed, 1) if elapsed > 0 else 0.0,
+            "finished_at": datetime.utcnow().isoformat()
+        }
+        self._record(stats)
+        return stats
+
+
+escrow_release_engine = EscrowReleaseEngine(
+    batch_size=settings.ESCROW_RELEASE_BATCH_SIZE,
+    concurrency=settings.ESCROW_RELEASE_CONCURRENCY,
+    lease_minutes=settings.ESCROW_RELEASE_LEASE_MINUTES,
+    bulk_transfers=settings.ESCROW_RELEASE_BULK_TRANSFERS
+)
@@ -4,7 +4,7 @@ Business logic for escrow and payment operations
 """
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -160,20 +160,39 @@ class EscrowService:
 
     @staticmethod
     async def process_payment_webhook(db: Session, reference: str, amount: float, customer_email: str, metadata: Dict):
-        """Process payment webhook from Paystack"""
+        """
+        Process payment webhook from Paystack
+
+        Safe to replay: a payment whose escrow already exists (recorded by
+        verify_payment or an earlier delivery) is skipped. A concurrent insert
+        surfaces as IntegrityError for the caller to treat as a duplicate.
+        """
+        if db.query(EscrowTransaction.id).filter(EscrowTransaction.paystack_reference == reference).first():
+            logger.info(f"Escrow already recorded for payment {reference}")
+            return
+
         order_id = metadata.get("order_id")
-        order = db.query(Order).filter(Order.id == order_id).first()
+        if order_id:
+            order = db.query(Order).filter(Order.id == order_id).first()
+        else:
+            order = db.query(Order).filter(Order.paystack_reference == reference).first()
 
         if not order:
             logger.error(f"Order {order_id} not found for payment {reference}")
             return
 
+        if order.payment_status == PaymentStatus.PAID:
+            logger.info(f"Order {order.id} already paid, skipping payment {reference}")
+            return
+
         # Create escrow
         platform_fee = float(order.platform_fee)
         seller_payout = float(order.subtotal)
 
         escrow = EscrowTransaction(
             order_id=order.id,
+            buyer_id=order.buyer_id,
+            seller_id=order.seller_id,
             amount=Decimal(str(amount)),
             platform_fee=Decimal(str(platform_fee)),
             seller_payout=Decimal(str(seller_payout)),
@@ -188,39 +207,31 @@ class EscrowService:
         db.add(escrow)
         db.commit()
 
-        # Send SMS notifications
-        seller = db.query(User).filter(User.id == order.seller_id).first()
-        buyer = db.query(User).filter(User.id == order.buyer_id).first()
+        # Send SMS notifications (the escrow is committed; a failed SMS
+        # mustn't make the event retry)
+        try:
+            seller = db.query(User).filter(User.id == order.seller_id).first()
+            buyer = db.query(User).filter(User.id == order.buyer_id).first()
 
-        if seller:
-            await mnotify_client.send_sms(
-                "0545142039",#seller.phone_number,
-                f"New order #{order.order_number} paid! Amount: GH₵{seller_payout:.2f}. Please ship the order."
-            )
+            if seller:
+                await mnotify_client.send_sms(
+                    "0545142039",#seller.phone_number,
+                    f"New order #{order.order_number} paid! Amount: GH₵{seller_payout:.2f}. Please ship the order."
+                )
 
-        if buyer:
-            await mnotify_client.send_sms(
-                buyer.phone_number,
-                f"Payment successful for order #{order.order_number}. Total: GH₵{amount:.2f}. Seller will ship soon."
-            )
+            if buyer:
+                await mnotify_client.send_sms(
+                    buyer.phone_number,
+                    f"Payment successful for order #{order.order_number}. Total: GH₵{amount:.2f}. Seller will ship soon."
+                )
+        except Exception as e:
+            logger.error(f"Failed to send notifications: {e}")
 
-        logger.info(f"Escrow created for order {order_id}, reference {reference}")
+        logger.info(f"Escrow created for order {order.id}, reference {reference}")
 
     @staticmethod
-    async def release_escrow(db: Session, escrow_id: int) -> Dict[str, Any]:
-        """Release escrow to seller"""
-        escrow = db.query(EscrowTransaction).filter(EscrowTransaction.id == escrow_id).first()
-
-        if not escrow:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Escrow not found")
-
-        if escrow.status != EscrowStatus.HELD:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot release escrow with status: {escrow.status}")
-
-        order = db.query(Order).filter(Order.id == escrow.order_id).first()
-        seller = db.query(User).filter(User.id == order.seller_id).first()
-
-        # Create recipient if needed
+    async def ensure_transfer_recipient(db: Session, seller: User) -> str:
+        """Seller's Paystack recipient code, created on their first payout"""
         if not seller.paystack_recipient_code:
             recipient_result = await paystack_client.create_transfer_recipient(
                 account_name=seller.account_name,
@@ -234,27 +245,107 @@ class EscrowService:
             else:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create recipient")
 
-        # Initiate transfer
-        transfer_ref = f"TRF-{escrow.id}-{uuid.uuid4().hex[:8]}"
-        transfer_result = await paystack_client.initiate_transfer(
-            amount=float(escrow.seller_payout),
-            recipient_code=seller.paystack_recipient_code,
-            reason=f"Payment for order #{order.order_number}",
-            reference=transfer_ref
+        return seller.paystack_recipient_code
+
+    @staticmethod
+    async def prior_transfer(escrow: EscrowTransaction) -> Optional[Dict[str, Any]]:
+        """
+        Paystack's record of the transfer sent under the escrow's stored reference
+
+        A payout whose response was lost (timeout, crash) may still have been
+        accepted; checking it first means a retry never pays the seller twice.
+
+        Returns:
+            The transfer if Paystack accepted it, else None. A failed or reversed
+            transfer clears the stored reference so the next attempt gets a new one.
+
+        Raises:
+            HTTPException: If the earlier transfer can't be checked (retry later)
+        """
+        if not escrow.transfer_reference:
+            return None
+
+        result = await paystack_client.verify_transfer(escrow.transfer_reference)
+        if result["success"]:
+            if result["status"] in ("failed", "reversed"):
+                escrow.transfer_reference = None
+                return None
+            return result
+        if result.get("not_found"):
+            return None
+
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Could not verify transfer {escrow.transfer_reference}: {result.get('error')}"
         )
 
-        if transfer_result["success"]:
-            escrow.status = EscrowStatus.RELEASED
-            escrow.released_at = datetime.utcnow()
-            escrow.transfer_reference = transfer_ref
-            order.status = OrderStatus.COMPLETED
+    @staticmethod
+    def assign_transfer_reference(escrow: EscrowTransaction) -> str:
+        """
+        Payout reference for the escrow, reused by every retry until Paystack
+        reports that transfer failed (caller commits it before sending)
+        """
+        if not escrow.transfer_reference:
+            escrow.transfer_reference = f"TRF-{escrow.id}-{uuid.uuid4().hex[:8]}"
+        return escrow.transfer_reference
 
-            db.commit()
+    @staticmethod
+    def mark_released(escrow: EscrowTransaction, order: Order, transfer_code: str = None) -> None:
+        """Record an initiated payout on the escrow and order (caller commits)"""
+        escrow.status = EscrowStatus.RELEASED
+        escrow.released_at = datetime.utcnow()
+        if transfer_code:
+            escrow.paystack_transfer_code = transfer_code
+        order.status = OrderStatus.COMPLETED
 
+    @staticmethod
+    async def notify_released(escrow: EscrowTransaction) -> None:
+        """Tell the seller their payout is on its way (never raises)"""
+        try:
             await mnotify_client.send_sms(
                 "0545142039",#seller.phone_number,
                 f"Payment released! GH₵{float(escrow.seller_payout):.2f} transferred to your account."
             )
+        except Exception as e:
+            logger.error(f"Failed to send release notification for escrow {escrow.id}: {e}")
+
+    @staticmethod
+    async def release_escrow(db: Session, escrow_id: int) -> Dict[str, Any]:
+        """Release escrow to seller"""
+        escrow = db.query(EscrowTransaction).filter(EscrowTransaction.id == escrow_id).first()
+
+        if not escrow:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Escrow not found")
+
+        if escrow.status != EscrowStatus.HELD:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot release escrow with status: {escrow.status}")
+
+        order = db.query(Order).filter(Order.id == escrow.order_id).first()
+        seller = db.query(User).filter(User.id == order.seller_id).first()
+
+        transfer_result = await EscrowService.prior_transfer(escrow)
+
+        if transfer_result is None:
+            # Create recipient if needed
+            recipient_code = await EscrowService.ensure_transfer_recipient(db, seller)
+
+            # Persist the reference before Paystack can act on it
+            transfer_ref = EscrowService.assign_transfer_reference(escrow)
+            db.commit()
+
+            # Initiate transfer
+            transfer_result = await paystack_client.initiate_transfer(
+                amount=float(escrow.seller_payout),
+                recipient_code=recipient_code,
+                reason=f"Payment for order #{order.order_number}",
+                reference=transfer_ref
+            )
+
+        if transfer_result["success"]:
+            EscrowService.mark_released(escrow, order, transfer_result.get("transfer_code"))
+            db.commit()
+
+            await EscrowService.notify_released(escrow)
 
             return {"success": True, "message": "Escrow released successfully"}
         else:
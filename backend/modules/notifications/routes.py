@@ -3,11 +3,11 @@ Notifications Routes
 API endpoints for notifications
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
-from database import get_db
+from database import get_async_db
 from models import User
 from modules.auth.dependencies import get_current_verified_user
 from modules.notifications.service import NotificationService
@@ -28,7 +28,7 @@ async def get_notifications(
     offset: int = Query(0, ge=0),
     unread_only: bool = Query(False),
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user notifications
@@ -41,8 +41,8 @@ async def get_notifications(
     - **unread_only**: Only return unread notifications (default: false)
     """
     try:
-        notifications = NotificationService.get_user_notifications(
-            db=db,
+        notifications = await db.run_sync(
+            NotificationService.get_user_notifications,
             user_id=current_user.id,
             limit=limit,
             offset=offset,
@@ -62,7 +62,7 @@ async def get_notifications(
 @router.get("/unread", response_model=UnreadCountResponse)
 async def get_unread_count(
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get unread notification count
@@ -72,7 +72,7 @@ async def get_unread_count(
     Returns the count of unread notifications for the current user
     """
     try:
-        count = NotificationService.get_unread_count(db, current_user.id)
+        count = await db.run_sync(NotificationService.get_unread_count, current_user.id)
         return UnreadCountResponse(unread_count=count)
 
     except Exception as e:
@@ -87,7 +87,7 @@ async def get_unread_count(
 async def mark_notification_as_read(
     notification_id: int,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark notification as read
@@ -97,8 +97,8 @@ async def mark_notification_as_read(
     Only the notification owner can mark it as read
     """
     try:
-        notification = NotificationService.mark_as_read(
-            db=db,
+        notification = await db.run_sync(
+            NotificationService.mark_as_read,
             notification_id=notification_id,
             user_id=current_user.id
         )
@@ -124,7 +124,7 @@ async def mark_notification_as_read(
 @router.put("/read-all", response_model=MessageResponse)
 async def mark_all_as_read(
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark all notifications as read
@@ -134,7 +134,7 @@ async def mark_all_as_read(
     Marks all unread notifications for the current user as read
     """
     try:
-        count = NotificationService.mark_all_as_read(db, current_user.id)
+        count = await db.run_sync(NotificationService.mark_all_as_read, current_user.id)
 
         return MessageResponse(
             success=True,
@@ -153,7 +153,7 @@ async def mark_all_as_read(
 async def delete_notification(
     notification_id: int,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete notification
@@ -163,8 +163,8 @@ async def delete_notification(
     Only the notification owner can delete it
     """
     try:
-        success = NotificationService.delete_notification(
-            db=db,
+        success = await db.run_sync(
+            NotificationService.delete_notification,
             notification_id=notification_id,
             user_id=current_user.id
         )
@@ -3,12 +3,15 @@ Order Management Routes
 API endpoints for order operations
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi.responses import Response
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Any, List
 import logging
 import math
 
-from database import get_db, SessionLocal
+from database import get_db, get_async_db, SessionLocal
 from modules.notifications.service import notify_order_created, notify_order_shipped
 from models import User, UserType
 from modules.auth.dependencies import get_current_verified_user, get_current_buyer, get_current_farmer
@@ -50,6 +53,28 @@ async def background_notify_order_shipped(order_id: int, buyer_id: int):
         db.close()
 
 
+# Every OrderResponse field with its default, in schema order
+ORDER_RESPONSE_DEFAULTS = {
+    name: None if field.is_required() else field.get_default()
+    for name, field in OrderResponse.model_fields.items()
+}
+
+
+def serialize_order_list(orders: List[Dict[str, Any]], **page) -> Response:
+    """
+    JSON response for an order list page without re-validating trusted rows
+
+    The service already shapes rows into OrderResponse fields (floats, enum
+    values, datetimes), so the page is encoded directly by pydantic-core.
+    """
+    body = to_json({
+        "success": True,
+        **page,
+        "orders": [{**ORDER_RESPONSE_DEFAULTS, **order} for order in orders]
+    })
+    return Response(content=body, media_type="application/json")
+
+
 @router.post("", response_model=CreateOrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: CreateOrderRequest,
@@ -110,7 +135,7 @@ async def list_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List orders for current user
@@ -126,100 +151,27 @@ async def list_orders(
     - **page_size**: Items per page
     """
     try:
-        orders, total = OrderService.list_user_orders(
-            db=db,
-            user_id=current_user.id,
-            user_type=current_user.user_type.value,
-            status=order_status,
-            page=page,
-            page_size=page_size
-        )
+        def _list_orders(session: Session):
+            return OrderService.list_user_orders(
+                db=session,
+                user_id=current_user.id,
+                user_type=current_user.user_type.value,
+                status=order_status,
+                page=page,
+                page_size=page_size
+            )
+
+        orders, total = await db.run_sync(_list_orders)
 
         # Calculate total pages
         total_pages = math.ceil(total / page_size) if total > 0 else 1
 
-        # Convert to response models with buyer/seller info
-        order_responses = []
-        for o in orders:
-            # Build order dict manually to avoid ORM relationship issues
-            order_dict = {
-                'id': o.id,
-                'order_number': o.order_number,
-                'buyer_id': o.buyer_id,
-                'seller_id': o.seller_id,
-                'product_id': o.product_id,
-                'quantity': float(o.quantity) if o.quantity else 0,
-                'unit_price': float(o.unit_price) if o.unit_price else 0,
-                'subtotal': float(o.subtotal) if o.subtotal else 0,
-                'delivery_fee': float(o.delivery_fee) if o.delivery_fee else 0,
-                'platform_fee': float(o.platform_fee) if o.platform_fee else 0,
-                'total_amount': float(o.total_amount) if o.total_amount else 0,
-                'status': o.status.value if hasattr(o.status, 'value') else str(o.status),
-                'payment_status': o.payment_status.value if hasattr(o.payment_status, 'value') else str(o.payment_status),
-                'delivery_method': o.delivery_method.value if hasattr(o.delivery_method, 'value') else str(o.delivery_method),
-                'delivery_address': o.delivery_address,
-                'delivery_region': o.delivery_region,
-                'delivery_district': o.delivery_district,
-                'delivery_town_city': o.delivery_town_city,
-                'delivery_gps_address': o.delivery_gps_address,
-                'delivery_phone': o.delivery_phone,
-                'tracking_number': o.tracking_number,
-                'carrier': o.carrier,
-                'shipped_at': o.shipped_at,
-                'delivered_at': o.delivered_at,
-                'estimated_delivery_date': getattr(o, 'expected_delivery_date', None),
-                'buyer_notes': o.buyer_notes,
-                'seller_notes': o.seller_notes,
-                'admin_notes': o.admin_notes,
-                'pickup_confirmed_by_farmer': o.pickup_confirmed_by_farmer or False,
-                'pickup_confirmed_by_buyer': o.pickup_confirmed_by_buyer or False,
-                'pickup_confirmed_at': o.pickup_confirmed_at,
-                'created_at': o.created_at,
-                'updated_at': o.updated_at,
-            }
-
-            # Add buyer info if relationship is loaded
-            if o.buyer:
-                order_dict['buyer_name'] = o.buyer.full_name
-                order_dict['buyer_phone'] = o.buyer.phone_number
-                order_dict['buyer'] = {
-                    'id': o.buyer.id,
-                    'full_name': o.buyer.full_name,
-                    'phone_number': o.buyer.phone_number,
-                    'email': o.buyer.email
-                }
-            # Add seller info if relationship is loaded
-            if o.seller:
-                order_dict['seller_name'] = o.seller.full_name
-                order_dict['seller_phone'] = o.seller.phone_number
-            # Add items if relationship is loaded
-            if o.items:
-                order_dict['items'] = [
-                    {
-                        'id': item.id,
-                        'product_id': item.product_id,
-                        'product_name_snapshot': item.product_name_snapshot,
-                        'unit_of_measure_snapshot': item.unit_of_measure_snapshot,
-                        'product_image_snapshot': item.product_image_snapshot,
-                        'quantity': float(item.quantity),
-                        'unit_price': float(item.unit_price),
-                        'subtotal': float(item.subtotal)
-                    }
-                    for item in o.items
-                ]
-                # Add product info from first item
-                if len(o.items) > 0:
-                    order_dict['product_name'] = o.items[0].product_name_snapshot
-                    order_dict['product_image'] = o.items[0].product_image_snapshot
-            order_responses.append(OrderResponse(**order_dict))
-
-        return OrderListResponse(
-            success=True,
+        return serialize_order_list(
+            orders,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages,
-            orders=order_responses
+            total_pages=total_pages
         )
 
     except Exception as e:
@@ -234,7 +186,7 @@ async def list_orders(
 async def get_order(
     order_id: int,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get order details by ID
@@ -244,7 +196,9 @@ async def get_order(
     Only the buyer or seller can view the order details
     """
     try:
-        order, product_info, seller_info, buyer_info = OrderService.get_order_with_details(db, order_id)
+        order, product_info, seller_info, buyer_info = await db.run_sync(
+            OrderService.get_order_with_details, order_id
+        )
 
         if not order:
             raise HTTPException(
@@ -253,7 +207,7 @@ async def get_order(
             )
 
         # Verify user has access to this order
-        if order.buyer_id != current_user.id and order.seller_id != current_user.id:
+        if order["buyer_id"] != current_user.id and order["seller_id"] != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have access to this order"
@@ -261,7 +215,7 @@ async def get_order(
 
         return OrderDetailResponse(
             success=True,
-            order=OrderResponse.from_orm(order),
+            order=OrderResponse(**order),
             product=product_info,
             seller=seller_info,
             buyer=buyer_info
@@ -485,7 +439,7 @@ async def confirm_pickup(
 async def get_order_tracking(
     order_id: int,
     current_user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get order tracking information
@@ -495,7 +449,7 @@ async def get_order_tracking(
     Returns tracking details including status history and delivery updates
     """
     try:
-        order = OrderService.get_order_by_id(db, order_id)
+        order = await db.run_sync(OrderService.get_order_tracking, order_id)
 
         if not order:
             raise HTTPException(
@@ -518,7 +472,7 @@ async def get_order_tracking(
             "carrier": order.carrier,
             "shipped_at": order.shipped_at.isoformat() if order.shipped_at else None,
             "delivered_at": order.delivered_at.isoformat() if order.delivered_at else None,
-            "estimated_delivery_date": order.estimated_delivery_date.isoformat() if order.estimated_delivery_date else None,
+            "estimated_delivery_date": order.expected_delivery_date.isoformat() if order.expected_delivery_date else None,
             "delivery_address": order.delivery_address,
             "delivery_phone": order.delivery_phone,
             "status_history": [
@@ -2,23 +2,137 @@
 Order Management Service
 Business logic for order operations
 """
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, desc
+from sqlalchemy.orm import Session, joinedload, aliased
+from sqlalchemy import or_, and_, desc, func, select, literal_column, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from fastapi import HTTPException, status
 from typing import Optional, Dict, Any, List, Tuple
 import logging
-from datetime import datetime
+from datetime import datetime, time
 from decimal import Decimal
 import random
 import string
 
-from models import Order, OrderStatus, PaymentStatus, Product, User, UserType
+from models import Order, OrderItem, OrderStatus, PaymentStatus, Product, User, UserType, EscrowTransaction
 from modules.orders.schemas import CreateOrderRequest, ShipOrderRequest, DeliverOrderRequest, CancelOrderRequest
 from modules.products.service import ProductService
 
 logger = logging.getLogger(__name__)
 
 
+# Order columns in OrderResponse field names
+ORDER_RESPONSE_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.buyer_id,
+    Order.seller_id,
+    Order.product_id,
+    Order.quantity_ordered.label("quantity"),
+    Order.unit_price,
+    Order.subtotal,
+    Order.delivery_fee,
+    Order.platform_fee,
+    Order.total_amount,
+    Order.status,
+    Order.payment_status,
+    Order.delivery_method,
+    Order.delivery_address,
+    Order.delivery_region,
+    Order.delivery_district,
+    Order.delivery_gps.label("delivery_gps_address"),
+    Order.delivery_phone,
+    Order.tracking_number,
+    Order.carrier,
+    Order.shipped_at,
+    Order.delivered_at,
+    Order.expected_delivery_date.label("estimated_delivery_date"),
+    Order.buyer_notes,
+    Order.seller_notes,
+    Order.pickup_confirmed_by_farmer,
+    Order.pickup_confirmed_by_buyer,
+    Order.pickup_confirmed_at,
+    Order.created_at,
+    Order.updated_at,
+)
+
+ORDER_RESPONSE_FIELDS = tuple(column.key for column in ORDER_RESPONSE_COLUMNS)
+
+TRACKING_COLUMNS = (
+    Order.buyer_id,
+    Order.seller_id,
+    Order.order_number,
+    Order.status,
+    Order.tracking_number,
+    Order.carrier,
+    Order.shipped_at,
+    Order.delivered_at,
+    Order.expected_delivery_date,
+    Order.delivery_address,
+    Order.delivery_phone,
+    Order.created_at,
+)
+
+
+def order_items_json():
+    """
+    Correlated subquery aggregating an order's items (with current product
+    image) into a JSON array, oldest first
+    """
+    item_product = aliased(Product)
+    fields = {
+        "id": OrderItem.id,
+        "product_id": OrderItem.product_id,
+        "product_name_snapshot": OrderItem.product_name_snapshot,
+        "unit_of_measure_snapshot": OrderItem.unit_of_measure_snapshot,
+        "product_image": item_product.primary_image_url,
+        "quantity": OrderItem.quantity,
+        "unit_price": OrderItem.unit_price,
+        "subtotal": OrderItem.subtotal,
+    }
+    # Keys are inlined: json_build_object's arguments are untyped, so
+    # asyncpg can't infer a type for bound keys
+    item = func.json_build_object(*[
+        arg for key, column in fields.items()
+        for arg in (literal_column(f"'{key}'"), column)
+    ])
+    return select(
+        func.json_agg(aggregate_order_by(item, OrderItem.id), type_=JSON)
+    ).select_from(OrderItem).outerjoin(
+        item_product, item_product.id == OrderItem.product_id
+    ).where(
+        OrderItem.order_id == Order.id
+    ).correlate(Order).scalar_subquery()
+
+
+def build_order_dict(row, items: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    OrderResponse fields from a row holding ORDER_RESPONSE_COLUMNS
+
+    Args:
+        row: Projected order row
+        items: Aggregated order items (from order_items_json), if any
+    """
+    mapping = row._mapping
+    order = {field: mapping[field] for field in ORDER_RESPONSE_FIELDS}
+    for field in ("quantity", "unit_price", "subtotal", "delivery_fee", "platform_fee", "total_amount"):
+        order[field] = float(order[field]) if order[field] else 0
+    for field in ("status", "payment_status", "delivery_method"):
+        order[field] = order[field].value
+    order["delivery_town_city"] = order["delivery_district"]  # Orders have no town/city column
+    if order["estimated_delivery_date"] is not None:
+        # Date column, datetime in the response schema
+        order["estimated_delivery_date"] = datetime.combine(order["estimated_delivery_date"], time.min)
+
+    if items:
+        for item in items:
+            item["product_image_snapshot"] = item.pop("product_image")
+        order["items"] = items
+        order["product_name"] = items[0]["product_name_snapshot"]
+        order["product_image"] = items[0]["product_image_snapshot"]
+
+    return order
+
+
 class OrderService:
     """Service for order management operations"""
 
@@ -160,44 +274,94 @@ class OrderService:
         ).filter(Order.id == order_id).first()
 
     @staticmethod
-    def get_order_with_details(db: Session, order_id: int) -> Tuple[Optional[Order], Optional[Dict], Optional[Dict], Optional[Dict]]:
-        """Get order with product, seller, and buyer information"""
-        order = OrderService.get_order_by_id(db, order_id)
+    def get_order_with_details(db: Session, order_id: int) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict], Optional[Dict]]:
+        """
+        Get order with product, seller, and buyer information
 
-        if not order:
+        One statement: order columns, product/seller/buyer/escrow columns via
+        outer joins and the items aggregated as JSON.
+
+        Returns:
+            Tuple of (order dict in OrderResponse fields, product_info, seller_info, buyer_info)
+        """
+        buyer = aliased(User)
+        seller = aliased(User)
+
+        row = db.query(
+            *ORDER_RESPONSE_COLUMNS,
+            EscrowTransaction.admin_notes,
+            Product.id.label("product_ref_id"),
+            Product.product_name.label("product_ref_name"),
+            Product.category.label("product_category"),
+            Product.primary_image_url.label("product_image_url"),
+            Product.unit_of_measure.label("product_unit"),
+            seller.id.label("seller_ref_id"),
+            seller.full_name.label("seller_full_name"),
+            seller.phone_number.label("seller_phone_number"),
+            seller.region.label("seller_region"),
+            seller.farm_name.label("seller_farm_name"),
+            buyer.id.label("buyer_ref_id"),
+            buyer.full_name.label("buyer_full_name"),
+            buyer.phone_number.label("buyer_phone_number"),
+            buyer.region.label("buyer_region"),
+            order_items_json().label("items")
+        ).outerjoin(
+            Product, Product.id == Order.product_id
+        ).outerjoin(
+            seller, seller.id == Order.seller_id
+        ).outerjoin(
+            buyer, buyer.id == Order.buyer_id
+        ).outerjoin(
+            EscrowTransaction, EscrowTransaction.order_id == Order.id
+        ).filter(Order.id == order_id).first()
+
+        if not row:
             return None, None, None, None
 
-        # Get product details
-        product = db.query(Product).filter(Product.id == order.product_id).first()
+        order = build_order_dict(row, row.items)
+        order["admin_notes"] = row.admin_notes
+
         product_info = {
-            "id": product.id,
-            "product_name": product.product_name,
-            "category": product.category.value,
-            "primary_image_url": product.primary_image_url,
-            "unit_of_measure": product.unit_of_measure.value
-        } if product else None
-
-        # Get seller details
-        seller = db.query(User).filter(User.id == order.seller_id).first()
+            "id": row.product_ref_id,
+            "product_name": row.product_ref_name,
+            "category": row.product_category.value,
+            "primary_image_url": row.product_image_url,
+            "unit_of_measure": row.product_unit.value
+        } if row.product_ref_id else None
+
         seller_info = {
-            "id": seller.id,
-            "full_name": seller.full_name,
-            "phone_number": seller.phone_number,
-            "region": seller.region,
-            "farm_name": seller.farm_name
-        } if seller else None
-
-        # Get buyer details
-        buyer = db.query(User).filter(User.id == order.buyer_id).first()
+            "id": row.seller_ref_id,
+            "full_name": row.seller_full_name,
+            "phone_number": row.seller_phone_number,
+            "region": row.seller_region,
+            "farm_name": row.seller_farm_name
+        } if row.seller_ref_id else None
+
         buyer_info = {
-            "id": buyer.id,
-            "full_name": buyer.full_name,
-            "phone_number": buyer.phone_number,
-            "region": buyer.region
-        } if buyer else None
+            "id": row.buyer_ref_id,
+            "full_name": row.buyer_full_name,
+            "phone_number": row.buyer_phone_number,
+            "region": row.buyer_region
+        } if row.buyer_ref_id else None
+
+        # Embedded fields OrderResponse.from_orm used to read off relationships
+        if "product_name" not in order and product_info:
+            order["product_name"] = product_info["product_name"]
+            order["product_image"] = product_info["primary_image_url"]
+        if seller_info:
+            order["seller_name"] = seller_info["full_name"]
+            order["seller_phone"] = seller_info["phone_number"]
+        if buyer_info:
+            order["buyer_name"] = buyer_info["full_name"]
+            order["buyer_phone"] = buyer_info["phone_number"]
 
         return order, product_info, seller_info, buyer_info
 
+    @staticmethod
+    def get_order_tracking(db: Session, order_id: int):
+        """Tracking columns (plus buyer/seller ids for access checks) for one order"""
+        return db.query(*TRACKING_COLUMNS).filter(Order.id == order_id).first()
+
     @staticmethod
     def list_user_orders(
         db: Session,
@@ -206,7 +370,7 @@ class OrderService:
         status: Optional[str] = None,
         page: int = 1,
         page_size: int = 20
-    ) -> Tuple[List[Order], int]:
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
         List orders for a user (buyer, seller, or admin view)
 
@@ -219,42 +383,65 @@ class OrderService:
             page_size: Items per page
 
         Returns:
-            Tuple of (orders, total_count)
+            Tuple of (order dicts in OrderResponse fields, total_count)
         """
-        # Eager load buyer and seller relationships
-        query = db.query(Order).options(
-            joinedload(Order.buyer),
-            joinedload(Order.seller),
-            joinedload(Order.items)
+        buyer = aliased(User)
+        seller = aliased(User)
+
+        # Column projection: no User/Order entities, items aggregated as JSON
+        query = db.query(
+            *ORDER_RESPONSE_COLUMNS,
+            EscrowTransaction.admin_notes,
+            buyer.full_name.label("buyer_full_name"),
+            buyer.phone_number.label("buyer_phone_number"),
+            buyer.email.label("buyer_email"),
+            seller.full_name.label("seller_full_name"),
+            seller.phone_number.label("seller_phone_number"),
+            order_items_json().label("items")
+        ).outerjoin(
+            buyer, buyer.id == Order.buyer_id
+        ).outerjoin(
+            seller, seller.id == Order.seller_id
+        ).outerjoin(
+            EscrowTransaction, EscrowTransaction.order_id == Order.id
         )
+        count_query = db.query(func.count(Order.id))
 
         if user_type == "ADMIN":
             # Admins see all orders
-            pass
+            scope = []
         elif user_type == "BUYER":
-            query = query.filter(Order.buyer_id == user_id)
+            scope = [Order.buyer_id == user_id]
         else:  # FARMER
-            query = query.filter(Order.seller_id == user_id)
+            scope = [Order.seller_id == user_id]
 
         # Filter by status
         if status:
-            query = query.filter(Order.status == status)
+            scope.append(Order.status == status)
 
-        # Get total count (need a separate query without eager loading for count)
-        count_query = db.query(Order)
-        if user_type == "ADMIN":
-            pass
-        elif user_type == "BUYER":
-            count_query = count_query.filter(Order.buyer_id == user_id)
-        else:
-            count_query = count_query.filter(Order.seller_id == user_id)
-        if status:
-            count_query = count_query.filter(Order.status == status)
-        total = count_query.count()
+        total = count_query.filter(*scope).scalar()
 
         # Pagination
         offset = (page - 1) * page_size
-        orders = query.order_by(desc(Order.created_at)).offset(offset).limit(page_size).all()
+        rows = query.filter(*scope).order_by(desc(Order.created_at)).offset(offset).limit(page_size).all()
+
+        orders = []
+        for row in rows:
+            order = build_order_dict(row, row.items)
+            order["admin_notes"] = row.admin_notes
+            if row.buyer_full_name is not None:
+                order["buyer_name"] = row.buyer_full_name
+                order["buyer_phone"] = row.buyer_phone_number
+                order["buyer"] = {
+                    "id": row.buyer_id,
+                    "full_name": row.buyer_full_name,
+                    "phone_number": row.buyer_phone_number,
+                    "email": row.buyer_email
+                }
+            if row.seller_full_name is not None:
+                order["seller_name"] = row.seller_full_name
+                order["seller_phone"] = row.seller_phone_number
+            orders.append(order)
 
         return orders, total
 
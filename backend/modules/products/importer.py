@@ -0,0 +1,256 @@
+"""
+Product Spreadsheet Import
+Streams CSV/XLSX listings into ProductService in fixed-size batches, with job
+progress and row errors kept in Redis
+"""
+from fastapi import HTTPException, UploadFile, status
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime
+import csv
+import json
+import logging
+import os
+import tempfile
+import uuid
+
+from config import settings
+from database import SessionLocal, get_redis
+from modules.products.service import ProductService
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "product_import:{job_id}"
+ERRORS_KEY = "product_import:{job_id}:errors"
+
+SUPPORTED_EXTENSIONS = {".csv", ".xlsx"}
+
+# Enum columns are matched case-insensitively
+UPPERCASE_COLUMNS = {"category", "unit_of_measure"}
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _redis():
+    try:
+        return get_redis()
+    except RuntimeError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Import service is temporarily unavailable"
+        )
+
+
+def _normalize_row(headers: List[str], values: List[Any]) -> Dict[str, Any]:
+    """Map a sheet row onto CreateProductRequest fields, dropping blank cells"""
+    row = {}
+    for header, value in zip(headers, values):
+        if not header or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                continue
+            if header in UPPERCASE_COLUMNS:
+                value = value.upper()
+        elif isinstance(value, datetime):
+            value = value.date()
+        row[header] = value
+    return row
+
+
+def _normalize_headers(raw_headers: List[Any]) -> List[str]:
+    return [
+        str(h).strip().lower().replace(" ", "_") if h is not None else ""
+        for h in raw_headers
+    ]
+
+
+def iter_csv_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield product payloads from a CSV file, one row at a time"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        headers = _normalize_headers(next(reader, []))
+        for values in reader:
+            if any(v.strip() for v in values):
+                yield _normalize_row(headers, values)
+
+
+def iter_xlsx_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield product payloads from the first sheet of an XLSX file (read-only mode streams rows)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = _normalize_headers(list(next(rows, [])))
+        for values in rows:
+            if any(v not in (None, "") for v in values):
+                yield _normalize_row(headers, list(values))
+    finally:
+        workbook.close()
+
+
+class ProductImportService:
+    """Spreadsheet imports of product listings"""
+
+    @staticmethod
+    async def save_upload(file: UploadFile) -> str:
+        """
+        Copy the upload to a temp file in chunks, enforcing the size limit
+
+        The copy outlives the request so the import can run after the
+        response has been sent.
+
+        Returns:
+            Path of the temp file
+        """
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only .csv and .xlsx files can be imported"
+            )
+
+        max_bytes = settings.MAX_DOCUMENT_SIZE_MB * 1024 * 1024
+        written = 0
+        fd, path = tempfile.mkstemp(prefix="product_import_", suffix=extension)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"File size exceeds {settings.MAX_DOCUMENT_SIZE_MB}MB limit"
+                        )
+                    out.write(chunk)
+        except Exception:
+            os.remove(path)
+            raise
+
+        return path
+
+    @staticmethod
+    def create_job(seller_id: int, filename: str) -> Dict[str, Any]:
+        """Register a queued import job"""
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "seller_id": seller_id,
+            "filename": filename,
+            "status": "queued",
+            "rows_processed": 0,
+            "created": 0,
+            "failed": 0,
+            "error": "",
+            "started_at": "",
+            "finished_at": "",
+        }
+
+        client = _redis()
+        key = JOB_KEY.format(job_id=job_id)
+        client.hset(key, mapping=job)
+        client.expire(key, settings.PRODUCT_IMPORT_JOB_TTL_HOURS * 3600)
+        return job
+
+    @staticmethod
+    def get_job(job_id: str, seller_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get job progress and recorded row errors
+
+        Returns:
+            Job dict, or None if unknown, expired or owned by another seller
+        """
+        client = _redis()
+        job = client.hgetall(JOB_KEY.format(job_id=job_id))
+        if not job or int(job["seller_id"]) != seller_id:
+            return None
+
+        errors = client.lrange(ERRORS_KEY.format(job_id=job_id), 0, -1)
+        return {
+            "job_id": job["job_id"],
+            "filename": job["filename"],
+            "status": job["status"],
+            "rows_processed": int(job["rows_processed"]),
+            "created": int(job["created"]),
+            "failed": int(job["failed"]),
+            "error": job["error"] or None,
+            "started_at": job["started_at"] or None,
+            "finished_at": job["finished_at"] or None,
+            "errors": [json.loads(e) for e in errors],
+        }
+
+    @staticmethod
+    def _import_batch(job_id: str, seller_id: int, first_row: int, batch: List[Dict[str, Any]]) -> None:
+        """Insert one batch on a short-lived session and record its outcome"""
+        db = SessionLocal()
+        try:
+            results = ProductService.bulk_create_products(db, seller_id, batch)
+        finally:
+            db.close()
+
+        failures = [
+            json.dumps({"row": first_row + r["index"], "errors": r["errors"]})
+            for r in results if not r["success"]
+        ]
+
+        client = _redis()
+        key = JOB_KEY.format(job_id=job_id)
+        errors_key = ERRORS_KEY.format(job_id=job_id)
+        pipe = client.pipeline()
+        pipe.hincrby(key, "rows_processed", len(batch))
+        pipe.hincrby(key, "created", len(batch) - len(failures))
+        pipe.hincrby(key, "failed", len(failures))
+        if failures:
+            pipe.rpush(errors_key, *failures)
+            pipe.ltrim(errors_key, 0, settings.PRODUCT_IMPORT_MAX_ERRORS - 1)
+            pipe.expire(errors_key, settings.PRODUCT_IMPORT_JOB_TTL_HOURS * 3600)
+        pipe.execute()
+
+    @staticmethod
+    def run_job(job_id: str, seller_id: int, path: str) -> None:
+        """
+        Stream the file and import it batch by batch
+
+        Runs as a background task after the upload response. A DB connection
+        is only checked out while a batch is being inserted.
+
+        Args:
+            job_id: Import job ID
+            seller_id: Seller the listings belong to
+            path: Temp file written by save_upload (removed when done)
+        """
+        client = _redis()
+        key = JOB_KEY.format(job_id=job_id)
+        client.hset(key, mapping={"status": "running", "started_at": datetime.utcnow().isoformat()})
+
+        rows = iter_xlsx_rows(path) if path.endswith(".xlsx") else iter_csv_rows(path)
+        batch_size = settings.PRODUCT_IMPORT_BATCH_SIZE
+
+        try:
+            batch: List[Dict[str, Any]] = []
+            # Row numbers as the farmer sees them: the header is row 1
+            first_row = 2
+            for row in rows:
+                batch.append(row)
+                if len(batch) == batch_size:
+                    ProductImportService._import_batch(job_id, seller_id, first_row, batch)
+                    first_row += len(batch)
+                    batch = []
+
+            if batch:
+                ProductImportService._import_batch(job_id, seller_id, first_row, batch)
+
+            client.hset(key, mapping={"status": "completed", "finished_at": datetime.utcnow().isoformat()})
+            logger.info(f"✅ Product import {job_id} completed for seller {seller_id}")
+
+        except Exception as e:
+            logger.error(f"Product import {job_id} failed: {e}", exc_info=True)
+            client.hset(key, mapping={
+                "status": "failed",
+                "error": "Import stopped: the file could not be processed",
+                "finished_at": datetime.utcnow().isoformat()
+            })
+
+        finally:
+            os.remove(path)
@@ -2,16 +2,19 @@
 Product Management Routes
 API endpoints for product operations
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, UploadFile, File, Form
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Dict, Any
 import logging
 import math
 
-from database import get_db
+from config import settings
+from database import get_db, get_async_db
 from models import User
 from modules.auth.dependencies import get_current_verified_user, get_current_farmer
-from modules.products.service import ProductService
+from modules.products.service import ProductService, list_cache_tags
+from modules.products.importer import ProductImportService
 from modules.products.schemas import (
     CreateProductRequest,
     UpdateProductRequest,
@@ -19,10 +22,18 @@ from modules.products.schemas import (
     ProductResponse,
     ProductListResponse,
     ProductDetailResponse,
+    ProductFacetsResponse,
+    BulkCreateProductsRequest,
+    BulkUpdateProductsRequest,
+    BulkProductResult,
+    BulkProductResponse,
+    ProductImportJobResponse,
     MessageResponse,
     ProductImageResponse
 )
 from modules.storage.service import storage_service
+from utils.response_cache import response_cache
+from utils.view_counter import view_counter
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +79,168 @@ async def create_product(
         )
 
 
+@router.post("/bulk", response_model=BulkProductResponse)
+async def bulk_create_products(
+    request: BulkCreateProductsRequest,
+    current_user: User = Depends(get_current_farmer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many product listings at once
+
+    **Requires farmer authentication**
+
+    - **items**: Up to 100 product payloads (same fields as `POST /products`)
+
+    Valid items are inserted together in one transaction; each item's result
+    reports the created product or its validation errors.
+    """
+    try:
+        results = await db.run_sync(
+            ProductService.bulk_create_products,
+            seller_id=current_user.id,
+            items=request.items
+        )
+
+        return _bulk_response(results)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk create products error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create products"
+        )
+
+
+@router.patch("/bulk", response_model=BulkProductResponse)
+async def bulk_update_products(
+    request: BulkUpdateProductsRequest,
+    current_user: User = Depends(get_current_farmer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Update many product listings at once
+
+    **Requires farmer authentication and ownership**
+
+    - **items**: Up to 100 objects with the product `id` and the fields to change
+      (same fields as `PUT /products/{id}`)
+
+    Owned, valid items are updated together in one transaction; each item's
+    result reports the updated product or why it was skipped.
+    """
+    try:
+        results = await db.run_sync(
+            ProductService.bulk_update_products,
+            seller_id=current_user.id,
+            items=request.items
+        )
+
+        return _bulk_response(results)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk update products error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update products"
+        )
+
+
+@router.post("/import", response_model=ProductImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_products(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_farmer)
+):
+    """
+    Import product listings from a spreadsheet
+
+    **Requires farmer authentication**
+
+    - **file**: CSV or XLSX file; the first row holds column names matching
+      the `POST /products` fields (product_name, category, description, ...)
+
+    The file is processed in the background. Poll
+    `GET /products/import/{job_id}` for progress and per-row errors.
+    """
+    try:
+        path = await ProductImportService.save_upload(file)
+        job = ProductImportService.create_job(current_user.id, file.filename)
+
+        background_tasks.add_task(ProductImportService.run_job, job["job_id"], current_user.id, path)
+
+        return ProductImportJobResponse(**job)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Product import upload error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to start product import"
+        )
+
+
+@router.get("/import/{job_id}", response_model=ProductImportJobResponse)
+async def get_import_status(
+    job_id: str,
+    current_user: User = Depends(get_current_farmer)
+):
+    """
+    Get spreadsheet import progress
+
+    **Requires farmer authentication** (own jobs only)
+
+    Returns row counts so far and up to the first 500 row errors.
+    Jobs are kept for 24 hours.
+    """
+    try:
+        job = ProductImportService.get_job(job_id, current_user.id)
+
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Import job not found"
+            )
+
+        return ProductImportJobResponse(**job)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get import status error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve import status"
+        )
+
+
+def _bulk_response(results: List[Dict[str, Any]]) -> BulkProductResponse:
+    """Convert service results into the bulk response model"""
+    items = [
+        BulkProductResult(
+            index=result["index"],
+            success=result["success"],
+            product_id=result.get("product_id"),
+            product=ProductResponse.from_orm(result["product"]) if result.get("product") else None,
+            errors=result.get("errors", [])
+        )
+        for result in results
+    ]
+    succeeded = sum(1 for item in items if item.success)
+
+    return BulkProductResponse(
+        success=succeeded > 0,
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        results=items
+    )
+
+
 @router.get("", response_model=ProductListResponse)
 async def list_products(
     category: Optional[str] = None,
@@ -82,9 +255,11 @@ async def list_products(
     seller_id: Optional[int] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    sort_by: str = Query("created_at", pattern="^(created_at|price_per_unit|product_name|quantity_available)$"),
+    cursor: Optional[str] = Query(None, max_length=512),
+    count: str = Query("exact", pattern="^(exact|estimated|none)$"),
+    sort_by: str = Query("created_at", pattern="^(created_at|price_per_unit|product_name|quantity_available|relevance)$"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List products with filtering, search, and pagination
@@ -103,8 +278,13 @@ async def list_products(
     - **seller_id**: Filter by seller
     - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 20, max: 100)
-    - **sort_by**: Sort field (created_at, price_per_unit, product_name, quantity_available)
+    - **cursor**: Opaque `next_cursor` from a previous response; switches to keyset pagination and ignores `page`
+    - **count**: Total to return: exact (default), estimated (planner statistics) or none
+    - **sort_by**: Sort field (created_at, price_per_unit, product_name, quantity_available, relevance)
     - **sort_order**: Sort direction (asc, desc)
+
+    `search` uses ranked full-text search with trigram matching for typos;
+    sort_by=relevance orders by match quality.
     """
     try:
         # Build filter request
@@ -121,27 +301,45 @@ async def list_products(
             seller_id=seller_id,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count=count,
             sort_by=sort_by,
             sort_order=sort_order
         )
 
-        products, total = ProductService.list_products(db, filters)
+        cache_params = filters.model_dump(mode="json")
+        cached = response_cache.get("products:list", cache_params)
+        if cached:
+            return cached
+
+        products, total, next_cursor = await db.run_sync(ProductService.list_products, filters)
 
         # Calculate total pages
-        total_pages = math.ceil(total / page_size) if total > 0 else 1
+        total_pages = None
+        if total is not None:
+            total_pages = math.ceil(total / page_size) if total > 0 else 1
 
         # Convert to response models
         product_responses = [ProductResponse.from_orm(p) for p in products]
 
-        return ProductListResponse(
-            success=True,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages,
-            products=product_responses
+        return response_cache.store(
+            "products:list",
+            cache_params,
+            ProductListResponse(
+                success=True,
+                total=total,
+                page=page,
+                page_size=page_size,
+                total_pages=total_pages,
+                products=product_responses,
+                next_cursor=next_cursor,
+                total_is_estimate=count == "estimated"
+            ),
+            tags=list_cache_tags(filters)
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"List products error: {e}", exc_info=True)
         raise HTTPException(
@@ -153,7 +351,7 @@ async def list_products(
 @router.get("/featured", response_model=ProductListResponse)
 async def get_featured_products(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get featured products
@@ -163,17 +361,27 @@ async def get_featured_products(
     Returns up to `limit` featured products
     """
     try:
-        products = ProductService.get_featured_products(db, limit=limit)
+        cache_params = {"limit": limit}
+        cached = response_cache.get("products:featured", cache_params)
+        if cached:
+            return cached
+
+        products = await db.run_sync(ProductService.get_featured_products, limit)
 
         product_responses = [ProductResponse.from_orm(p) for p in products]
 
-        return ProductListResponse(
-            success=True,
-            total=len(products),
-            page=1,
-            page_size=limit,
-            total_pages=1,
-            products=product_responses
+        return response_cache.store(
+            "products:featured",
+            cache_params,
+            ProductListResponse(
+                success=True,
+                total=len(products),
+                page=1,
+                page_size=limit,
+                total_pages=1,
+                products=product_responses
+            ),
+            tags=["catalog:all"]
         )
 
     except Exception as e:
@@ -188,7 +396,7 @@ async def get_featured_products(
 async def search_products(
     q: str = Query(..., min_length=2, max_length=255, description="Search query"),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Search products by name, description, or variety
@@ -199,17 +407,27 @@ async def search_products(
     - **limit**: Max results (default: 20)
     """
     try:
-        products = ProductService.search_products(db, search_term=q, limit=limit)
+        cache_params = {"q": " ".join(q.lower().split()), "limit": limit}
+        cached = response_cache.get("products:search", cache_params)
+        if cached:
+            return cached
+
+        products = await db.run_sync(ProductService.search_products, q, limit)
 
         product_responses = [ProductResponse.from_orm(p) for p in products]
 
-        return ProductListResponse(
-            success=True,
-            total=len(products),
-            page=1,
-            page_size=limit,
-            total_pages=1,
-            products=product_responses
+        return response_cache.store(
+            "products:search",
+            cache_params,
+            ProductListResponse(
+                success=True,
+                total=len(products),
+                page=1,
+                page_size=limit,
+                total_pages=1,
+                products=product_responses
+            ),
+            tags=["catalog:all"]
         )
 
     except Exception as e:
@@ -220,6 +438,72 @@ async def search_products(
         )
 
 
+@router.get("/facets", response_model=ProductFacetsResponse)
+async def get_product_facets(
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    district: Optional[str] = None,
+    is_organic: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    search: Optional[str] = None,
+    product_status: Optional[str] = Query("AVAILABLE", alias="status"),
+    is_featured: Optional[bool] = None,
+    seller_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get facet counts for the catalog sidebar
+
+    **Public endpoint** - No authentication required
+
+    Accepts the same filters as `GET /products` and returns, for the matching
+    products, counts per category, per region and district, organic vs
+    non-organic, and per price bucket.
+    """
+    try:
+        filters = ProductFilterRequest(
+            category=category.upper() if category else None,
+            region=region,
+            district=district,
+            is_organic=is_organic,
+            min_price=min_price,
+            max_price=max_price,
+            search=search,
+            status=product_status,
+            is_featured=is_featured,
+            seller_id=seller_id,
+            count="none"
+        )
+
+        cache_params = filters.model_dump(
+            mode="json",
+            exclude={"page", "page_size", "cursor", "count", "sort_by", "sort_order"}
+        )
+        cached = response_cache.get("products:facets", cache_params)
+        if cached:
+            return cached
+
+        facets = await db.run_sync(ProductService.get_product_facets, filters)
+
+        return response_cache.store(
+            "products:facets",
+            cache_params,
+            ProductFacetsResponse(success=True, **facets),
+            tags=list_cache_tags(filters),
+            ttl=settings.FACETS_CACHE_TTL_SECONDS
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get product facets error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve product facets"
+        )
+
+
 @router.get("/my-products", response_model=ProductListResponse)
 async def get_my_products(
     status: Optional[str] = None,
@@ -255,7 +539,7 @@ async def get_my_products(
             sort_order=sort_order
         )
 
-        products, total = ProductService.list_products(db, filters)
+        products, total, _ = ProductService.list_products(db, filters)
 
         # Calculate total pages
         total_pages = math.ceil(total / page_size) if total > 0 else 1
@@ -283,7 +567,7 @@ async def get_my_products(
 @router.get("/{product_id}", response_model=ProductDetailResponse)
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get product details by ID
@@ -293,7 +577,13 @@ async def get_product(
     Returns product details along with seller information
     """
     try:
-        product, seller_info = ProductService.get_product_with_seller(db, product_id)
+        cache_params = {"product_id": product_id}
+        cached = response_cache.get("products:detail", cache_params)
+        if cached:
+            view_counter.record(product_id)
+            return cached
+
+        product, seller_info = await db.run_sync(ProductService.get_product_with_seller, product_id)
 
         if not product:
             raise HTTPException(
@@ -301,10 +591,17 @@ async def get_product(
                 detail="Product not found"
             )
 
-        return ProductDetailResponse(
-            success=True,
-            product=ProductResponse.from_orm(product),
-            seller=seller_info
+        view_counter.record(product_id)
+
+        return response_cache.store(
+            "products:detail",
+            cache_params,
+            ProductDetailResponse(
+                success=True,
+                product=ProductResponse.from_orm(product),
+                seller=seller_info
+            ),
+            tags=[f"product:{product.id}", f"seller:{product.seller_id}"]
         )
 
     except HTTPException:
@@ -402,6 +699,10 @@ async def upload_product_image(
 
     If is_primary is True, this image will replace the current primary image.
     Otherwise, it will be added to additional_images.
+
+    The image is stored as 1200px, 400px and 96px variants in JPEG and WebP;
+    their URLs are returned in `variants` and kept on the product's
+    `image_variants`, keyed by the image URL.
     """
     try:
         # Verify product exists and belongs to user
@@ -426,34 +727,41 @@ async def upload_product_image(
                 detail="Only image files are allowed"
             )
 
-        # Upload image
-        file_url = await storage_service.upload_image(
-            file=file
-        )
+        # Upload image with resized JPEG/WebP variants
+        upload = await storage_service.upload_image_variants(file=file)
+        file_url = upload["url"]
+
+        product.image_variants = {**(product.image_variants or {}), file_url: upload["variants"]}
+
+        additional = list(product.additional_images or [])
+        if file_url == product.primary_image_url or file_url in additional:
+            # Same image uploaded again: storage is content-addressed, so keep
+            # one reference per product entry and don't list the URL twice
+            storage_service.delete_image_variants(upload["variants"])
 
         # Update product with image URL
         if is_primary:
-            # Move current primary to additional if exists
-            if product.primary_image_url:
-                if product.additional_images:
-                    product.additional_images = [product.primary_image_url] + list(product.additional_images)
-                else:
-                    product.additional_images = [product.primary_image_url]
-            product.primary_image_url = file_url
-        else:
+            if product.primary_image_url != file_url:
+                # Move current primary to additional if exists
+                additional = [img for img in additional if img != file_url]
+                if product.primary_image_url:
+                    additional = [product.primary_image_url] + additional
+                product.additional_images = additional or None
+                product.primary_image_url = file_url
+        elif file_url != product.primary_image_url and file_url not in additional:
             # Add to additional images
-            if product.additional_images:
-                product.additional_images = list(product.additional_images) + [file_url]
-            else:
-                product.additional_images = [file_url]
+            product.additional_images = additional + [file_url]
 
         db.commit()
         db.refresh(product)
 
+        ProductService.invalidate_catalog_cache(product)
+
         return ProductImageResponse(
             success=True,
             url=file_url,
             is_primary=is_primary,
+            variants=upload["variants"],
             message="Image uploaded successfully"
         )
 
@@ -499,14 +807,21 @@ async def delete_product_image(
                 detail="You can only delete images from your own products"
             )
 
+        # References held by this product (older rows may list an image twice)
+        references = list(product.additional_images or []).count(image_url)
+        if product.primary_image_url == image_url:
+            references += 1
+
         # Check if it's the primary image
         if product.primary_image_url == image_url:
             # If there are additional images, promote the first one
-            if product.additional_images and len(product.additional_images) > 0:
-                product.primary_image_url = product.additional_images[0]
-                product.additional_images = list(product.additional_images)[1:] if len(product.additional_images) > 1 else None
+            additional = [img for img in (product.additional_images or []) if img != image_url]
+            if additional:
+                product.primary_image_url = additional[0]
+                product.additional_images = additional[1:] or None
             else:
                 product.primary_image_url = None
+                product.additional_images = None
         elif product.additional_images and image_url in product.additional_images:
             # Remove from additional images
             product.additional_images = [img for img in product.additional_images if img != image_url]
@@ -518,14 +833,25 @@ async def delete_product_image(
                 detail="Image not found in product"
             )
 
+        variants = (product.image_variants or {}).get(image_url)
+        if variants:
+            remaining = dict(product.image_variants)
+            remaining.pop(image_url, None)
+            product.image_variants = remaining or None
+
         db.commit()
 
+        ProductService.invalidate_catalog_cache(product)
+
         # Try to delete from storage (non-critical if fails)
         try:
-            # Extract path from URL for deletion
-            if "uploads/" in image_url:
-                file_path = image_url.split("uploads/")[-1]
-                storage_service.delete_file(f"uploads/{file_path}")
+            for _ in range(references):
+                if variants:
+                    storage_service.delete_image_variants(variants)
+                elif "uploads/" in image_url:
+                    # Extract path from URL for deletion
+                    file_path = image_url.split("uploads/")[-1]
+                    storage_service.delete_file(f"uploads/{file_path}")
         except Exception as storage_error:
             logger.warning(f"Failed to delete image from storage: {storage_error}")
 
@@ -588,6 +914,8 @@ async def toggle_product_availability(
         db.commit()
         db.refresh(product)
 
+        ProductService.invalidate_catalog_cache(product)
+
         return ProductResponse.from_orm(product)
 
     except HTTPException:
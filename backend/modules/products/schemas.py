@@ -3,7 +3,7 @@ Product Management Schemas
 Pydantic models for product request/response validation
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from models import ProductCategory, ProductStatus, UnitOfMeasure
 
@@ -77,6 +77,29 @@ class UpdateProductRequest(BaseModel):
         }
 
 
+# Max items per bulk create/update request
+MAX_BULK_ITEMS = 100
+
+
+class BulkCreateProductsRequest(BaseModel):
+    """
+    Bulk create request
+
+    Items are validated one by one against CreateProductRequest so that a bad
+    row is reported in its result instead of rejecting the whole batch.
+    """
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BulkUpdateProductsRequest(BaseModel):
+    """
+    Bulk update request
+
+    Each item carries the product `id` plus UpdateProductRequest fields.
+    """
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
 class ProductFilterRequest(BaseModel):
     """Product filter/search request"""
     category: Optional[ProductCategory] = None
@@ -93,9 +116,11 @@ class ProductFilterRequest(BaseModel):
     # Pagination
     page: int = Field(1, ge=1)
     page_size: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = Field(None, max_length=512)  # Keyset pagination (overrides page)
+    count: str = Field("exact", pattern="^(exact|estimated|none)$")
 
     # Sorting
-    sort_by: str = Field("created_at", pattern="^(created_at|price_per_unit|product_name|quantity_available)$")
+    sort_by: str = Field("created_at", pattern="^(created_at|price_per_unit|product_name|quantity_available|relevance)$")
     sort_order: str = Field("desc", pattern="^(asc|desc)$")
 
     @validator('max_price')
@@ -131,6 +156,7 @@ class ProductResponse(BaseModel):
     # Images
     primary_image_url: Optional[str]
     additional_images: Optional[List[str]] = None
+    image_variants: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None  # {image_url: {large|card|thumb: {jpeg|webp: url}}}
 
     # Attributes
     is_organic: bool
@@ -159,11 +185,87 @@ class ProductResponse(BaseModel):
 class ProductListResponse(BaseModel):
     """Paginated product list response"""
     success: bool = True
-    total: int
+    total: Optional[int]  # None when count=none
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
     products: List[ProductResponse]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
+    total_is_estimate: bool = False
+
+
+class FacetCount(BaseModel):
+    """Number of matching products for one facet value"""
+    value: str
+    count: int
+
+
+class RegionFacet(BaseModel):
+    """Product count for a region, broken down by district"""
+    region: str
+    count: int
+    districts: List[FacetCount] = []
+
+
+class OrganicFacet(BaseModel):
+    """Organic vs non-organic product counts"""
+    organic: int = 0
+    non_organic: int = 0
+
+
+class PriceBucketFacet(BaseModel):
+    """Product count within a price range (GHS, max exclusive)"""
+    min_price: float
+    max_price: Optional[float] = None  # None = no upper bound
+    count: int
+
+
+class ProductFacetsResponse(BaseModel):
+    """Facet counts for the catalog sidebar"""
+    success: bool = True
+    total: int
+    categories: List[FacetCount]
+    regions: List[RegionFacet]
+    organic: OrganicFacet
+    price_buckets: List[PriceBucketFacet]
+
+
+class BulkProductResult(BaseModel):
+    """Outcome of one item in a bulk request"""
+    index: int
+    success: bool
+    product_id: Optional[int] = None
+    product: Optional[ProductResponse] = None
+    errors: List[str] = []
+
+
+class BulkProductResponse(BaseModel):
+    """Per-item results of a bulk create/update"""
+    success: bool = True
+    succeeded: int
+    failed: int
+    results: List[BulkProductResult]
+
+
+class ImportRowError(BaseModel):
+    """Validation errors for one spreadsheet row"""
+    row: int  # Row number in the sheet (header is row 1)
+    errors: List[str]
+
+
+class ProductImportJobResponse(BaseModel):
+    """Spreadsheet import job status"""
+    success: bool = True
+    job_id: str
+    filename: str
+    status: str  # queued, running, completed, failed
+    rows_processed: int = 0
+    created: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    errors: List[ImportRowError] = []
 
 
 class ProductDetailResponse(BaseModel):
@@ -184,4 +286,5 @@ class ProductImageResponse(BaseModel):
     success: bool = True
     url: str
     is_primary: bool = False
+    variants: Optional[Dict[str, Dict[str, str]]] = None  # {large|card|thumb: {jpeg|webp: url}}
     message: str = "Image uploaded successfully"
@@ -2,22 +2,352 @@
 Product Management Service
 Business logic for product operations
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, asc, func, cast, String
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import or_, and_, desc, asc, func, cast, String, tuple_, select, literal, literal_column, case, insert, update, values, column, Integer, Numeric
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from typing import Optional, Dict, Any, List, Tuple
+import base64
+import json
 import logging
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
-from models import Product, ProductStatus, User, UserType
+from models import Product, ProductStatus, ProductCategory, User, UserType
 from modules.products.schemas import CreateProductRequest, UpdateProductRequest, ProductFilterRequest
+from utils.response_cache import response_cache
+from utils.lru_cache import LRUTTLCache
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Seller fields shown on product detail ("seller card")
+SELLER_CARD_COLUMNS = (
+    User.id,
+    User.full_name,
+    User.region,
+    User.district,
+    User.farm_name,
+    User.average_rating,
+    User.total_reviews,
+    User.years_farming,
+    User.profile_image_url,
+)
+
+# Per-process caches: seller cards (invalidated on profile update, TTL bounds
+# staleness across workers) and product -> seller_id, which never changes
+seller_card_cache = LRUTTLCache(
+    maxsize=settings.SELLER_CARD_CACHE_SIZE,
+    ttl=settings.SELLER_CARD_CACHE_TTL_SECONDS
+)
+product_seller_ids = LRUTTLCache(maxsize=settings.SELLER_CARD_CACHE_SIZE * 4)
+
+
+def build_seller_card(row) -> Dict[str, Any]:
+    """Build the seller card dict from a row holding SELLER_CARD_COLUMNS"""
+    return {
+        "id": row.id,
+        "full_name": row.full_name,
+        "region": row.region,
+        "district": row.district,
+        "farm_name": row.farm_name,
+        "average_rating": float(row.average_rating) if row.average_rating else None,
+        "total_reviews": row.total_reviews,
+        "years_farming": row.years_farming,
+        "profile_image_url": row.profile_image_url
+    }
+
+
+# Price facet ranges in GHS as (min inclusive, max exclusive); None = open-ended
+PRICE_BUCKETS = (
+    (0, 10),
+    (10, 25),
+    (25, 50),
+    (50, 100),
+    (100, 250),
+    (250, None),
+)
+
+
+# Parsers for cursor values, keyed by the sort columns ProductFilterRequest allows
+CURSOR_VALUE_PARSERS = {
+    "created_at": datetime.fromisoformat,
+    "price_per_unit": Decimal,
+    "product_name": str,
+    "quantity_available": Decimal,
+    "relevance": float,
+}
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, product_id: int) -> str:
+    """Encode the keyset position (sort value, id) as an opaque URL-safe token"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, float):
+        value = repr(value)
+    payload = {
+        "s": sort_by,
+        "o": sort_order,
+        "v": str(value),
+        "id": product_id,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns:
+        Tuple of (sort_value, product_id)
+
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("cursor sort mismatch")
+        return CURSOR_VALUE_PARSERS[sort_by](payload["v"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        logger.debug(f"Rejected product cursor {cursor!r}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor for the requested sort order"
+        )
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, with the statement's parameters bound normally"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(db: Session, query: Query) -> int:
+    """
+    Estimate the row count of a query from planner statistics
+
+    Reads the planner's row estimate for the filtered query instead of
+    scanning the filtered set.
+    """
+    plan = db.execute(Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]) if plan else 0
+
+
+def build_search_criteria(search_term: str) -> Tuple[Any, Any]:
+    """
+    Catalog search engine shared by list_products and search_products
+
+    Matches the stored tsvector (GIN idx_product_search_vector) and falls back
+    to trigram similarity on name/variety/description (the pg_trgm GIN indexes)
+    so misspellings like "tomatoe" still match.
+
+    Returns:
+        Tuple of (filter criterion, relevance expression)
+    """
+    ts_query = func.plainto_tsquery('english', search_term)
+    full_text = Product.search_vector.op('@@')(ts_query)
+    fuzzy = or_(
+        Product.product_name.op('%')(search_term),
+        Product.variety.op('%')(search_term),
+        literal(search_term).op('<%')(Product.description)
+    )
+    # Full-text hits outrank pure trigram matches; similarity orders the typo matches
+    relevance = (
+        func.coalesce(func.ts_rank(Product.search_vector, ts_query), 0)
+        + func.similarity(Product.product_name, search_term) * 0.5
+    )
+    return or_(full_text, fuzzy), relevance
+
+
+def product_cache_tags(product: Product) -> List[str]:
+    """Response cache tags a change to `product` must invalidate"""
+    return [
+        "catalog:all",
+        f"product:{product.id}",
+        f"seller:{product.seller_id}",
+        f"category:{product.category.value}",
+        f"region:{product.region}",
+    ]
+
+
+def apply_product_filters(query: Query, filters: ProductFilterRequest) -> Tuple[Query, Optional[Any]]:
+    """
+    Apply the ProductFilterRequest criteria shared by listings and facets
+
+    Returns:
+        Tuple of (filtered query, relevance expression or None without a search term)
+    """
+    if filters.category:
+        query = query.filter(Product.category == filters.category)
+
+    if filters.region:
+        query = query.filter(Product.region == filters.region)
+
+    if filters.district:
+        query = query.filter(Product.district == filters.district)
+
+    if filters.is_organic is not None:
+        query = query.filter(Product.is_organic == filters.is_organic)
+
+    if filters.min_price:
+        query = query.filter(Product.price_per_unit >= filters.min_price)
+
+    if filters.max_price:
+        query = query.filter(Product.price_per_unit <= filters.max_price)
+
+    if filters.status:
+        query = query.filter(Product.status == filters.status)
+
+    if filters.is_featured is not None:
+        query = query.filter(Product.is_featured == filters.is_featured)
+
+    if filters.seller_id:
+        query = query.filter(Product.seller_id == filters.seller_id)
+
+    # Full-text search with trigram fallback
+    relevance = None
+    if filters.search:
+        search_criterion, relevance = build_search_criteria(filters.search)
+        query = query.filter(search_criterion)
+
+    return query, relevance
+
+
+def format_validation_errors(error: ValidationError) -> List[str]:
+    """Flatten a pydantic ValidationError into "field: message" strings"""
+    return [
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}"
+        for err in error.errors()
+    ]
+
+
+class StockUnavailableError(ValueError):
+    """Raised when a conditional stock decrement can't cover every product"""
+
+    def __init__(self, products: List[Any]):
+        self.products = products
+        first = products[0] if products else None
+        if first is None:
+            message = "Product not found"
+        elif first.status != ProductStatus.AVAILABLE:
+            message = f"Product '{first.product_name}' is no longer available"
+        else:
+            message = (
+                f"Insufficient stock for {first.product_name}. "
+                f"Available: {first.quantity_available} {first.unit_of_measure.value}"
+            )
+        super().__init__(message)
+
+
+def stock_decrement_statement(quantities: Dict[int, Decimal], record_sale: bool = False):
+    """
+    UPDATE ... FROM (VALUES ...) that takes stock from several products at once
+
+    Each row only changes if it is AVAILABLE and still holds at least the
+    requested quantity; a row that reaches zero flips to OUT_OF_STOCK in the
+    same statement. Rows are listed in id order so concurrent multi-item
+    checkouts lock them in a consistent order.
+    """
+    requested = values(
+        column("id", Integer), column("qty", Numeric), name="requested"
+    ).data(sorted(quantities.items()))
+    remaining = Product.quantity_available - requested.c.qty
+
+    changes = {
+        "quantity_available": remaining,
+        "status": case((remaining <= 0, literal(ProductStatus.OUT_OF_STOCK, Product.status.type)), else_=Product.status),
+        "updated_at": datetime.utcnow(),
+    }
+    if record_sale:
+        changes["total_sold"] = Product.total_sold + requested.c.qty
+
+    return update(Product).where(
+        Product.id == requested.c.id,
+        Product.status == ProductStatus.AVAILABLE,
+        Product.quantity_available >= requested.c.qty
+    ).values(**changes).execution_options(synchronize_session=False)
+
+
+def list_cache_tags(filters: ProductFilterRequest) -> List[str]:
+    """
+    Response cache tag for a product list, scoped by its most selective filter
+
+    A product change invalidates its seller, category and region tags as well as
+    catalog:all, so any list that could contain the product is dropped.
+    """
+    if filters.seller_id:
+        return [f"seller:{filters.seller_id}"]
+    if filters.category:
+        return [f"category:{filters.category.value}"]
+    if filters.region:
+        return [f"region:{filters.region}"]
+    return ["catalog:all"]
+
+
 class ProductService:
     """Service for product management operations"""
 
+    @staticmethod
+    def invalidate_catalog_cache(product: Product) -> None:
+        """Drop cached catalog responses that may include this product"""
+        response_cache.invalidate_tags(product_cache_tags(product))
+
+    @staticmethod
+    def get_verified_seller(db: Session, seller_id: int) -> User:
+        """Load the seller and check they may create listings"""
+        seller = db.query(User).filter(User.id == seller_id).first()
+        if not seller:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Seller not found"
+            )
+
+        if seller.user_type != UserType.FARMER:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only farmers can create product listings"
+            )
+
+        return seller
+
+    @staticmethod
+    def build_product_values(seller: User, product_data: CreateProductRequest) -> Dict[str, Any]:
+        """Column values for a new listing (location defaults to the seller's)"""
+        return {
+            "seller_id": seller.id,
+            "product_name": product_data.product_name,
+            "category": product_data.category,
+            "description": product_data.description,
+            "quantity_available": product_data.quantity_available,
+            "unit_of_measure": product_data.unit_of_measure,
+            "price_per_unit": product_data.price_per_unit,
+            "minimum_order_quantity": product_data.minimum_order_quantity,
+            "harvest_date": product_data.harvest_date,
+            "expected_shelf_life_days": product_data.expected_shelf_life_days,
+            "farm_location": product_data.farm_location,
+            "region": product_data.region or seller.region,
+            "district": product_data.district or seller.district,
+            "is_organic": product_data.is_organic,
+            "variety": product_data.variety,
+            "status": ProductStatus.AVAILABLE,
+        }
+
     @staticmethod
     def create_product(
         db: Session,
@@ -35,45 +365,16 @@ class ProductService:
         Returns:
             Created product
         """
-        # Verify seller is a farmer
-        seller = db.query(User).filter(User.id == seller_id).first()
-        if not seller:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Seller not found"
-            )
-
-        if seller.user_type != UserType.FARMER:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only farmers can create product listings"
-            )
+        seller = ProductService.get_verified_seller(db, seller_id)
 
-        # Create product
-        product = Product(
-            seller_id=seller_id,
-            product_name=product_data.product_name,
-            category=product_data.category,
-            description=product_data.description,
-            quantity_available=product_data.quantity_available,
-            unit_of_measure=product_data.unit_of_measure,
-            price_per_unit=product_data.price_per_unit,
-            minimum_order_quantity=product_data.minimum_order_quantity,
-            harvest_date=product_data.harvest_date,
-            expected_shelf_life_days=product_data.expected_shelf_life_days,
-            farm_location=product_data.farm_location,
-            region=product_data.region or seller.region,
-            district=product_data.district or seller.district,
-            is_organic=product_data.is_organic,
-            variety=product_data.variety,
-            status=ProductStatus.AVAILABLE,
-            search_vector=func.to_tsvector('english', f"{product_data.product_name} {product_data.description} {product_data.variety or ''} {product_data.category.value}")
-        )
+        product = Product(**ProductService.build_product_values(seller, product_data))
 
         db.add(product)
         db.commit()
         db.refresh(product)
 
+        ProductService.invalidate_catalog_cache(product)
+
         logger.info(f"Product {product.id} created by seller {seller_id}")
         return product
 
@@ -84,25 +385,33 @@ class ProductService:
 
     @staticmethod
     def get_product_with_seller(db: Session, product_id: int) -> Tuple[Optional[Product], Optional[Dict]]:
-        """Get product with seller information"""
-        product = db.query(Product).filter(Product.id == product_id).first()
+        """
+        Get product with seller information in a single query
 
-        if not product:
+        When the seller card is already cached only the product row is read;
+        otherwise the seller columns are projected through a join.
+        """
+        seller_id = product_seller_ids.get(product_id)
+        seller_info = seller_card_cache.get(seller_id) if seller_id else None
+
+        if seller_info:
+            product = db.query(Product).filter(Product.id == product_id).first()
+            return (product, seller_info) if product else (None, None)
+
+        row = db.query(Product, *SELLER_CARD_COLUMNS).outerjoin(
+            User, User.id == Product.seller_id
+        ).filter(Product.id == product_id).first()
+
+        if not row:
             return None, None
 
-        # Get seller info
-        seller = db.query(User).filter(User.id == product.seller_id).first()
-        seller_info = {
-            "id": seller.id,
-            "full_name": seller.full_name,
-            "region": seller.region,
-            "district": seller.district,
-            "farm_name": seller.farm_name,
-            "average_rating": float(seller.average_rating) if seller.average_rating else None,
-            "total_reviews": seller.total_reviews,
-            "years_farming": seller.years_farming,
-            "profile_image_url": seller.profile_image_url
-        } if seller else None
+        product = row[0]
+        product_seller_ids.set(product.id, product.seller_id)
+
+        seller_info = None
+        if row.id is not None:
+            seller_info = build_seller_card(row)
+            seller_card_cache.set(product.seller_id, seller_info)
 
         return product, seller_info
 
@@ -146,17 +455,168 @@ class ProductService:
             if hasattr(product, field):
                 setattr(product, field, value)
 
-        # Update search vector
-        search_text = f"{product.product_name} {product.description or ''} {product.variety or ''} {product.category.value}"
-        product.search_vector = func.to_tsvector('english', search_text)
-
         product.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(product)
 
+        ProductService.invalidate_catalog_cache(product)
+
         logger.info(f"Product {product_id} updated by seller {seller_id}")
         return product
 
+    @staticmethod
+    def bulk_create_products(
+        db: Session,
+        seller_id: int,
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Create many listings in one transaction
+
+        Each item is validated against CreateProductRequest; valid items are
+        inserted with a single multi-row INSERT ... RETURNING, invalid ones
+        are reported without affecting the rest.
+
+        Args:
+            db: Database session
+            seller_id: ID of the seller (must be a farmer)
+            items: Raw product payloads
+
+        Returns:
+            Per-item results: index, success, product or errors
+        """
+        seller = ProductService.get_verified_seller(db, seller_id)
+
+        results: List[Dict[str, Any]] = []
+        rows: List[Dict[str, Any]] = []
+        row_results: List[Dict[str, Any]] = []
+
+        for index, item in enumerate(items):
+            try:
+                product_data = CreateProductRequest.model_validate(item)
+            except ValidationError as e:
+                results.append({"index": index, "success": False, "errors": format_validation_errors(e)})
+                continue
+
+            result = {"index": index, "success": True}
+            results.append(result)
+            row_results.append(result)
+            rows.append(ProductService.build_product_values(seller, product_data))
+
+        if rows:
+            now = datetime.utcnow()
+            for row in rows:
+                row["created_at"] = now
+                row["updated_at"] = now
+
+            products = db.scalars(
+                insert(Product).returning(Product, sort_by_parameter_order=True),
+                rows
+            ).all()
+            # Keep the RETURNING state: detached objects are not expired by commit
+            for product in products:
+                db.expunge(product)
+            db.commit()
+
+            for result, product in zip(row_results, products):
+                result["product_id"] = product.id
+                result["product"] = product
+
+            tags = set()
+            for product in products:
+                tags.update(product_cache_tags(product))
+            response_cache.invalidate_tags(tags)
+
+            logger.info(f"{len(products)} products bulk-created by seller {seller_id}")
+
+        return results
+
+    @staticmethod
+    def bulk_update_products(
+        db: Session,
+        seller_id: int,
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Update many of the seller's listings in one transaction
+
+        Each item needs an `id` plus UpdateProductRequest fields. Ownership is
+        checked with one query for all ids and the changes are written as a
+        bulk UPDATE by primary key.
+
+        Args:
+            db: Database session
+            seller_id: ID of the seller (must own every product)
+            items: Raw update payloads
+
+        Returns:
+            Per-item results: index, success, product or errors
+        """
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[Dict[str, Any], int, Dict[str, Any]]] = []
+
+        for index, item in enumerate(items):
+            product_id = item.get("id")
+            if not isinstance(product_id, int):
+                results.append({"index": index, "success": False, "errors": ["id: a product id is required"]})
+                continue
+
+            try:
+                update_data = UpdateProductRequest.model_validate(
+                    {k: v for k, v in item.items() if k != "id"}
+                )
+            except ValidationError as e:
+                results.append({"index": index, "success": False, "errors": format_validation_errors(e)})
+                continue
+
+            result = {"index": index, "success": True, "product_id": product_id}
+            results.append(result)
+            pending.append((result, product_id, update_data.model_dump(exclude_unset=True)))
+
+        if not pending:
+            return results
+
+        owned = {
+            product_id
+            for (product_id,) in db.query(Product.id).filter(
+                Product.id.in_([product_id for _, product_id, _ in pending]),
+                Product.seller_id == seller_id,
+                Product.status != ProductStatus.DELETED
+            )
+        }
+
+        now = datetime.utcnow()
+        updates: List[Dict[str, Any]] = []
+        for result, product_id, changes in pending:
+            if product_id not in owned:
+                result["success"] = False
+                result["errors"] = ["Product not found or not owned by you"]
+                continue
+            updates.append({"id": product_id, **changes, "updated_at": now})
+
+        if updates:
+            db.execute(update(Product), updates)
+            db.commit()
+
+            products = {
+                product.id: product
+                for product in db.query(Product).filter(
+                    Product.id.in_([u["id"] for u in updates])
+                )
+            }
+
+            tags = set()
+            for result in results:
+                product = products.get(result.get("product_id")) if result["success"] else None
+                if product is not None:
+                    result["product"] = product
+                    tags.update(product_cache_tags(product))
+            response_cache.invalidate_tags(tags)
+
+            logger.info(f"{len(updates)} products bulk-updated by seller {seller_id}")
+
+        return results
+
     @staticmethod
     def delete_product(db: Session, product_id: int, seller_id: int) -> Dict[str, Any]:
         """
@@ -191,6 +651,8 @@ class ProductService:
 
         db.commit()
 
+        ProductService.invalidate_catalog_cache(product)
+
         logger.info(f"Product {product_id} deleted by seller {seller_id}")
         return {
             "success": True,
@@ -201,73 +663,185 @@ class ProductService:
     def list_products(
         db: Session,
         filters: ProductFilterRequest
-    ) -> Tuple[List[Product], int]:
+    ) -> Tuple[List[Product], Optional[int], Optional[str]]:
         """
         List products with filters and pagination
 
+        Offset pagination (page/page_size) is used unless `filters.cursor` is
+        set, in which case the page is fetched by keyset on (sort column, id).
+        `filters.count` selects an exact total, a planner estimate, or none.
+
         Args:
             db: Database session
             filters: Filter criteria
 
         Returns:
-            Tuple of (products, total_count)
+            Tuple of (products, total_count, next_cursor)
         """
-        query = db.query(Product).filter(Product.status != ProductStatus.DELETED)
-
-        # Apply filters
-        if filters.category:
-            query = query.filter(Product.category == filters.category)
+        query, relevance = apply_product_filters(
+            db.query(Product).filter(Product.status != ProductStatus.DELETED),
+            filters
+        )
 
-        if filters.region:
-            query = query.filter(Product.region == filters.region)
+        # Get total count before pagination
+        total = None
+        if filters.count == "exact":
+            total = query.count()
+        elif filters.count == "estimated":
+            total = estimate_count(db, query)
+
+        # Relevance ordering needs a search term; otherwise fall back to newest first
+        sort_by = filters.sort_by
+        if sort_by == "relevance" and relevance is None:
+            sort_by = "created_at"
+
+        if sort_by == "relevance":
+            query = query.add_columns(relevance.label("relevance"))
+            sort_expression = relevance
+        else:
+            sort_expression = getattr(Product, sort_by)
 
-        if filters.district:
-            query = query.filter(Product.district == filters.district)
+        # Sorting (id breaks ties so keyset positions are unique)
+        if filters.sort_order == "asc":
+            query = query.order_by(asc(sort_expression), asc(Product.id))
+        else:
+            query = query.order_by(desc(sort_expression), desc(Product.id))
+
+        if filters.cursor:
+            # Keyset pagination: seek past the last row of the previous page
+            last_value, last_id = decode_cursor(filters.cursor, sort_by, filters.sort_order)
+            position = tuple_(sort_expression, Product.id)
+            if filters.sort_order == "asc":
+                query = query.filter(position > tuple_(last_value, last_id))
+            else:
+                query = query.filter(position < tuple_(last_value, last_id))
+        else:
+            query = query.offset((filters.page - 1) * filters.page_size)
 
-        if filters.is_organic is not None:
-            query = query.filter(Product.is_organic == filters.is_organic)
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(filters.page_size + 1).all()
+        has_more = len(rows) > filters.page_size
+        rows = rows[:filters.page_size]
 
-        if filters.min_price:
-            query = query.filter(Product.price_per_unit >= filters.min_price)
+        if sort_by == "relevance":
+            products = [product for product, _ in rows]
+            last_value = rows[-1][1] if rows else None
+        else:
+            products = rows
+            last_value = getattr(rows[-1], sort_by) if rows else None
 
-        if filters.max_price:
-            query = query.filter(Product.price_per_unit <= filters.max_price)
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(sort_by, filters.sort_order, last_value, products[-1].id)
 
-        if filters.status:
-            query = query.filter(Product.status == filters.status)
+        return products, total, next_cursor
 
-        if filters.is_featured is not None:
-            query = query.filter(Product.is_featured == filters.is_featured)
+    @staticmethod
+    def get_product_facets(db: Session, filters: ProductFilterRequest) -> Dict[str, Any]:
+        """
+        Count matching products per category, region/district, organic flag
+        and price bucket
 
-        if filters.seller_id:
-            query = query.filter(Product.seller_id == filters.seller_id)
+        All facets come from a single GROUP BY GROUPING SETS pass over the
+        filtered products; GROUPING() tells the sets apart so a NULL region
+        is not confused with a rolled-up row.
 
-        # Full-text search
-        if filters.search:
-            search_term = f"%{filters.search}%"
-            query = query.filter(
-                or_(
-                    Product.product_name.ilike(search_term),
-                    Product.description.ilike(search_term),
-                    Product.variety.ilike(search_term)
-                )
-            )
+        Args:
+            db: Database session
+            filters: Filter criteria (pagination and sorting are ignored)
 
-        # Get total count before pagination
-        total = query.count()
+        Returns:
+            Dict with total, categories, regions (with districts), organic
+            and price_buckets counts
+        """
+        query, _ = apply_product_filters(
+            db.query(Product).filter(Product.status != ProductStatus.DELETED),
+            filters
+        )
 
-        # Sorting
-        sort_column = getattr(Product, filters.sort_by)
-        if filters.sort_order == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
+        # Inline constants so the CASE in SELECT and GROUP BY is textually
+        # identical under positional bind params (asyncpg)
+        price_bucket = case(
+            *[
+                (Product.price_per_unit < literal_column(str(upper)), literal_column(str(index)))
+                for index, (_, upper) in enumerate(PRICE_BUCKETS)
+                if upper is not None
+            ],
+            else_=literal_column(str(len(PRICE_BUCKETS) - 1))
+        ).label("price_bucket")
+
+        grouped = (
+            Product.category,
+            Product.region,
+            Product.district,
+            Product.is_organic,
+            price_bucket,
+        )
 
-        # Pagination
-        offset = (filters.page - 1) * filters.page_size
-        products = query.offset(offset).limit(filters.page_size).all()
+        rows = query.with_entities(
+            *grouped,
+            func.count().label("product_count"),
+            func.grouping(Product.category).label("g_category"),
+            func.grouping(Product.region).label("g_region"),
+            func.grouping(Product.district).label("g_district"),
+            func.grouping(Product.is_organic).label("g_organic"),
+            func.grouping(price_bucket).label("g_price"),
+        ).group_by(
+            func.grouping_sets(
+                tuple_(Product.category),
+                tuple_(Product.region, Product.district),
+                tuple_(Product.region),
+                tuple_(Product.is_organic),
+                tuple_(price_bucket),
+                tuple_()
+            )
+        ).all()
+
+        total = 0
+        categories = {category.value: 0 for category in ProductCategory}
+        regions: Dict[Optional[str], Dict[str, Any]] = {}
+        districts: List[Tuple[Optional[str], Optional[str], int]] = []
+        organic = {"organic": 0, "non_organic": 0}
+        price_counts = [0] * len(PRICE_BUCKETS)
+
+        for row in rows:
+            if row.g_category == 0:
+                categories[row.category.value] = row.product_count
+            elif row.g_region == 0 and row.g_district == 0:
+                districts.append((row.region, row.district, row.product_count))
+            elif row.g_region == 0:
+                regions[row.region] = {"region": row.region, "count": row.product_count, "districts": []}
+            elif row.g_organic == 0:
+                organic["organic" if row.is_organic else "non_organic"] = row.product_count
+            elif row.g_price == 0:
+                price_counts[row.price_bucket] = row.product_count
+            else:
+                total = row.product_count
+
+        for region, district, count in districts:
+            if region in regions and district is not None:
+                regions[region]["districts"].append({"value": district, "count": count})
+
+        region_facets = sorted(
+            (r for r in regions.values() if r["region"] is not None),
+            key=lambda r: r["count"],
+            reverse=True
+        )
+        for region in region_facets:
+            region["districts"].sort(key=lambda d: d["count"], reverse=True)
 
-        return products, total
+        return {
+            "total": total,
+            "categories": [
+                {"value": value, "count": count} for value, count in categories.items()
+            ],
+            "regions": region_facets,
+            "organic": organic,
+            "price_buckets": [
+                {"min_price": lower, "max_price": upper, "count": price_counts[index]}
+                for index, (lower, upper) in enumerate(PRICE_BUCKETS)
+            ],
+        }
 
     @staticmethod
     def get_featured_products(db: Session, limit: int = 10) -> List[Product]:
@@ -281,17 +855,66 @@ class ProductService:
 
     @staticmethod
     def search_products(db: Session, search_term: str, limit: int = 20) -> List[Product]:
-        """Full-text search for products"""
-        search_pattern = f"%{search_term}%"
+        """Ranked full-text search for available products (typo tolerant)"""
+        filters = ProductFilterRequest(
+            search=search_term,
+            status=ProductStatus.AVAILABLE,
+            page_size=limit,
+            sort_by="relevance",
+            sort_order="desc",
+            count="none"
+        )
+        products, _, _ = ProductService.list_products(db, filters)
+        return products
 
-        return db.query(Product).filter(
-            and_(
-                Product.status == ProductStatus.AVAILABLE,
-                Product.search_vector.op('@@')(func.plainto_tsquery('english', search_term))
+    @staticmethod
+    def reserve_stock(db: Session, quantities: Dict[int, Decimal]) -> List[Any]:
+        """
+        Atomically take stock for every product in one statement
+
+        The caller owns the transaction: on StockUnavailableError some rows
+        may already be decremented, so it must roll back.
+
+        Args:
+            db: Database session
+            quantities: Product ID -> quantity to take
+
+        Returns:
+            Rows (id, seller_id, category, region, quantity_available, status,
+            product_name, unit_of_measure) of the updated products
+
+        Raises:
+            StockUnavailableError: If any product is missing, unavailable or short
+        """
+        rows = db.execute(
+            stock_decrement_statement(quantities).returning(
+                Product.id,
+                Product.seller_id,
+                Product.category,
+                Product.region,
+                Product.quantity_available,
+                Product.status,
+                Product.product_name,
+                Product.unit_of_measure
             )
-        ).order_by(
-            desc(func.ts_rank(Product.search_vector, func.plainto_tsquery('english', search_term)))
-        ).limit(limit).all()
+        ).all()
+
+        if len(rows) < len(quantities):
+            raise ProductService.stock_shortfall(db, set(quantities) - {row.id for row in rows})
+
+        return rows
+
+    @staticmethod
+    def stock_shortfall(db: Session, product_ids) -> StockUnavailableError:
+        """Error describing products whose stock decrement didn't apply"""
+        shortfalls = db.query(
+            Product.id,
+            Product.product_name,
+            Product.quantity_available,
+            Product.unit_of_measure,
+            Product.status
+        ).filter(Product.id.in_(product_ids)).order_by(Product.id).all()
+        return StockUnavailableError(shortfalls)
 
     @staticmethod
     def update_product_quantity(
@@ -300,7 +923,7 @@ class ProductService:
         quantity_sold: float
     ) -> Product:
         """
-        Update product quantity after order
+        Update product quantity after order (one conditional UPDATE ... RETURNING)
 
         Args:
             db: Database session
@@ -310,30 +933,19 @@ class ProductService:
         Returns:
             Updated product
         """
-        product = ProductService.get_product_by_id(db, product_id)
+        product = db.execute(
+            stock_decrement_statement({product_id: quantity_sold}, record_sale=True).returning(Product)
+        ).scalar_one_or_none()
 
         if not product:
+            shortfall = ProductService.stock_shortfall(db, [product_id])
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found"
-            )
-
-        if product.quantity_available < quantity_sold:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient quantity. Available: {product.quantity_available}, Requested: {quantity_sold}"
+                status_code=status.HTTP_400_BAD_REQUEST if shortfall.products else status.HTTP_404_NOT_FOUND,
+                detail=str(shortfall)
             )
 
-        # Update quantity
-        product.quantity_available -= quantity_sold
-        product.total_quantity_sold += quantity_sold
-
-        # Mark as out of stock if quantity is 0
-        if product.quantity_available == 0:
-            product.status = ProductStatus.OUT_OF_STOCK
-
-        product.updated_at = datetime.utcnow()
         db.commit()
-        db.refresh(product)
+
+        ProductService.invalidate_catalog_cache(product)
 
         return product
@@ -0,0 +1,191 @@
+"""
+Direct-to-bucket uploads
+Clients upload media straight to the storage backend with a presigned URL,
+then call finalize so the object is checked (and images get their variants).
+Pending uploads are tracked in Redis until finalized or expired.
+"""
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict
+import json
+import logging
+import os
+import uuid
+
+from config import settings
+from database import get_redis
+from modules.storage.service import (
+    storage_service,
+    IMAGE_CONTENT_TYPES,
+    VOICE_CONTENT_TYPES,
+    MB
+)
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_KEY = "storage_upload:{upload_id}"
+
+DOCUMENT_CONTENT_TYPES = [
+    "application/pdf",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "text/plain",
+]
+
+# Purpose -> (allowed content types, max size in MB, destination folder)
+UPLOAD_PURPOSES = {
+    "image": (IMAGE_CONTENT_TYPES, settings.MAX_IMAGE_SIZE_MB, "products"),
+    "voice": (VOICE_CONTENT_TYPES, settings.MAX_VOICE_NOTE_SIZE_MB, "voice"),
+    "document": (DOCUMENT_CONTENT_TYPES, settings.MAX_DOCUMENT_SIZE_MB, "documents"),
+}
+
+# Raw images land here and are replaced by their variants on finalize
+INCOMING_FOLDER = "incoming"
+
+
+def _redis():
+    try:
+        return get_redis()
+    except RuntimeError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Direct uploads are temporarily unavailable"
+        )
+
+
+class DirectUploadService:
+    """Presigned upload sessions"""
+
+    @staticmethod
+    def create_upload(
+        user_id: int,
+        purpose: str,
+        content_type: str,
+        filename: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Issue an upload target for the configured storage backend
+
+        Args:
+            user_id: Uploading user
+            purpose: image, voice or document
+            content_type: MIME type the client will send
+            filename: Original filename (used for the extension)
+
+        Returns:
+            Dict with upload_id, method, url, fields, headers, expires_in, max_size
+        """
+        allowed_types, max_size_mb, folder = UPLOAD_PURPOSES[purpose]
+        if content_type not in allowed_types:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported content type for {purpose}: {content_type}"
+            )
+
+        upload_id = uuid.uuid4().hex
+        ext = storage_service._get_extension(content_type) or os.path.splitext(filename)[1].lower()
+        target_folder = INCOMING_FOLDER if purpose == "image" else folder
+        file_path = f"{target_folder}/{upload_id}{ext}"
+        max_bytes = max_size_mb * MB
+        expires_in = settings.DIRECT_UPLOAD_EXPIRY_SECONDS
+
+        target = storage_service.presign_upload(file_path, content_type, max_bytes, expires_in)
+
+        client = _redis()
+        client.set(
+            UPLOAD_KEY.format(upload_id=upload_id),
+            json.dumps({
+                "user_id": user_id,
+                "purpose": purpose,
+                "file_path": file_path,
+                "folder": folder,
+                "content_type": content_type,
+                "max_bytes": max_bytes,
+            }),
+            # Leave time to finalize after the URL itself expires
+            ex=expires_in * 2
+        )
+
+        return {
+            "upload_id": upload_id,
+            "expires_in": expires_in,
+            "max_size": max_bytes,
+            **target
+        }
+
+    @staticmethod
+    def _get_session(upload_id: str) -> Dict[str, Any]:
+        raw = _redis().get(UPLOAD_KEY.format(upload_id=upload_id))
+        if not raw:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found or expired"
+            )
+        return json.loads(raw)
+
+    @staticmethod
+    async def receive_local(upload_id: str, body: AsyncIterator[bytes]) -> int:
+        """
+        Local stand-in for the presigned PUT
+
+        The unguessable upload_id plays the role of the URL signature.
+
+        Returns:
+            Bytes written
+        """
+        if storage_service.storage_type != "local":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found or expired"
+            )
+
+        session = DirectUploadService._get_session(upload_id)
+        return await storage_service.receive_local_upload(body, session["file_path"], session["max_bytes"])
+
+    @staticmethod
+    async def finalize_upload(user_id: int, upload_id: str) -> Dict[str, Any]:
+        """
+        Confirm an upload landed and make it usable
+
+        Checks the object exists and is within the size limit. Images are
+        rendered into content-addressed variants and the raw object removed.
+
+        Returns:
+            Dict with url, variants (images only) and size
+        """
+        session = DirectUploadService._get_session(upload_id)
+        if session["user_id"] != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found or expired"
+            )
+
+        file_path = session["file_path"]
+        size = await run_in_threadpool(storage_service.object_size, file_path)
+        if size is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File has not been uploaded yet"
+            )
+
+        if size > session["max_bytes"]:
+            await run_in_threadpool(storage_service.delete_object, file_path)
+            _redis().delete(UPLOAD_KEY.format(upload_id=upload_id))
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File size exceeds {session['max_bytes'] // MB}MB limit"
+            )
+
+        result: Dict[str, Any] = {"size": size, "variants": None}
+
+        if session["purpose"] == "image":
+            contents = await run_in_threadpool(storage_service.read_object, file_path)
+            stored = await storage_service.store_image_variants(contents, session["folder"])
+            await run_in_threadpool(storage_service.delete_object, file_path)
+            result.update(url=stored["url"], variants=stored["variants"])
+        else:
+            result["url"] = storage_service.public_url(file_path)
+
+        _redis().delete(UPLOAD_KEY.format(upload_id=upload_id))
+        logger.info(f"Direct upload {upload_id} finalized by user {user_id} ({size} bytes)")
+        return result
@@ -0,0 +1,26 @@
+"""
+Storage Drivers
+One driver per STORAGE_TYPE; only the configured driver's module (and SDK)
+is ever imported
+"""
+from importlib import import_module
+
+from modules.storage.drivers.base import StorageDriver
+
+# STORAGE_TYPE -> "module:class"
+DRIVERS = {
+    "local": "modules.storage.drivers.local:LocalDriver",
+    "spaces": "modules.storage.drivers.s3:SpacesDriver",
+    "backblaze": "modules.storage.drivers.s3:BackblazeDriver",
+    "gcs": "modules.storage.drivers.gcs:GCSDriver",
+}
+
+
+def load_driver(storage_type: str) -> StorageDriver:
+    """Import and construct the driver for a storage type"""
+    if storage_type not in DRIVERS:
+        raise ValueError(f"Invalid STORAGE_TYPE: {storage_type}")
+
+    module_name, class_name = DRIVERS[storage_type].split(":")
+    driver_class = getattr(import_module(module_name), class_name)
+    return driver_class()
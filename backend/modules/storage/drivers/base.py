@@ -0,0 +1,50 @@
+"""
+Storage driver interface
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+
+MB = 1024 * 1024
+CACHE_CONTROL = "max-age=31536000"
+
+
+class StorageDriver:
+    """
+    Backend-specific object operations
+
+    Keys are "folder/filename" paths; URLs are what clients are given.
+    Methods are blocking unless async (callers use the threadpool).
+    """
+
+    name = "base"
+
+    def save(self, contents: bytes, file_path: str, content_type: str) -> str:
+        """Write an object and return its public URL"""
+        raise NotImplementedError
+
+    def exists(self, file_path: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, file_path: str) -> Optional[int]:
+        """Object size in bytes, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def read(self, file_path: str) -> bytes:
+        raise NotImplementedError
+
+    def delete(self, file_path: str) -> bool:
+        raise NotImplementedError
+
+    def public_url(self, file_path: str) -> str:
+        raise NotImplementedError
+
+    def key_from_url(self, file_url: str) -> str:
+        """Object key from a URL returned by this driver (remote URLs end with folder/filename)"""
+        return '/'.join(file_url.split('/')[-2:])
+
+    async def stream(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> int:
+        """Write an object from an async chunk stream; returns bytes written"""
+        raise NotImplementedError
+
+    def presign(self, file_path: str, content_type: str, max_bytes: int, expires_in: int) -> Dict[str, Any]:
+        """Direct upload target: method, url, fields, headers"""
+        raise NotImplementedError
@@ -0,0 +1,125 @@
+"""
+Google Cloud Storage driver
+"""
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, Optional
+from datetime import timedelta
+import logging
+
+from google.cloud import storage
+
+from config import settings
+from modules.storage.drivers.base import StorageDriver, MB
+
+logger = logging.getLogger(__name__)
+
+GCS_CHUNK_SIZE = 8 * MB  # Resumable chunk size, must be a multiple of 256KB
+
+
+class GCSDriver(StorageDriver):
+    """Public objects in GCS_BUCKET_NAME"""
+
+    name = "gcs"
+
+    def __init__(self):
+        # Credentials are automatically picked up from environment (GOOGLE_APPLICATION_CREDENTIALS)
+        # or metadata server if running on Cloud Run
+        self.client = storage.Client()
+        self.bucket_name = settings.GCS_BUCKET_NAME
+        self.bucket = self.client.bucket(self.bucket_name)
+        logger.info(f"✅ Using Google Cloud Storage: {self.bucket_name}")
+
+    def save(self, contents: bytes, file_path: str, content_type: str) -> str:
+        try:
+            blob = self.bucket.blob(file_path)
+            blob.upload_from_string(contents, content_type=content_type)
+
+            # Make public if needed, or rely on bucket policy
+            blob.make_public()
+            return blob.public_url
+
+        except Exception as e:
+            logger.error(f"GCS upload failed: {e}")
+            raise HTTPException(500, "File upload failed")
+
+    def exists(self, file_path: str) -> bool:
+        try:
+            return self.bucket.blob(file_path).exists()
+        except Exception:
+            return False
+
+    def size(self, file_path: str) -> Optional[int]:
+        try:
+            blob = self.bucket.get_blob(file_path)
+            return blob.size if blob else None
+        except Exception:
+            return None
+
+    def read(self, file_path: str) -> bytes:
+        return self.bucket.blob(file_path).download_as_bytes()
+
+    def delete(self, file_path: str) -> bool:
+        try:
+            self.bucket.blob(file_path).delete()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to delete GCS file {file_path}: {e}")
+            return False
+
+    def public_url(self, file_path: str) -> str:
+        return self.bucket.blob(file_path).public_url
+
+    async def stream(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> int:
+        """Resumable upload; an unfinished session never becomes an object"""
+        blob = self.bucket.blob(file_path)
+        size = 0
+        try:
+            writer = blob.open("wb", content_type=content_type, chunk_size=GCS_CHUNK_SIZE)
+            async for chunk in chunks:
+                await run_in_threadpool(writer.write, chunk)
+                size += len(chunk)
+            await run_in_threadpool(writer.close)
+            await run_in_threadpool(blob.make_public)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"GCS resumable upload failed for {file_path}: {e}")
+            raise HTTPException(500, "File upload failed")
+
+        return size
+
+    def presign(self, file_path: str, content_type: str, max_bytes: int, expires_in: int) -> Dict[str, Any]:
+        """V4 signed PUT; x-goog-content-length-range makes GCS enforce the size"""
+        length_range = f"0,{max_bytes}"
+        url = self.bucket.blob(file_path).generate_signed_url(
+            version="v4",
+            method="PUT",
+            expiration=timedelta(seconds=expires_in),
+            content_type=content_type,
+            headers={"x-goog-content-length-range": length_range},
+            **self._signing_args()
+        )
+        return {
+            "method": "PUT",
+            "url": url,
+            "fields": {},
+            "headers": {"Content-Type": content_type, "x-goog-content-length-range": length_range},
+        }
+
+    def _signing_args(self) -> Dict[str, str]:
+        """
+        Key-file credentials sign locally. Cloud Run's metadata credentials
+        have no private key, so signing goes through IAM with the access token.
+        """
+        credentials = self.client._credentials
+        if hasattr(credentials, "sign_bytes") and getattr(credentials, "signer", None):
+            return {}
+
+        from google.auth.transport.requests import Request
+        if not credentials.valid:
+            credentials.refresh(Request())
+        return {
+            "service_account_email": credentials.service_account_email,
+            "access_token": credentials.token,
+        }
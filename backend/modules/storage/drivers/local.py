@@ -0,0 +1,93 @@
+"""
+Local filesystem storage driver
+"""
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, Optional
+import logging
+import os
+
+from config import settings
+from modules.storage.drivers.base import StorageDriver
+
+logger = logging.getLogger(__name__)
+
+
+class LocalDriver(StorageDriver):
+    """Files under LOCAL_STORAGE_PATH, served at /uploads"""
+
+    name = "local"
+
+    def __init__(self):
+        # Create uploads directory if it doesn't exist
+        self.base_path = settings.LOCAL_STORAGE_PATH
+        os.makedirs(self.base_path, exist_ok=True)
+        os.makedirs(f"{self.base_path}/products", exist_ok=True)
+        os.makedirs(f"{self.base_path}/chat", exist_ok=True)
+        os.makedirs(f"{self.base_path}/voice", exist_ok=True)
+        logger.info(f"✅ Using LOCAL storage: {self.base_path}")
+
+    def _full_path(self, file_path: str) -> str:
+        return os.path.join(self.base_path, file_path)
+
+    def save(self, contents: bytes, file_path: str, content_type: str) -> str:
+        full_path = self._full_path(file_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        with open(full_path, 'wb') as f:
+            f.write(contents)
+
+        return self.public_url(file_path)
+
+    def exists(self, file_path: str) -> bool:
+        return os.path.exists(self._full_path(file_path))
+
+    def size(self, file_path: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self._full_path(file_path))
+        except OSError:
+            return None
+
+    def read(self, file_path: str) -> bytes:
+        with open(self._full_path(file_path), 'rb') as f:
+            return f.read()
+
+    def delete(self, file_path: str) -> bool:
+        full_path = self._full_path(file_path)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+            return True
+        return False
+
+    def public_url(self, file_path: str) -> str:
+        return f"/uploads/{file_path}"
+
+    def key_from_url(self, file_url: str) -> str:
+        # Accept "/uploads/x/y", "uploads/x/y" and bare "x/y"
+        file_path = file_url.lstrip("/")
+        if file_path.startswith("uploads/"):
+            file_path = file_path[len("uploads/"):]
+        return file_path
+
+    async def stream(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> int:
+        """Write chunks to a .part file and move it into place when complete"""
+        full_path = self._full_path(file_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        part_path = f"{full_path}.part"
+
+        size = 0
+        try:
+            with open(part_path, 'wb') as f:
+                async for chunk in chunks:
+                    await run_in_threadpool(f.write, chunk)
+                    size += len(chunk)
+            os.replace(part_path, full_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+        return size
+
+    def presign(self, file_path: str, content_type: str, max_bytes: int, expires_in: int) -> Dict[str, Any]:
+        # The route points the client at the API's stand-in PUT endpoint
+        return {"method": "PUT", "url": "", "fields": {}, "headers": {"Content-Type": content_type}}
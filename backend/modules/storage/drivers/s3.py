@@ -0,0 +1,192 @@
+"""
+S3-compatible storage drivers (DigitalOcean Spaces, Backblaze B2)
+"""
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, Optional
+import logging
+
+import boto3
+
+from config import settings
+from modules.storage.drivers.base import StorageDriver, CACHE_CONTROL, MB
+
+logger = logging.getLogger(__name__)
+
+MULTIPART_PART_SIZE = 8 * MB  # S3 parts must be >= 5MB (except the last)
+
+
+class S3CompatibleDriver(StorageDriver):
+    """Shared S3 API operations"""
+
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def _object_args(self, content_type: str) -> Dict[str, str]:
+        return {"ContentType": content_type, "CacheControl": CACHE_CONTROL}
+
+    def save(self, contents: bytes, file_path: str, content_type: str) -> str:
+        try:
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=file_path,
+                Body=contents,
+                **self._object_args(content_type)
+            )
+            return self.public_url(file_path)
+
+        except Exception as e:
+            logger.error(f"{self.name} upload failed: {e}")
+            raise HTTPException(500, "File upload failed")
+
+    def exists(self, file_path: str) -> bool:
+        return self.size(file_path) is not None
+
+    def size(self, file_path: str) -> Optional[int]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=file_path)["ContentLength"]
+        except Exception:
+            return None
+
+    def read(self, file_path: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=file_path)["Body"].read()
+
+    def delete(self, file_path: str) -> bool:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=file_path)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to delete {self.name} file {file_path}: {e}")
+            return False
+
+    async def stream(self, chunks: AsyncIterator[bytes], file_path: str, content_type: str) -> int:
+        """
+        Multipart upload; uploads smaller than one part go out as a single PUT
+        """
+        object_args = self._object_args(content_type)
+        buffer = bytearray()
+        parts = []
+        upload_id = None
+        size = 0
+
+        async def flush_part():
+            nonlocal upload_id, buffer
+            if upload_id is None:
+                created = await run_in_threadpool(
+                    self.client.create_multipart_upload, Bucket=self.bucket, Key=file_path, **object_args
+                )
+                upload_id = created["UploadId"]
+            part_number = len(parts) + 1
+            part = await run_in_threadpool(
+                self.client.upload_part,
+                Bucket=self.bucket, Key=file_path, UploadId=upload_id,
+                PartNumber=part_number, Body=bytes(buffer)
+            )
+            parts.append({"ETag": part["ETag"], "PartNumber": part_number})
+            buffer = bytearray()
+
+        async def abort():
+            if upload_id:
+                await run_in_threadpool(
+                    self.client.abort_multipart_upload, Bucket=self.bucket, Key=file_path, UploadId=upload_id
+                )
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) >= MULTIPART_PART_SIZE:
+                    await flush_part()
+
+            if upload_id is None:
+                await run_in_threadpool(
+                    self.client.put_object, Bucket=self.bucket, Key=file_path, Body=bytes(buffer), **object_args
+                )
+            else:
+                if buffer:
+                    await flush_part()
+                await run_in_threadpool(
+                    self.client.complete_multipart_upload,
+                    Bucket=self.bucket, Key=file_path, UploadId=upload_id,
+                    MultipartUpload={"Parts": parts}
+                )
+        except HTTPException:
+            await abort()
+            raise
+        except Exception as e:
+            logger.error(f"Multipart upload failed for {file_path}: {e}")
+            await abort()
+            raise HTTPException(500, "File upload failed")
+
+        return size
+
+
+class SpacesDriver(S3CompatibleDriver):
+    """DigitalOcean Spaces (public-read objects behind the CDN)"""
+
+    name = "spaces"
+
+    def __init__(self):
+        client = boto3.client(
+            's3',
+            region_name=settings.SPACES_REGION,
+            endpoint_url=settings.SPACES_ENDPOINT,
+            aws_access_key_id=settings.SPACES_ACCESS_KEY,
+            aws_secret_access_key=settings.SPACES_SECRET_KEY
+        )
+        super().__init__(client, settings.SPACES_BUCKET)
+        logger.info(f"✅ Using DO Spaces: {self.bucket}")
+
+    def _object_args(self, content_type: str) -> Dict[str, str]:
+        return {**super()._object_args(content_type), "ACL": "public-read"}
+
+    def public_url(self, file_path: str) -> str:
+        cdn_url = settings.SPACES_CDN_URL or settings.SPACES_ENDPOINT
+        return f"{cdn_url}/{file_path}"
+
+    def presign(self, file_path: str, content_type: str, max_bytes: int, expires_in: int) -> Dict[str, Any]:
+        """Presigned POST: the policy enforces type and size"""
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=file_path,
+            Fields={"acl": "public-read", "Content-Type": content_type},
+            Conditions=[
+                {"acl": "public-read"},
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expires_in
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+
+class BackblazeDriver(S3CompatibleDriver):
+    """Backblaze B2 through its S3-compatible API"""
+
+    name = "backblaze"
+
+    def __init__(self):
+        client = boto3.client(
+            's3',
+            endpoint_url=settings.BACKBLAZE_ENDPOINT,
+            aws_access_key_id=settings.BACKBLAZE_KEY_ID,
+            aws_secret_access_key=settings.BACKBLAZE_APP_KEY
+        )
+        super().__init__(client, settings.BACKBLAZE_BUCKET_NAME)
+        self.endpoint = settings.BACKBLAZE_ENDPOINT
+        logger.info(f"✅ Using Backblaze B2: {self.bucket}")
+
+    def public_url(self, file_path: str) -> str:
+        # S3-compatible public URL: https://{bucket}.s3.{region}.backblazeb2.com/{file-path}
+        region = self.endpoint.replace("https://s3.", "").replace(".backblazeb2.com", "")
+        return f"https://{self.bucket}.s3.{region}.backblazeb2.com/{file_path}"
+
+    def presign(self, file_path: str, content_type: str, max_bytes: int, expires_in: int) -> Dict[str, Any]:
+        """Presigned PUT (B2 has no POST uploads; size is checked on finalize)"""
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": file_path, "ContentType": content_type},
+            ExpiresIn=expires_in
+        )
+        return {"method": "PUT", "url": url, "fields": {}, "headers": {"Content-Type": content_type}}
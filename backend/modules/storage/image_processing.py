@@ -0,0 +1,114 @@
+"""
+Image processing for uploads
+Runs in a bounded process pool so PIL decoding/resizing/encoding never blocks
+the event loop. Kept free of app imports so spawned workers start quickly.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+import asyncio
+import multiprocessing
+
+
+# Variant name -> longest edge in pixels
+IMAGE_VARIANTS: Dict[str, int] = {
+    "large": 1200,
+    "card": 400,
+    "thumb": 96,
+}
+
+# Output format -> (PIL format, file extension, content type, save options)
+IMAGE_FORMATS: Dict[str, Tuple[str, str, str, dict]] = {
+    "jpeg": ("JPEG", ".jpg", "image/jpeg", {"quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", ".webp", "image/webp", {"quality": 80, "method": 4}),
+}
+
+
+class ImageProcessingError(Exception):
+    """Raised when an upload cannot be decoded as an image"""
+
+
+def render_variants(
+    image_bytes: bytes,
+    variants: Tuple[str, ...] = tuple(IMAGE_VARIANTS),
+    formats: Tuple[str, ...] = tuple(IMAGE_FORMATS)
+) -> Dict[str, Dict[str, bytes]]:
+    """
+    Decode once and encode every requested size/format
+
+    Sizes are produced largest first, each resized from the previous one,
+    so a phone photo is only downscaled from full resolution once.
+
+    Returns:
+        {variant: {format: encoded bytes}}
+    """
+    # Imported here: only pool workers pay for loading PIL, not API startup
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(BytesIO(image_bytes))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+    except Exception as e:
+        raise ImageProcessingError(str(e))
+
+    output: Dict[str, Dict[str, bytes]] = {}
+    for name in sorted(variants, key=lambda v: IMAGE_VARIANTS[v], reverse=True):
+        size = IMAGE_VARIANTS[name]
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        output[name] = {}
+        for fmt in formats:
+            pil_format, _, _, options = IMAGE_FORMATS[fmt]
+            buffer = BytesIO()
+            image.save(buffer, format=pil_format, **options)
+            output[name][fmt] = buffer.getvalue()
+
+    return output
+
+
+class ImageProcessingPool:
+    """
+    Bounded process pool for render_variants
+
+    At most `max_pending` images are decoded or queued at once; further
+    uploads wait on the semaphore instead of piling decoded photos into memory.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use so the gunicorn master (--preload) never forks it;
+        # spawn avoids inheriting the app's threads and connections
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def render(
+        self,
+        image_bytes: bytes,
+        variants: Tuple[str, ...] = tuple(IMAGE_VARIANTS),
+        formats: Tuple[str, ...] = tuple(IMAGE_FORMATS)
+    ) -> Dict[str, Dict[str, bytes]]:
+        """Run render_variants in the pool without blocking the event loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), render_variants, image_bytes, variants, formats
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
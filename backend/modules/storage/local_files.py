@@ -0,0 +1,174 @@
+"""
+Local upload serving
+ASGI app mounted on /uploads in local storage mode. Upload names are UUIDs or
+content hashes and are never rewritten, so responses carry a strong ETag and
+`Cache-Control: immutable`, and single byte ranges are honoured so audio and
+video can seek.
+"""
+from email.utils import formatdate
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+import mimetypes
+import os
+import re
+import stat
+
+from modules.storage.drivers.base import MB
+
+READ_CHUNK_SIZE = 1 * MB
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range against a file size
+
+    Returns:
+        Inclusive (start, end), or None if the header should be ignored
+        (malformed or multi-range: the whole file is served instead)
+
+    Raises:
+        ValueError: If the range is well-formed but unsatisfiable
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+class LocalUploadFiles:
+    """
+    Serve files from a directory with Range, ETag and immutable caching
+
+    The body goes out through the server's zero-copy (sendfile) extension
+    when it offers one, otherwise in threadpool-read chunks.
+    """
+
+    def __init__(self, directory: str, max_age: int):
+        self.directory = os.path.realpath(directory)
+        self.cache_control = f"public, max-age={max_age}, immutable".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        full_path = self._resolve(scope["path"])
+        try:
+            file_stat = await run_in_threadpool(os.stat, full_path) if full_path else None
+        except OSError:
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+            await self._send_empty(send, 404)
+            return
+
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        size = file_stat.st_size
+        etag = self._etag(full_path, file_stat)
+        headers: Headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", self.cache_control),
+            (b"last-modified", formatdate(file_stat.st_mtime, usegmt=True).encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            await self._send_empty(send, 304, headers)
+            return
+
+        status, start, end = 200, 0, size - 1
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range.strip() == etag):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                headers.append((b"content-range", f"bytes */{size}".encode()))
+                await self._send_empty(send, 416, headers)
+                return
+            if byte_range:
+                status, (start, end) = 206, byte_range
+                headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+
+        content_type, _ = mimetypes.guess_type(full_path)
+        headers.append((b"content-type", (content_type or "application/octet-stream").encode()))
+        headers.append((b"content-length", str(end - start + 1).encode()))
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope["method"] == "HEAD" or size == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await self._send_file(scope, send, full_path, start, end - start + 1)
+
+    def _resolve(self, request_path: str) -> Optional[str]:
+        """Absolute path inside the upload directory, or None for traversal/partial files"""
+        relative = request_path.lstrip("/")
+        if not relative or relative.endswith(".part"):
+            return None
+        full_path = os.path.realpath(os.path.join(self.directory, relative))
+        if os.path.commonpath([self.directory, full_path]) != self.directory:
+            return None
+        return full_path
+
+    def _etag(self, full_path: str, file_stat: os.stat_result) -> str:
+        """
+        Strong validator: content-addressed names are their own hash,
+        anything else is identified by inode, size and mtime
+        """
+        name, _ = os.path.splitext(os.path.basename(full_path))
+        if len(name) == 64 and all(c in "0123456789abcdef" for c in name):
+            return f'"{name}"'
+        return f'"{file_stat.st_ino:x}-{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+
+    async def _send_file(self, scope, send, full_path: str, offset: int, count: int):
+        f = await run_in_threadpool(open, full_path, "rb")
+        try:
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": f.fileno(),
+                    "offset": offset,
+                    "count": count,
+                })
+                return
+
+            await run_in_threadpool(f.seek, offset)
+            remaining = count
+            while remaining > 0:
+                chunk = await run_in_threadpool(f.read, min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await run_in_threadpool(f.close)
+
+    async def _send_empty(self, send, status: int, headers: Optional[Headers] = None):
+        await send({"type": "http.response.start", "status": status, "headers": (headers or []) + [(b"content-length", b"0")]})
+        await send({"type": "http.response.body", "body": b""})
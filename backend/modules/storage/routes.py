@@ -2,7 +2,8 @@
 Storage Routes
 API endpoints for file uploads and management
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional
 import logging
@@ -11,9 +12,13 @@ from database import get_db
 from models import User
 from modules.auth.dependencies import get_current_verified_user
 from modules.storage.service import storage_service
+from modules.storage.direct_upload import DirectUploadService
 from modules.storage.schemas import (
     FileUploadResponse,
-    MessageResponse
+    MessageResponse,
+    UploadUrlRequest,
+    UploadUrlResponse,
+    FinalizeUploadResponse
 )
 
 logger = logging.getLogger(__name__)
@@ -97,8 +102,7 @@ async def upload_voice_note(
 
         # Upload voice note
         file_url = await storage_service.upload_voice_note(
-            file=file,
-            user_id=current_user.id
+            file=file
         )
 
         return FileUploadResponse(
@@ -165,16 +169,9 @@ async def upload_document(
                 folder="documents"
             )
         else:
-            # For documents, use generic file upload (which handles generic files)
-            # Note: upload_voice_note is for audio only, we should use upload_file for generic docs
-            # But since upload_file returns a dict, we need to handle it.
-            # Let's check if there is a generic upload method.
-            # Looking at service.py, there is upload_file.
-            
+            # For documents, stream the upload straight to storage
             result = await storage_service.upload_file(
-                file_bytes=await file.read(),
-                filename=file.filename,
-                content_type=file.content_type,
+                file=file,
                 folder="documents"
             )
             file_url = result["url"]
@@ -195,6 +192,99 @@ async def upload_document(
         )
 
 
+@router.post("/upload-url", response_model=UploadUrlResponse)
+async def create_upload_url(
+    request: UploadUrlRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    Get a URL to upload a file directly to storage
+
+    **Requires authentication**
+
+    - **purpose**: image (5MB), voice (10MB) or document (20MB)
+    - **content_type**: MIME type of the file
+    - **filename**: Original filename (optional)
+
+    Upload the file with the returned `method`, `url`, `fields` and `headers`,
+    then call `POST /storage/upload-url/{upload_id}/finalize`. The URL expires
+    after `expires_in` seconds. In local storage mode the URL points to this
+    API's stand-in endpoint with the same contract.
+    """
+    try:
+        result = await run_in_threadpool(
+            DirectUploadService.create_upload,
+            current_user.id,
+            request.purpose,
+            request.content_type,
+            request.filename or ""
+        )
+
+        if not result["url"]:
+            result["url"] = str(http_request.url_for("receive_direct_upload", upload_id=result["upload_id"]))
+
+        return UploadUrlResponse(success=True, **result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Create upload URL error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create upload URL"
+        )
+
+
+@router.put("/direct/{upload_id}", response_model=MessageResponse, name="receive_direct_upload")
+async def receive_direct_upload(upload_id: str, request: Request):
+    """
+    Local storage stand-in for a presigned PUT
+
+    **No bearer token** - the upload id from `/storage/upload-url` authorizes
+    the request, as a presigned URL would. Only available with STORAGE_TYPE=local.
+    """
+    await DirectUploadService.receive_local(upload_id, request.stream())
+
+    return MessageResponse(
+        success=True,
+        message="File received"
+    )
+
+
+@router.post("/upload-url/{upload_id}/finalize", response_model=FinalizeUploadResponse)
+async def finalize_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    Finalize a direct upload
+
+    **Requires authentication** (the user who requested the URL)
+
+    Verifies the file reached storage within the size limit. Images are
+    converted into 1200px/400px/96px JPEG and WebP variants.
+    """
+    try:
+        result = await DirectUploadService.finalize_upload(current_user.id, upload_id)
+
+        return FinalizeUploadResponse(
+            success=True,
+            file_url=result["url"],
+            size=result["size"],
+            variants=result["variants"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Finalize upload error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to finalize upload"
+        )
+
+
 @router.delete("/{file_path:path}", response_model=MessageResponse)
 async def delete_file(
     file_path: str,
@@ -2,8 +2,8 @@
 Storage Schemas
 Pydantic schemas for file upload responses
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
 
 
 class FileUploadResponse(BaseModel):
@@ -17,3 +17,36 @@ class MessageResponse(BaseModel):
     """Generic message response"""
     success: bool
     message: str
+
+
+class UploadUrlRequest(BaseModel):
+    """Request a direct-to-storage upload target"""
+    purpose: str = Field(..., pattern="^(image|voice|document)$")
+    content_type: str = Field(..., max_length=100)
+    filename: Optional[str] = Field(None, max_length=255)
+
+
+class UploadUrlResponse(BaseModel):
+    """
+    Where and how to send the file
+
+    For POST, send a multipart form with `fields` followed by the file as
+    `file`; for PUT, send the raw bytes with `headers`.
+    """
+    success: bool = True
+    upload_id: str
+    method: str  # PUT or POST
+    url: str
+    fields: Dict[str, str] = {}
+    headers: Dict[str, str] = {}
+    expires_in: int
+    max_size: int
+
+
+class FinalizeUploadResponse(BaseModel):
+    """Finalized direct upload"""
+    success: bool = True
+    file_url: str
+    size: int
+    variants: Optional[Dict[str, Dict[str, str]]] = None  # Images: {large|card|thumb: {jpeg|webp: url}}
+    message: str = "Upload complete"
@@ -1,72 +1,75 @@
 """
-Storage service - supports both local filesystem and DO Spaces
+Storage service - local filesystem, DO Spaces, Backblaze B2 or GCS (see drivers/)
+Images are content-addressed (SHA-256 of the optimized bytes) and reference counted
 """
 from fastapi import UploadFile, HTTPException
-from PIL import Image
-from io import BytesIO
+from fastapi.concurrency import run_in_threadpool
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import hashlib
 import os
+import re
 import uuid
-import boto3
-from google.cloud import storage
 from config import settings
+from database import get_redis
+from modules.storage.drivers import DRIVERS, StorageDriver, load_driver
+from modules.storage.drivers.base import MB
+from modules.storage.image_processing import (
+    IMAGE_FORMATS,
+    ImageProcessingError,
+    ImageProcessingPool
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+IMAGE_CONTENT_TYPES = ['image/jpeg', 'image/png', 'image/jpg', 'image/webp']
+VOICE_CONTENT_TYPES = ['audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/mp4', 'audio/ogg', 'audio/webm']
+
+UPLOAD_CHUNK_SIZE = 1 * MB
+
+# Content-addressed objects are named <sha256 hex><ext>
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+REF_COUNTS_KEY = "storage_refs"
+REF_LOCK_PREFIX = "storage_ref_lock"
+
+
+def _redis():
+    try:
+        return get_redis()
+    except RuntimeError:
+        return None
+
+
+# Shared pool for resizing/encoding uploads
+image_pool = ImageProcessingPool(
+    workers=settings.IMAGE_PROCESS_WORKERS,
+    max_pending=settings.IMAGE_PROCESS_MAX_PENDING
+)
+
 
 class StorageService:
     """
     Unified storage service
-    Automatically uses local filesystem or DO Spaces based on config
+    Delegates object operations to the driver for STORAGE_TYPE
     """
     
     def __init__(self):
         self.storage_type = settings.STORAGE_TYPE
-        
-        if self.storage_type == "local":
-            # Create uploads directory if it doesn't exist
-            self.base_path = settings.LOCAL_STORAGE_PATH
-            os.makedirs(self.base_path, exist_ok=True)
-            os.makedirs(f"{self.base_path}/products", exist_ok=True)
-            os.makedirs(f"{self.base_path}/chat", exist_ok=True)
-            os.makedirs(f"{self.base_path}/voice", exist_ok=True)
-            logger.info(f"✅ Using LOCAL storage: {self.base_path}")
-        
-        elif self.storage_type == "spaces":
-            # Initialize DO Spaces client
-            self.s3_client = boto3.client(
-                's3',
-                region_name=settings.SPACES_REGION,
-                endpoint_url=settings.SPACES_ENDPOINT,
-                aws_access_key_id=settings.SPACES_ACCESS_KEY,
-                aws_secret_access_key=settings.SPACES_SECRET_KEY
-            )
-            self.bucket = settings.SPACES_BUCKET
-            logger.info(f"✅ Using DO Spaces: {self.bucket}")
-
-        elif self.storage_type == "gcs":
-            # Initialize Google Cloud Storage client
-            # Credentials are automatically picked up from environment (GOOGLE_APPLICATION_CREDENTIALS)
-            # or metadata server if running on Cloud Run
-            self.gcs_client = storage.Client()
-            self.bucket_name = settings.GCS_BUCKET_NAME
-            self.bucket = self.gcs_client.bucket(self.bucket_name)
-            logger.info(f"✅ Using Google Cloud Storage: {self.bucket_name}")
-
-        elif self.storage_type == "backblaze":
-            # Initialize Backblaze B2 client (S3-compatible)
-            self.b2_client = boto3.client(
-                's3',
-                endpoint_url=settings.BACKBLAZE_ENDPOINT,
-                aws_access_key_id=settings.BACKBLAZE_KEY_ID,
-                aws_secret_access_key=settings.BACKBLAZE_APP_KEY
-            )
-            self.b2_bucket = settings.BACKBLAZE_BUCKET_NAME
-            self.b2_endpoint = settings.BACKBLAZE_ENDPOINT
-            logger.info(f"✅ Using Backblaze B2: {self.b2_bucket}")
-
-        else:
+        if self.storage_type not in DRIVERS:
             raise ValueError(f"Invalid STORAGE_TYPE: {self.storage_type}")
+
+        # Backend SDK/client is loaded on first use (see drivers/)
+        self._driver: Optional[StorageDriver] = None
+
+
+    @property
+    def driver(self) -> StorageDriver:
+        """Driver for the configured STORAGE_TYPE, imported and connected on first use"""
+        if self._driver is None:
+            self._driver = load_driver(self.storage_type)
+        return self._driver
     
     
     async def upload_image(
@@ -87,199 +90,314 @@ class StorageService:
             URL to access the image
         """
         # Validate file type
-        if file.content_type not in ['image/jpeg', 'image/png', 'image/jpg']:
-            raise HTTPException(400, "Invalid image type. Use JPEG or PNG.")
+        if file.content_type not in IMAGE_CONTENT_TYPES:
+            raise HTTPException(400, "Invalid image type. Use JPEG, PNG or WebP.")
         
-        # Read and optimize image
-        contents = await file.read()
+        # Read (size-checked as it streams) and optimize image off the event loop
+        contents = await self._read_limited(file, settings.MAX_IMAGE_SIZE_MB * MB)
         
         if optimize:
-            contents = self._optimize_image(contents)
-        
-        # Generate unique filename
-        filename = f"{uuid.uuid4()}.jpg"
-        file_path = f"{folder}/{filename}"
+            try:
+                rendered = await image_pool.render(contents, ("large",), ("jpeg",))
+                contents = rendered["large"]["jpeg"]
+            except ImageProcessingError as e:
+                logger.error(f"Image optimization failed: {e}")  # Store original if optimization fails
         
-        # Upload based on storage type
-        if self.storage_type == "local":
-            return self._save_local(contents, file_path)
-        elif self.storage_type == "spaces":
-            return self._save_spaces(contents, file_path)
-        elif self.storage_type == "gcs":
-            return self._save_gcs(contents, file_path, "image/jpeg")
-        else:  # backblaze
-            return self._save_backblaze(contents, file_path, "image/jpeg")
-    
-    
-    def _optimize_image(self, image_bytes: bytes) -> bytes:
-        """Optimize image (resize, compress)"""
+        return await run_in_threadpool(self._store_content_addressed, contents, folder, ".jpg", "image/jpeg")
+
+
+    async def upload_image_variants(
+        self,
+        file: UploadFile,
+        folder: str = "products"
+    ) -> Dict[str, Any]:
+        """
+        Upload an image as large/card/thumb variants in JPEG and WebP
+
+        Args:
+            file: Uploaded file
+            folder: Subfolder (products, chat, etc.)
+
+        Returns:
+            {"url": large JPEG URL, "variants": {variant: {format: url}}}
+        """
+        if file.content_type not in IMAGE_CONTENT_TYPES:
+            raise HTTPException(400, "Invalid image type. Use JPEG, PNG or WebP.")
+
+        contents = await self._read_limited(file, settings.MAX_IMAGE_SIZE_MB * MB)
+        return await self.store_image_variants(contents, folder)
+
+
+    async def store_image_variants(self, contents: bytes, folder: str = "products") -> Dict[str, Any]:
+        """
+        Render and store large/card/thumb variants of raw image bytes
+
+        Returns:
+            {"url": large JPEG URL, "variants": {variant: {format: url}}}
+        """
         try:
-            image = Image.open(BytesIO(image_bytes))
-            
-            # Resize if too large
-            max_size = (1200, 1200)
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Convert to RGB if needed
-            if image.mode in ('RGBA', 'P'):
-                image = image.convert('RGB')
-            
-            # Save optimized
-            output = BytesIO()
-            image.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            
-            return output.read()
-        
-        except Exception as e:
-            logger.error(f"Image optimization failed: {e}")
-            return image_bytes  # Return original if optimization fails
-    
-    
-    def _save_local(self, contents: bytes, file_path: str) -> str:
-        """Save file to local filesystem"""
-        full_path = os.path.join(self.base_path, file_path)
-        
-        # Create directory if needed
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        
-        # Write file
-        with open(full_path, 'wb') as f:
-            f.write(contents)
-        
-        # Return URL (served by FastAPI static files)
-        return f"/uploads/{file_path}"
-    
-    
-    def _save_spaces(self, contents: bytes, file_path: str) -> str:
-        """Save file to DO Spaces"""
+            rendered = await image_pool.render(contents)
+        except ImageProcessingError as e:
+            logger.error(f"Image processing failed: {e}")
+            raise HTTPException(400, "Could not read image file")
+
+        uploads = []
+        for variant, encoded in rendered.items():
+            for fmt, data in encoded.items():
+                _, extension, content_type, _ = IMAGE_FORMATS[fmt]
+                uploads.append((variant, fmt, data, extension, content_type))
+
+        urls = await asyncio.gather(*[
+            run_in_threadpool(self._store_content_addressed, data, folder, extension, content_type)
+            for _, _, data, extension, content_type in uploads
+        ])
+
+        variants: Dict[str, Dict[str, str]] = {}
+        for (variant, fmt, _, _, _), url in zip(uploads, urls):
+            variants.setdefault(variant, {})[fmt] = url
+
+        return {"url": variants["large"]["jpeg"], "variants": variants}
+
+
+    def _store_content_addressed(
+        self,
+        contents: bytes,
+        folder: str,
+        extension: str,
+        content_type: str
+    ) -> str:
+        """
+        Store bytes under a key derived from their SHA-256
+
+        Identical content maps to the same object: if it already exists the
+        write is skipped and only its reference count goes up.
+
+        Returns:
+            Public URL of the (possibly pre-existing) object
+        """
+        digest = hashlib.sha256(contents).hexdigest()
+        file_path = f"{folder}/{digest}{extension}"
+
+        with self._ref_lock(file_path):
+            if self._exists(file_path):
+                url = self._public_url(file_path)
+                logger.debug(f"Deduplicated upload {file_path}")
+            else:
+                url = self._save(contents, file_path, content_type)
+            self._change_refs(file_path, 1)
+
+        return url
+
+
+    def _ref_lock(self, file_path: str):
+        """Per-object lock so a dedup hit can't race a final-reference delete"""
+        client = _redis()
+        if client is None:
+            return nullcontext()
+        return client.lock(f"{REF_LOCK_PREFIX}:{file_path}", timeout=30, blocking_timeout=10)
+
+
+    def _change_refs(self, file_path: str, delta: int) -> Optional[int]:
+        """Adjust an object's reference count; None when counts are unavailable"""
+        client = _redis()
+        if client is None:
+            return None
         try:
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=file_path,
-                Body=contents,
-                ACL='public-read',
-                ContentType='image/jpeg',
-                CacheControl='max-age=31536000'
-            )
-            
-            # Return CDN URL
-            cdn_url = settings.SPACES_CDN_URL or settings.SPACES_ENDPOINT
-            return f"{cdn_url}/{file_path}"
-        
+            return client.hincrby(REF_COUNTS_KEY, file_path, delta)
         except Exception as e:
-            logger.error(f"DO Spaces upload failed: {e}")
-            raise HTTPException(500, "File upload failed")
+            logger.warning(f"Reference count update failed for {file_path}: {e}")
+            return None
 
 
-    def _save_gcs(self, contents: bytes, file_path: str, content_type: str) -> str:
-        """Save file to Google Cloud Storage"""
+    def _exists(self, file_path: str) -> bool:
+        """Check whether an object is already stored"""
         try:
-            blob = self.bucket.blob(file_path)
-            blob.upload_from_string(
-                contents,
-                content_type=content_type
-            )
-            
-            # Make public if needed, or rely on bucket policy
-            blob.make_public()
-            
-            # Return public URL
-            return blob.public_url
+            return self.driver.exists(file_path)
+        except Exception:
+            # Check failed: fall back to writing the object
+            return False
 
-        except Exception as e:
-            logger.error(f"GCS upload failed: {e}")
-            raise HTTPException(500, "File upload failed")
 
+    def _public_url(self, file_path: str) -> str:
+        """Public URL for a stored object (same format _save returns)"""
+        return self.driver.public_url(file_path)
 
-    def _save_backblaze(self, contents: bytes, file_path: str, content_type: str) -> str:
-        """Save file to Backblaze B2 (S3-compatible)"""
-        try:
-            self.b2_client.put_object(
-                Bucket=self.b2_bucket,
-                Key=file_path,
-                Body=contents,
-                ContentType=content_type,
-                CacheControl='max-age=31536000'
-            )
-
-            # Return public URL
-            # Backblaze B2 public URL format: https://f004.backblazeb2.com/file/{bucket-name}/{file-path}
-            # Or using S3-compatible: https://{bucket}.s3.{region}.backblazeb2.com/{file-path}
-            # Extract region from endpoint
-            endpoint = self.b2_endpoint.replace("https://s3.", "").replace(".backblazeb2.com", "")
-            return f"https://{self.b2_bucket}.s3.{endpoint}.backblazeb2.com/{file_path}"
 
-        except Exception as e:
-            logger.error(f"Backblaze B2 upload failed: {e}")
-            raise HTTPException(500, "File upload failed")
+    def _save(self, contents: bytes, file_path: str, content_type: str) -> str:
+        """Save bytes to the configured backend and return the public URL"""
+        return self.driver.save(contents, file_path, content_type)
+
 
 
     async def upload_voice_note(self, file: UploadFile) -> str:
-        """Upload voice note"""
-        if file.content_type not in ['audio/mpeg', 'audio/mp3', 'audio/wav']:
+        """Upload voice note (streamed, size-limited)"""
+        if file.content_type not in VOICE_CONTENT_TYPES:
             raise HTTPException(400, "Invalid audio type")
 
-        contents = await file.read()
-        filename = f"{uuid.uuid4()}.mp3"
-        file_path = f"voice/{filename}"
+        ext = self._get_extension(file.content_type) or ".mp3"
+        file_path = f"voice/{uuid.uuid4()}{ext}"
 
-        if self.storage_type == "local":
-            return self._save_local(contents, file_path)
-        elif self.storage_type == "spaces":
-            return self._save_spaces(contents, file_path)
-        elif self.storage_type == "gcs":
-            return self._save_gcs(contents, file_path, "audio/mpeg")
-        else:  # backblaze
-            return self._save_backblaze(contents, file_path, "audio/mpeg")
+        url, _ = await self.upload_stream(
+            file,
+            file_path,
+            file.content_type,
+            settings.MAX_VOICE_NOTE_SIZE_MB * MB
+        )
+        return url
 
 
     async def upload_file(
         self,
-        file_bytes: bytes,
-        filename: str,
-        content_type: str,
-        folder: str = "uploads"
+        file: UploadFile,
+        folder: str = "uploads",
+        max_size_bytes: Optional[int] = None
     ) -> dict:
         """
-        Generic file upload method
+        Generic file upload method (streamed, size-limited)
 
         Args:
-            file_bytes: File contents as bytes
-            filename: Original filename
-            content_type: MIME type
+            file: Uploaded file
             folder: Destination folder
+            max_size_bytes: Size limit (defaults to MAX_DOCUMENT_SIZE_MB)
 
         Returns:
             Dict with url and metadata
         """
+        filename = file.filename or ""
+        content_type = file.content_type or "application/octet-stream"
+
         # Generate unique filename preserving extension
         ext = os.path.splitext(filename)[1] or self._get_extension(content_type)
         unique_filename = f"{uuid.uuid4()}{ext}"
         file_path = f"{folder}/{unique_filename}"
 
-        # Create folder if local storage
-        if self.storage_type == "local":
-            folder_path = os.path.join(self.base_path, folder)
-            os.makedirs(folder_path, exist_ok=True)
-            url = self._save_local(file_bytes, file_path)
-        elif self.storage_type == "spaces":
-            url = self._save_spaces_generic(file_bytes, file_path, content_type)
-        elif self.storage_type == "gcs":
-            url = self._save_gcs(file_bytes, file_path, content_type)
-        else:  # backblaze
-            url = self._save_backblaze(file_bytes, file_path, content_type)
+        url, size = await self.upload_stream(
+            file,
+            file_path,
+            content_type,
+            max_size_bytes or settings.MAX_DOCUMENT_SIZE_MB * MB
+        )
 
         return {
             "url": url,
             "filename": unique_filename,
             "original_filename": filename,
             "content_type": content_type,
-            "size": len(file_bytes),
+            "size": size,
             "folder": folder
         }
 
 
+    # ==================== STREAMING ====================
+
+    async def _iter_chunks(self, file: UploadFile, max_bytes: int) -> AsyncIterator[bytes]:
+        """Yield upload chunks, failing as soon as the size limit is crossed"""
+        async def read_file():
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        async for chunk in self._limit_chunks(read_file(), max_bytes):
+            yield chunk
+
+
+    async def _limit_chunks(self, source: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+        """Pass chunks through, raising once more than max_bytes have been seen"""
+        received = 0
+        async for chunk in source:
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(400, f"File size exceeds {max_bytes // MB}MB limit")
+            yield chunk
+
+
+    async def _read_limited(self, file: UploadFile, max_bytes: int) -> bytes:
+        """Read a small upload (e.g. an image to resize) with an incremental size check"""
+        buffer = bytearray()
+        async for chunk in self._iter_chunks(file, max_bytes):
+            buffer += chunk
+        return bytes(buffer)
+
+
+    async def upload_stream(
+        self,
+        file: UploadFile,
+        file_path: str,
+        content_type: str,
+        max_bytes: int
+    ) -> Tuple[str, int]:
+        """
+        Pipe an upload to storage chunk by chunk
+
+        Local files are written to disk as they arrive, Spaces/B2 use S3
+        multipart uploads and GCS a resumable upload, so memory per upload
+        stays at one part regardless of file size. Nothing is left behind if
+        the size limit is crossed or the transfer fails.
+
+        Returns:
+            Tuple of (public URL, size in bytes)
+        """
+        chunks = self._iter_chunks(file, max_bytes)
+        size = await self.driver.stream(chunks, file_path, content_type)
+
+        return self._public_url(file_path), size
+
+
+    # ==================== DIRECT UPLOADS ====================
+
+    def presign_upload(
+        self,
+        file_path: str,
+        content_type: str,
+        max_bytes: int,
+        expires_in: int
+    ) -> Dict[str, Any]:
+        """
+        Upload target the client can send the file to directly
+
+        - spaces: presigned POST (size limit enforced by the policy)
+        - backblaze: presigned PUT (B2 has no POST uploads; size checked on finalize)
+        - gcs: V4 signed PUT with an x-goog-content-length-range header
+        - local: PUT to the API's stand-in endpoint (path filled in by the route)
+
+        Returns:
+            Dict with method, url, fields (form fields for POST) and headers
+        """
+        return self.driver.presign(file_path, content_type, max_bytes, expires_in)
+
+
+    async def receive_local_upload(
+        self,
+        source: AsyncIterator[bytes],
+        file_path: str,
+        max_bytes: int
+    ) -> int:
+        """Stand-in for a presigned PUT in local mode: stream a request body to disk"""
+        return await self.driver.stream(self._limit_chunks(source, max_bytes), file_path, "")
+
+
+    def object_size(self, file_path: str) -> Optional[int]:
+        """Size of a stored object in bytes, or None if it doesn't exist"""
+        try:
+            return self.driver.size(file_path)
+        except Exception:
+            return None
+
+
+    def read_object(self, file_path: str) -> bytes:
+        """Read a stored object (used for small objects such as images to resize)"""
+        return self.driver.read(file_path)
+
+
+    def public_url(self, file_path: str) -> str:
+        """Public URL for a stored object"""
+        return self._public_url(file_path)
+
+
+    def delete_object(self, file_path: str) -> bool:
+        """Remove an object by key, bypassing reference counting"""
+        return self._delete_object(file_path)
+
+
     def _get_extension(self, content_type: str) -> str:
         """Get file extension from content type"""
         extensions = {
@@ -288,6 +406,11 @@ class StorageService:
             "image/webp": ".webp",
             "image/gif": ".gif",
             "audio/mpeg": ".mp3",
+            "audio/mp3": ".mp3",
+            "audio/mp4": ".m4a",
+            "audio/x-m4a": ".m4a",
+            "audio/aac": ".aac",
+            "audio/flac": ".flac",
             "audio/wav": ".wav",
             "audio/ogg": ".ogg",
             "audio/webm": ".webm",
@@ -300,77 +423,52 @@ class StorageService:
         return extensions.get(content_type, "")
 
 
-    def _save_spaces_generic(self, contents: bytes, file_path: str, content_type: str) -> str:
-        """Save any file to DO Spaces with correct content type"""
-        try:
-            self.s3_client.put_object(
-                Bucket=self.bucket,
-                Key=file_path,
-                Body=contents,
-                ACL='public-read',
-                ContentType=content_type,
-                CacheControl='max-age=31536000'
-            )
-
-            # Return CDN URL
-            cdn_url = settings.SPACES_CDN_URL or settings.SPACES_ENDPOINT
-            return f"{cdn_url}/{file_path}"
+    def delete_file(self, file_url: str) -> bool:
+        """
+        Delete file from storage
 
-        except Exception as e:
-            logger.error(f"DO Spaces upload failed: {e}")
-            raise HTTPException(500, "File upload failed")
-    
-    
-    def delete_file(self, file_url: str):
-        """Delete file from storage"""
-        if self.storage_type == "local":
-            # Extract path from URL
-            file_path = file_url.replace("/uploads/", "")
-            full_path = os.path.join(self.base_path, file_path)
-            
-            if os.path.exists(full_path):
-                os.remove(full_path)
-        
-        elif self.storage_type == "spaces":
-            # Extract key from URL
-            key = file_url.split('/')[-2:]  # Get last 2 parts (folder/filename)
-            key = '/'.join(key)
-            
-            self.s3_client.delete_object(
-                Bucket=self.bucket,
-                Key=key
-            )
-            
-        elif self.storage_type == "gcs":
-            # Extract key from URL
-            # URL format: https://storage.googleapis.com/bucket-name/folder/filename
-            try:
-                # Simple extraction assuming standard GCS URL structure
-                parts = file_url.split('/')
-                # Find where the bucket name is, the rest is the blob name
-                # This is a bit brittle, better to store the path or use a robust parser
-                # Assuming folder/filename is at the end
-                blob_name = '/'.join(parts[-2:])
-
-                blob = self.bucket.blob(blob_name)
-                blob.delete()
-            except Exception as e:
-                logger.warning(f"Failed to delete GCS file {file_url}: {e}")
-
-        elif self.storage_type == "backblaze":
-            # Extract key from URL
-            # URL format: https://{bucket}.s3.{region}.backblazeb2.com/{folder}/{filename}
-            try:
-                parts = file_url.split('/')
-                # Get last 2 parts (folder/filename)
-                key = '/'.join(parts[-2:])
-
-                self.b2_client.delete_object(
-                    Bucket=self.b2_bucket,
-                    Key=key
-                )
-            except Exception as e:
-                logger.warning(f"Failed to delete Backblaze file {file_url}: {e}")
+        Content-addressed objects are reference counted: the object is only
+        removed when its last reference goes. Objects whose count is unknown
+        (e.g. Redis was flushed) are kept rather than risk breaking a listing.
+
+        Returns:
+            True if the reference was released, False if the file was not found
+        """
+        file_path = self._key_from_url(file_url)
+
+        if CONTENT_ADDRESSED_NAME.match(os.path.basename(file_path)):
+            with self._ref_lock(file_path):
+                remaining = self._change_refs(file_path, -1)
+                if remaining is None or remaining > 0:
+                    return True
+
+                _redis().hdel(REF_COUNTS_KEY, file_path)
+                if remaining < 0:
+                    return True  # Count was unknown: keep the object
+                return self._delete_object(file_path)
+
+        return self._delete_object(file_path)
+
+
+    def _key_from_url(self, file_url: str) -> str:
+        """Object key (folder/filename) from a URL returned by this service"""
+        return self.driver.key_from_url(file_url)
+
+
+    def _delete_object(self, file_path: str) -> bool:
+        """Remove an object from the backend"""
+        return self.driver.delete(file_path)
+
+
+
+    def delete_image_variants(self, variants: Dict[str, Dict[str, str]]):
+        """Delete every stored variant of an image"""
+        for urls in variants.values():
+            for url in urls.values():
+                try:
+                    self.delete_file(url)
+                except Exception as e:
+                    logger.warning(f"Failed to delete image variant {url}: {e}")
 
 
 # Singleton instance
@@ -10,6 +10,8 @@ import logging
 
 from models import User, UserType, AccountStatus, Order, OrderStatus, Product, ProductStatus
 from database import get_redis
+from modules.products.service import seller_card_cache
+from utils.response_cache import response_cache
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -233,4 +235,8 @@ class UserService:
         db.commit()
         db.refresh(user)
 
+        # Seller block on product detail is cached in-process and in Redis
+        seller_card_cache.invalidate(user.id)
+        response_cache.invalidate_tags([f"seller:{user.id}"])
+
         return user
@@ -0,0 +1,80 @@
+"""
+Shared fixtures
+Database tests run against the Postgres named by TEST_DATABASE_URL (they are
+skipped without it); each test runs in a transaction that is rolled back.
+Redis tests use an in-memory fakeredis server (with Lua scripting).
+"""
+import os
+from decimal import Decimal
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import database
+from models import Base, User, UserType, Product, ProductCategory, UnitOfMeasure, Cart, CartItem
+
+
+@pytest.fixture(scope="session")
+def engine():
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[User.__table__, Product.__table__, Cart.__table__, CartItem.__table__])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """Fresh fake Redis behind database.get_redis()"""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(database, "redis_client", client)
+    yield client
+    client.flushall()
+
+
+@pytest.fixture
+def seller(db):
+    user = User(
+        phone_number="0240000001",
+        password_hash="x",
+        full_name="Test Farmer",
+        user_type=UserType.FARMER
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+@pytest.fixture
+def make_product(db):
+    """Factory for AVAILABLE products with the given stock"""
+    def make(seller, quantity):
+        product = Product(
+            seller_id=seller.id,
+            product_name="Tomatoes",
+            category=ProductCategory.VEGETABLES,
+            quantity_available=Decimal(quantity),
+            unit_of_measure=UnitOfMeasure.KG,
+            price_per_unit=Decimal("12.50")
+        )
+        db.add(product)
+        db.flush()
+        return product
+    return make
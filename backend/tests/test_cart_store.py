@@ -0,0 +1,213 @@
+"""
+Redis cart store: Lua scripts, expiry and Postgres snapshots
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from models import Cart, CartItem, User, UserType
+from modules.cart.service import CartService, DifferentFarmerError
+from modules.cart.store import CartStore, CartStoreError, CART_KEY, DIRTY_KEY
+
+BUYER = 1
+FARMER = 2
+OTHER_FARMER = 3
+
+
+@pytest.fixture
+def store(redis):
+    return CartStore(ttl_hours=8, snapshot_batch_size=2)
+
+
+def add(store, product_id=10, quantity="2", farmer_id=FARMER, available="10", cart_id=100, buyer_id=BUYER):
+    return store.add_item(
+        buyer_id=buyer_id,
+        farmer_id=farmer_id,
+        product_id=product_id,
+        quantity=Decimal(quantity),
+        unit_price=Decimal("4.50"),
+        quantity_available=Decimal(available),
+        cart_id=cart_id
+    )
+
+
+def test_first_add_needs_a_cart_id(store, redis):
+    with pytest.raises(CartStoreError) as error:
+        add(store, cart_id=None)
+
+    assert error.value.code == "new_cart"
+    assert not redis.exists(CART_KEY.format(buyer_id=BUYER))
+
+
+def test_add_creates_cart_and_accumulates_quantity(store, redis):
+    add(store, quantity="2")
+    cart = add(store, quantity="1.5", cart_id=None)
+
+    assert cart.id == 100
+    assert cart.farmer_id == FARMER
+    assert [(item.id, item.quantity) for item in cart.items] == [(10, Decimal("3.50"))]
+    assert cart.items[0].unit_price_snapshot == Decimal("4.50")
+    assert redis.sismember(DIRTY_KEY, str(BUYER))
+
+
+def test_single_farmer_rule(store):
+    add(store)
+
+    with pytest.raises(CartStoreError) as error:
+        add(store, product_id=11, farmer_id=OTHER_FARMER)
+
+    assert error.value.code == "different_farmer"
+    assert [item.product_id for item in store.get(BUYER).items] == [10]
+
+
+def test_add_beyond_stock_is_rejected_with_current_quantity(store):
+    add(store, quantity="8")
+
+    with pytest.raises(CartStoreError) as error:
+        add(store, quantity="3")
+
+    assert error.value.code == "insufficient"
+    assert error.value.current == Decimal("8")
+    assert store.get(BUYER).items[0].quantity == Decimal("8.00")
+
+
+def test_rejected_first_add_leaves_no_cart(store, redis):
+    with pytest.raises(CartStoreError):
+        add(store, quantity="20")
+
+    assert not redis.exists(CART_KEY.format(buyer_id=BUYER))
+
+
+def test_set_quantity_replaces_quantity(store):
+    add(store, quantity="2")
+
+    cart = store.set_quantity(BUYER, 10, Decimal("7"))
+
+    assert cart.items[0].quantity == Decimal("7.00")
+
+
+def test_set_quantity_unknown_line_or_cart(store):
+    with pytest.raises(CartStoreError) as error:
+        store.set_quantity(BUYER, 10, Decimal("1"))
+    assert error.value.code == "no_cart"
+
+    add(store)
+    with pytest.raises(CartStoreError) as error:
+        store.set_quantity(BUYER, 99, Decimal("1"))
+    assert error.value.code == "no_item"
+
+
+def test_changes_refresh_ttl(store, redis):
+    key = CART_KEY.format(buyer_id=BUYER)
+    add(store)
+    redis.expire(key, 60)
+
+    cart = store.set_quantity(BUYER, 10, Decimal("3"))
+
+    assert redis.ttl(key) > 60
+    assert cart.expires_at > datetime.utcnow() + timedelta(hours=7)
+
+
+def test_removing_last_line_deletes_cart(store, redis):
+    add(store, product_id=10)
+    add(store, product_id=11, cart_id=None)
+
+    remaining = store.remove_item(BUYER, 10)
+    assert [item.product_id for item in remaining.items] == [11]
+
+    assert store.remove_item(BUYER, 11) is None
+    assert not redis.exists(CART_KEY.format(buyer_id=BUYER))
+
+
+def test_checkout_claim_hides_cart_until_released(store):
+    add(store)
+
+    claimed = store.claim_for_checkout(BUYER)
+    assert claimed.id == 100
+    assert store.get(BUYER) is None
+
+    with pytest.raises(CartStoreError) as error:
+        store.claim_for_checkout(BUYER)
+    assert error.value.code == "in_progress"
+
+    store.release_checkout(BUYER)
+    assert store.get(BUYER).id == 100
+
+
+# ==================== POSTGRES SNAPSHOTS ====================
+
+@pytest.fixture
+def people(db):
+    users = [
+        User(phone_number=f"02400000{i}", password_hash="x", full_name=f"User {i}", user_type=user_type)
+        for i, user_type in enumerate([UserType.BUYER, UserType.FARMER, UserType.FARMER])
+    ]
+    db.add_all(users)
+    db.flush()
+    return users
+
+
+@pytest.fixture
+def products(people, make_product):
+    return [make_product(people[1], "10") for _ in range(2)]
+
+
+def test_snapshot_round_trip(db, store, people, products):
+    buyer, farmer, _ = people
+    cart_id = store.allocate_cart_id(db)
+    store.add_item(buyer.id, farmer.id, products[0].id, Decimal("2"), Decimal("4.50"), Decimal("10"), cart_id)
+    store.add_item(buyer.id, farmer.id, products[1].id, Decimal("1"), Decimal("4.50"), Decimal("10"))
+
+    assert store.snapshot(db) == 1
+
+    row = db.get(Cart, cart_id)
+    assert row.status == "ACTIVE" and row.buyer_id == buyer.id
+    items = db.query(CartItem).filter(CartItem.cart_id == cart_id).order_by(CartItem.product_id).all()
+    assert [(item.product_id, item.quantity) for item in items] == [
+        (products[0].id, Decimal("2.00")), (products[1].id, Decimal("1.00"))
+    ]
+
+    # Emptying the cart closes the row on the next snapshot
+    store.clear(buyer.id)
+    store.snapshot(db)
+    db.refresh(row)
+    assert row.status == "ABANDONED"
+
+
+def test_write_carts_never_reopens_checked_out_rows(db, store, people, products):
+    buyer, farmer, _ = people
+    cart_id = store.allocate_cart_id(db)
+    cart = store.add_item(buyer.id, farmer.id, products[0].id, Decimal("2"), Decimal("4.50"), Decimal("10"), cart_id)
+
+    store.write_carts(db, [cart], status="CHECKED_OUT")
+    store.write_carts(db, [cart])
+
+    assert db.get(Cart, cart_id, populate_existing=True).status == "CHECKED_OUT"
+
+
+def test_restore_loads_postgres_cart_once(db, store, people, products):
+    buyer, farmer, _ = people
+    now = datetime.utcnow()
+    row = Cart(buyer_id=buyer.id, farmer_id=farmer.id, status="ACTIVE", expires_at=now + timedelta(hours=2))
+    row.items = [CartItem(product_id=products[0].id, quantity=Decimal("3"), unit_price_snapshot=Decimal("4.50"))]
+    db.add(row)
+    db.flush()
+
+    assert store.restore([row]) == 1
+    assert store.restore([row]) == 0
+
+    cart = store.get(buyer.id)
+    assert cart.id == row.id
+    assert [(item.product_id, item.quantity) for item in cart.items] == [(products[0].id, Decimal("3.00"))]
+
+
+def test_service_rejects_second_farmer(db, redis, people, make_product):
+    buyer, farmer, other_farmer = people
+    first = make_product(farmer, "10")
+    second = make_product(other_farmer, "10")
+
+    CartService.add_to_cart(buyer.id, first.id, Decimal("1"), db)
+
+    with pytest.raises(DifferentFarmerError):
+        CartService.add_to_cart(buyer.id, second.id, Decimal("1"), db)
@@ -0,0 +1,15 @@
+"""
+Planner row estimates against Postgres
+"""
+from models import Product, ProductStatus
+from modules.products.service import estimate_count, apply_product_filters
+from modules.products.schemas import ProductFilterRequest
+
+
+def test_estimate_binds_search_text_and_enums(db):
+    query, _ = apply_product_filters(
+        db.query(Product).filter(Product.status != ProductStatus.DELETED),
+        ProductFilterRequest(search="farmer's tomatoes")
+    )
+
+    assert estimate_count(db, query) >= 0
@@ -0,0 +1,109 @@
+"""
+Paystack client retry and idempotency rules, against httpx.MockTransport
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from config import settings
+from integrations.paystack import PaystackClient
+
+OK_BODIES = {
+    "/transaction/verify/ref-1": {"status": True, "data": {
+        "status": "success", "amount": 15000, "reference": "ref-1", "metadata": {}
+    }},
+    "/transferrecipient": {"status": True, "data": {"recipient_code": "RCP_1"}},
+    "/transaction/initialize": {"status": True, "data": {
+        "authorization_url": "https://checkout", "access_code": "AC_1", "reference": "ref-1"
+    }},
+    "/transfer": {"status": True, "data": {"transfer_code": "TRF_1", "reference": "TRF-1", "status": "pending"}},
+    "/refund": {"status": True, "data": {"id": 1, "status": "pending", "amount": 15000}},
+}
+
+CALLS = {
+    "verify": lambda client: client.verify_transaction("ref-1"),
+    "create_recipient": lambda client: client.create_transfer_recipient("Ama Mensah", "0241234567", "MTN"),
+    "initialize": lambda client: client.initialize_transaction("buyer@example.com", 150.0, "ref-1"),
+    "transfer": lambda client: client.initiate_transfer(150.0, "RCP_1", "Payout", "TRF-1"),
+    "refund": lambda client: client.refund_transaction("ref-1"),
+}
+IDEMPOTENT = ["verify", "create_recipient"]
+NOT_RESENT = ["initialize", "transfer", "refund"]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "PAYSTACK_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "PAYSTACK_MAX_RETRIES", 2)
+
+
+def run(call, failures):
+    """
+    Make one client call against a transport that fails the first
+    len(failures) requests (an exception to raise or a status to return)
+
+    Returns:
+        (call result, number of requests that reached the transport)
+    """
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) <= len(failures):
+            failure = failures[len(requests) - 1]
+            if isinstance(failure, int):
+                return httpx.Response(failure, json={"status": False, "message": "Try again"})
+            raise failure("simulated", request=request)
+        return httpx.Response(200, json=OK_BODIES[request.url.path])
+
+    async def go():
+        client = PaystackClient(transport=httpx.MockTransport(handler))
+        try:
+            return await call(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(go()), len(requests)
+
+
+@pytest.mark.parametrize("name", list(CALLS))
+@pytest.mark.parametrize("error", [httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout])
+def test_unsent_requests_always_retry(name, error):
+    result, attempts = run(CALLS[name], [error])
+
+    assert result["success"] is True
+    assert attempts == 2
+
+
+@pytest.mark.parametrize("name", IDEMPOTENT)
+@pytest.mark.parametrize("failure", [429, 500, 502, 503, 504, httpx.ReadTimeout])
+def test_idempotent_calls_retry_after_delivery(name, failure):
+    result, attempts = run(CALLS[name], [failure, failure])
+
+    assert result["success"] is True
+    assert attempts == 3
+
+
+@pytest.mark.parametrize("name", IDEMPOTENT)
+def test_idempotent_calls_give_up_after_max_retries(name):
+    result, attempts = run(CALLS[name], [503, 503, 503])
+
+    assert result["success"] is False
+    assert attempts == settings.PAYSTACK_MAX_RETRIES + 1
+
+
+@pytest.mark.parametrize("name", NOT_RESENT)
+@pytest.mark.parametrize("failure", [429, 500, 503, httpx.ReadTimeout, httpx.RemoteProtocolError])
+def test_money_moving_calls_are_never_resent(name, failure):
+    result, attempts = run(CALLS[name], [failure])
+
+    assert result["success"] is False
+    assert attempts == 1
+
+
+def test_client_errors_are_not_retried():
+    result, attempts = run(CALLS["verify"], [400])
+
+    assert result["success"] is False
+    assert attempts == 1
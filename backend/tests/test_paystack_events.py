@@ -0,0 +1,169 @@
+"""
+Paystack webhook event stream: delivery, retries, dead letters and reclaim
+"""
+import asyncio
+import json
+
+import pytest
+
+from integrations.paystack_events import (
+    PaystackEventQueue, STREAM_KEY, DEAD_LETTER_KEY, GROUP, DONE_KEY, idempotency_key
+)
+
+
+def event(reference="ref-1", name="charge.success"):
+    return {"event": name, "data": {"reference": reference, "amount": 15000}}
+
+
+class Handler:
+    """Records payloads; fails the first `failures` calls"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.payloads = []
+
+    async def __call__(self, payload):
+        self.payloads.append(payload)
+        if len(self.payloads) <= self.failures:
+            raise RuntimeError("handler failed")
+
+
+def make_queue(handler, max_deliveries=3, claim_idle_ms=60000):
+    queue = PaystackEventQueue(
+        batch_size=10, block_ms=1, claim_idle_ms=claim_idle_ms,
+        max_deliveries=max_deliveries, maxlen=1000, handler=handler
+    )
+    queue.ensure_group()
+    return queue
+
+
+def append(queue, payload):
+    return queue.append(json.dumps(payload).encode())
+
+
+def pending_count(redis):
+    return redis.xpending(STREAM_KEY, GROUP)["pending"]
+
+
+def test_append_only_queues_the_body(redis):
+    queue = PaystackEventQueue(batch_size=10, block_ms=1, claim_idle_ms=0, max_deliveries=3, maxlen=1000)
+
+    entry_id = append(queue, event())
+
+    [(stored_id, fields)] = redis.xrange(STREAM_KEY)
+    assert stored_id == entry_id
+    assert json.loads(fields["body"]) == event()
+    assert float(fields["received_at"]) > 0
+
+
+def test_delivered_event_is_handled_and_acked(redis):
+    handler = Handler()
+    queue = make_queue(handler)
+    append(queue, event())
+
+    assert asyncio.run(queue.poll()) == 1
+
+    assert handler.payloads == [event()]
+    assert pending_count(redis) == 0
+    assert redis.exists(DONE_KEY.format(key=idempotency_key(event())))
+
+
+def test_replayed_event_is_acked_without_handling(redis):
+    handler = Handler()
+    queue = make_queue(handler)
+    append(queue, event())
+    append(queue, event())  # Paystack retry of the same notification
+
+    asyncio.run(queue.poll())
+
+    assert len(handler.payloads) == 1
+    assert pending_count(redis) == 0
+
+
+def test_failed_event_is_retried_then_dead_lettered(redis):
+    handler = Handler(failures=99)
+    queue = make_queue(handler, max_deliveries=3, claim_idle_ms=0)
+    append(queue, event())
+
+    asyncio.run(queue.poll())  # First delivery fails and stays pending
+    assert pending_count(redis) == 1
+    assert redis.xlen(DEAD_LETTER_KEY) == 0
+
+    asyncio.run(queue.poll())  # Second delivery (reclaimed) fails
+    assert pending_count(redis) == 1
+
+    asyncio.run(queue.poll())  # Third delivery hits max_deliveries
+    assert len(handler.payloads) == 3
+    assert pending_count(redis) == 0
+    [(_, dead)] = redis.xrange(DEAD_LETTER_KEY)
+    assert json.loads(dead["body"]) == event()
+    assert dead["error"] == "handler failed"
+
+
+def test_event_that_recovers_on_retry_is_acked(redis):
+    handler = Handler(failures=1)
+    queue = make_queue(handler, claim_idle_ms=0)
+    append(queue, event())
+
+    asyncio.run(queue.poll())
+    asyncio.run(queue.poll())
+
+    assert len(handler.payloads) == 2
+    assert pending_count(redis) == 0
+    assert redis.xlen(DEAD_LETTER_KEY) == 0
+
+
+def test_pending_event_is_reclaimed_from_dead_consumer(redis):
+    handler = Handler()
+    queue = make_queue(handler, claim_idle_ms=0)
+    append(queue, event())
+
+    # Another worker read the entry and died before acknowledging it
+    redis.xreadgroup(GROUP, "dead-worker", {STREAM_KEY: ">"}, count=10)
+    assert redis.xpending_range(STREAM_KEY, GROUP, "-", "+", 10)[0]["consumer"] == "dead-worker"
+
+    assert asyncio.run(queue.poll()) == 1
+
+    assert handler.payloads == [event()]
+    assert pending_count(redis) == 0
+
+
+def test_fresh_pending_event_is_left_to_its_consumer(redis):
+    handler = Handler()
+    queue = make_queue(handler, claim_idle_ms=60000)
+    append(queue, event())
+    redis.xreadgroup(GROUP, "busy-worker", {STREAM_KEY: ">"}, count=10)
+
+    assert asyncio.run(queue.poll()) == 0
+
+    assert handler.payloads == []
+    assert pending_count(redis) == 1
+
+
+def test_worker_creates_group_once_redis_is_reachable(redis, monkeypatch):
+    handler = Handler()
+    queue = PaystackEventQueue(batch_size=10, block_ms=1, claim_idle_ms=0, max_deliveries=3, maxlen=1000, handler=handler)
+    append(queue, event())
+
+    attempts = []
+    ensure_group = queue.ensure_group
+
+    def flaky_ensure_group():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("Redis unavailable")
+        ensure_group()
+
+    monkeypatch.setattr(queue, "ensure_group", flaky_ensure_group)
+    monkeypatch.setattr(queue._stopping, "wait", lambda timeout: None)
+
+    async def poll_then_stop():
+        await PaystackEventQueue.poll(queue)
+        queue._stopping.set()
+
+    monkeypatch.setattr(queue, "poll", poll_then_stop)
+
+    asyncio.run(queue.run())
+
+    assert len(attempts) == 2
+    assert handler.payloads == [event()]
@@ -0,0 +1,47 @@
+"""
+Stock decrement statement against Postgres
+"""
+from decimal import Decimal
+
+import pytest
+
+from models import ProductStatus
+from modules.products.service import ProductService, StockUnavailableError, stock_decrement_statement
+
+
+def test_partial_decrement_keeps_product_available(db, seller, make_product):
+    product = make_product(seller, "10")
+
+    db.execute(stock_decrement_statement({product.id: Decimal("4")}))
+    db.refresh(product)
+
+    assert product.quantity_available == Decimal("6")
+    assert product.status == ProductStatus.AVAILABLE
+
+
+def test_decrement_to_zero_marks_out_of_stock(db, seller, make_product):
+    product = make_product(seller, "5")
+
+    db.execute(stock_decrement_statement({product.id: Decimal("5")}, record_sale=True))
+    db.refresh(product)
+
+    assert product.quantity_available == Decimal("0")
+    assert product.status == ProductStatus.OUT_OF_STOCK
+    assert product.total_sold == Decimal("5")
+
+
+def test_reserve_stock_updates_every_product(db, seller, make_product):
+    first = make_product(seller, "3")
+    second = make_product(seller, "8")
+
+    rows = ProductService.reserve_stock(db, {first.id: Decimal("3"), second.id: Decimal("2")})
+
+    statuses = {row.id: row.status for row in rows}
+    assert statuses == {first.id: ProductStatus.OUT_OF_STOCK, second.id: ProductStatus.AVAILABLE}
+
+
+def test_reserve_stock_rejects_shortfall(db, seller, make_product):
+    product = make_product(seller, "2")
+
+    with pytest.raises(StockUnavailableError):
+        ProductService.reserve_stock(db, {product.id: Decimal("3")})
@@ -4,8 +4,9 @@ Background jobs using APScheduler
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, timedelta
 from database import SessionLocal
-from models import EscrowTransaction, EscrowStatus, OTPVerification
+from models import OTPVerification
 from config import settings
+import asyncio
 import logging
 import httpx
 
@@ -14,37 +15,40 @@ logger = logging.getLogger(__name__)
 scheduler = BackgroundScheduler()
 
 
+async def release_due_escrows():
+    """
+    Run the escrow release engine on the calling thread's own event loop
+
+    The engine's database work is synchronous, so it stays in the scheduler
+    thread instead of the app's event loop; Paystack calls use a pool opened
+    for this loop and closed when the run ends.
+    """
+    from integrations.paystack import paystack_client
+    from modules.escrow.auto_release import escrow_release_engine
+
+    try:
+        return await escrow_release_engine.run()
+    finally:
+        await paystack_client.close()
+
+
 def auto_release_escrow():
     """
     Auto-release escrow funds after expiry
-    Runs every 6 hours
+    Runs every AUTO_RELEASE_JOB_INTERVAL_HOURS
     """
     logger.info("Running auto-release escrow job...")
-    
-    db = SessionLocal()
+
     try:
-        # Find escrows eligible for auto-release
-        pending_escrows = db.query(EscrowTransaction).filter(
-            EscrowTransaction.status == EscrowStatus.HELD,
-            EscrowTransaction.auto_release_date <= datetime.utcnow()
-        ).all()
-        
-        for escrow in pending_escrows:
-            logger.info(f"Auto-releasing escrow {escrow.id}")
-            
-            # Import here to avoid circular import
-            from modules.escrow.service import release_escrow_to_seller
-            
-            try:
-                release_escrow_to_seller(escrow.id, db, auto_release=True)
-                logger.info(f"✅ Escrow {escrow.id} auto-released")
-            except Exception as e:
-                logger.error(f"Failed to auto-release escrow {escrow.id}: {e}")
-        
-        logger.info(f"Auto-release job complete. Processed {len(pending_escrows)} escrows")
-    
-    finally:
-        db.close()
+        stats = asyncio.run(release_due_escrows())
+
+        logger.info(
+            f"✅ Auto-release job complete. Released {stats['released']}/{stats['claimed']} escrows "
+            f"in {stats['seconds']}s ({stats['per_second']}/s, {stats['mode']})"
+        )
+
+    except Exception as e:
+        logger.error(f"Auto-release job failed: {e}", exc_info=True)
 
 
 def cleanup_expired_otps():
@@ -71,8 +75,8 @@ def cleanup_expired_otps():
 
 def expire_old_carts():
     """
-    Expire shopping carts that have passed their expiration time
-    Runs every hour
+    Expire shopping cart rows that have passed their expiration time
+    Runs every CART_EXPIRY_SWEEP_SECONDS
     """
     logger.info("Running cart expiration job...")
 
@@ -87,12 +91,55 @@ def expire_old_carts():
             logger.debug("No carts to expire")
 
     except Exception as e:
+        db.rollback()
         logger.error(f"Cart expiration job failed: {e}")
 
     finally:
         db.close()
 
 
+def snapshot_carts():
+    """
+    Write Redis carts changed since the last run to Postgres
+    Runs every CART_SNAPSHOT_SECONDS
+    """
+    db = SessionLocal()
+    try:
+        from modules.cart.store import cart_store
+        written = cart_store.snapshot(db)
+
+        if written > 0:
+            logger.info(f"✅ Snapshotted carts for {written} buyers")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Cart snapshot failed: {e}")
+
+    finally:
+        db.close()
+
+
+def flush_product_views():
+    """
+    Flush Redis-buffered product view counts to Postgres
+    Runs every VIEW_COUNT_FLUSH_SECONDS
+    """
+    db = SessionLocal()
+    try:
+        from utils.view_counter import view_counter
+        flushed = view_counter.flush(db)
+
+        if flushed > 0:
+            logger.info(f"✅ Flushed view counts for {flushed} products")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"View count flush failed: {e}")
+
+    finally:
+        db.close()
+
+
 def keep_alive_ping():
     """
     Ping backend and frontend to prevent cold starts on free tier hosting.
@@ -129,12 +176,14 @@ def keep_alive_ping():
 def start_scheduler():
     """Start background jobs scheduler"""
 
-    # Auto-release escrow (every 6 hours)
+    # Auto-release escrow (every 6 hours by default)
     scheduler.add_job(
         auto_release_escrow,
         'interval',
-        hours=6,
+        hours=settings.AUTO_RELEASE_JOB_INTERVAL_HOURS,
         id='auto_release_escrow',
+        max_instances=1,
+        coalesce=True,
         replace_existing=True
     )
 
@@ -147,12 +196,36 @@ def start_scheduler():
         replace_existing=True
     )
 
-    # Expire old shopping carts (every 6 hours)
+    # Expire old shopping carts (every minute by default)
     scheduler.add_job(
         expire_old_carts,
         'interval',
-        hours=6,
+        seconds=settings.CART_EXPIRY_SWEEP_SECONDS,
         id='expire_carts',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+
+    # Snapshot Redis carts to Postgres (every minute by default)
+    scheduler.add_job(
+        snapshot_carts,
+        'interval',
+        seconds=settings.CART_SNAPSHOT_SECONDS,
+        id='snapshot_carts',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+
+    # Flush buffered product view counts (every minute by default)
+    scheduler.add_job(
+        flush_product_views,
+        'interval',
+        seconds=settings.VIEW_COUNT_FLUSH_SECONDS,
+        id='flush_product_views',
+        max_instances=1,
+        coalesce=True,
         replace_existing=True
     )
 
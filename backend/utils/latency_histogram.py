@@ -0,0 +1,102 @@
+"""
+Latency histograms kept in Redis
+Observations are bucketed per label with HINCRBY, so every worker process
+feeds the same histogram and the admin metrics endpoints can read it back
+"""
+from typing import Any, Dict, Optional, Sequence
+import bisect
+import logging
+
+from database import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; slower observations land in "inf"
+DEFAULT_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Bucketed latency counts per label in one Redis hash"""
+
+    def __init__(self, key: str, buckets_ms: Sequence[int] = DEFAULT_BUCKETS_MS):
+        self.key = key
+        self.buckets_ms = tuple(buckets_ms)
+        self.bucket_names = [str(bound) for bound in self.buckets_ms] + ["inf"]
+
+    @staticmethod
+    def _redis():
+        try:
+            return get_redis()
+        except RuntimeError:
+            return None
+
+    def observe(self, label: str, seconds: float, error: bool = False) -> None:
+        """Record one call (never raises)"""
+        client = self._redis()
+        if client is None:
+            return
+        elapsed_ms = seconds * 1000
+        bucket = self.bucket_names[bisect.bisect_left(self.buckets_ms, elapsed_ms)]
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(self.key, f"{label}:le_{bucket}", 1)
+            pipe.hincrby(self.key, f"{label}:count", 1)
+            pipe.hincrbyfloat(self.key, f"{label}:sum_ms", round(elapsed_ms, 3))
+            if error:
+                pipe.hincrby(self.key, f"{label}:errors", 1)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Latency histogram update failed for {label}: {e}")
+
+    def _quantile(self, buckets: Dict[str, int], count: int, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the q-quantile"""
+        target = q * count
+        seen = 0
+        for name in self.bucket_names:
+            seen += buckets[name]
+            if seen >= target:
+                return None if name == "inf" else float(name)
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read all labels back
+
+        Returns:
+            label -> count, errors, avg_ms, p50/p95/p99 bucket bounds and the
+            per-bucket counts ("le_<ms>" keys)
+        """
+        client = self._redis()
+        if client is None:
+            return {}
+        try:
+            raw = client.hgetall(self.key)
+        except Exception as e:
+            logger.warning(f"Latency histogram read failed: {e}")
+            return {}
+
+        labels: Dict[str, Dict[str, float]] = {}
+        for field, value in raw.items():
+            label, _, name = field.rpartition(":")
+            labels.setdefault(label, {})[name] = float(value)
+
+        result = {}
+        for label, fields in sorted(labels.items()):
+            count = int(fields.get("count", 0))
+            buckets = {name: int(fields.get(f"le_{name}", 0)) for name in self.bucket_names}
+            result[label] = {
+                "count": count,
+                "errors": int(fields.get("errors", 0)),
+                "avg_ms": round(fields.get("sum_ms", 0) / count, 1) if count else None,
+                "p50_ms": self._quantile(buckets, count, 0.50) if count else None,
+                "p95_ms": self._quantile(buckets, count, 0.95) if count else None,
+                "p99_ms": self._quantile(buckets, count, 0.99) if count else None,
+                "buckets": {f"le_{name}": buckets[name] for name in self.bucket_names}
+            }
+        return result
+
+    def reset(self) -> None:
+        """Drop all observations"""
+        client = self._redis()
+        if client is not None:
+            client.delete(self.key)
@@ -0,0 +1,160 @@
+"""
+Redis-backed response cache
+Stores serialized JSON responses keyed by endpoint + normalized parameters,
+with tag sets for targeted invalidation
+"""
+from fastapi.responses import Response
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, Iterable
+import hashlib
+import json
+import logging
+
+from config import settings
+from database import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "resp_cache"
+TAG_PREFIX = "resp_cache_tag"
+STATS_KEY = "resp_cache_stats"
+
+
+class ResponseCache:
+    """JSON response cache with tag-based invalidation"""
+
+    def __init__(self, default_ttl: int):
+        self.default_ttl = default_ttl
+
+    @staticmethod
+    def _redis():
+        """Redis client, or None if caching is disabled/unavailable"""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        try:
+            return get_redis()
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def build_key(namespace: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build a cache key from a namespace and request parameters
+
+        Parameters are normalized (None/empty dropped, keys sorted) so that
+        equivalent requests share an entry.
+        """
+        normalized = {
+            k: v for k, v in sorted((params or {}).items())
+            if v is not None and v != ""
+        }
+        digest = hashlib.sha1(
+            json.dumps(normalized, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{KEY_PREFIX}:{namespace}:{digest}"
+
+    def _count(self, client, namespace: str, outcome: str) -> None:
+        try:
+            client.hincrby(STATS_KEY, f"{namespace}:{outcome}", 1)
+        except Exception:
+            pass
+
+    def get(self, namespace: str, params: Optional[Dict[str, Any]] = None) -> Optional[Response]:
+        """Return the cached response for these parameters, or None on a miss"""
+        client = self._redis()
+        if client is None:
+            return None
+
+        try:
+            body = client.get(self.build_key(namespace, params))
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+        self._count(client, namespace, "hit" if body is not None else "miss")
+        if body is None:
+            return None
+
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    def store(
+        self,
+        namespace: str,
+        params: Optional[Dict[str, Any]],
+        payload: BaseModel,
+        tags: Iterable[str] = (),
+        ttl: Optional[int] = None
+    ) -> Response:
+        """
+        Serialize a response model once, cache it and return it as a Response
+
+        Args:
+            namespace: Endpoint namespace (e.g. "products:list")
+            params: Request parameters used to build the key
+            payload: Response model to serialize
+            tags: Invalidation tags (e.g. "product:12", "category:FRUITS")
+            ttl: Entry lifetime in seconds (defaults to the cache TTL)
+
+        Returns:
+            JSON response carrying the serialized payload
+        """
+        body = payload.model_dump_json()
+        ttl = ttl or self.default_ttl
+
+        client = self._redis()
+        if client is not None:
+            key = self.build_key(namespace, params)
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.set(key, body, ex=ttl)
+                for tag in set(tags):
+                    tag_key = f"{TAG_PREFIX}:{tag}"
+                    pipe.sadd(tag_key, key)
+                    pipe.expire(tag_key, ttl * 2)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Response cache write failed: {e}")
+
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Drop every cached entry registered under any of the given tags
+
+        Returns:
+            Number of cache entries deleted
+        """
+        client = self._redis()
+        if client is None:
+            return 0
+
+        tag_keys = [f"{TAG_PREFIX}:{tag}" for tag in set(tags)]
+        if not tag_keys:
+            return 0
+
+        try:
+            entry_keys = client.sunion(tag_keys)
+            pipe = client.pipeline(transaction=False)
+            if entry_keys:
+                pipe.delete(*entry_keys)
+            pipe.delete(*tag_keys)
+            pipe.hincrby(STATS_KEY, "invalidations", 1)
+            pipe.execute()
+            return len(entry_keys)
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed for {tag_keys}: {e}")
+            return 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss counters per namespace"""
+        client = self._redis()
+        if client is None:
+            return {}
+        try:
+            return {k: int(v) for k, v in client.hgetall(STATS_KEY).items()}
+        except Exception as e:
+            logger.warning(f"Response cache stats read failed: {e}")
+            return {}
+
+
+response_cache = ResponseCache(default_ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
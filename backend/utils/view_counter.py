@@ -0,0 +1,115 @@
+"""
+Buffered product view counter
+Views are aggregated in a Redis hash (HINCRBY per product) and periodically
+flushed to products.view_count in one bulk UPDATE per batch
+"""
+from sqlalchemy import update, values, column, Integer
+from sqlalchemy.orm import Session
+from typing import Dict, List, Tuple
+import logging
+
+from config import settings
+from database import get_redis
+from models import Product
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "product_views:pending"
+FLUSHING_KEY = "product_views:flushing"
+
+
+class ViewCounter:
+    """Redis-buffered view counts with bulk Postgres flushes"""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _redis():
+        try:
+            return get_redis()
+        except RuntimeError:
+            return None
+
+    def record(self, product_id: int) -> None:
+        """Count one view of a product (never touches Postgres)"""
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.hincrby(PENDING_KEY, str(product_id), 1)
+        except Exception as e:
+            logger.warning(f"View count increment failed for product {product_id}: {e}")
+
+    def _claim(self, client) -> Dict[str, str]:
+        """
+        Move pending counts aside for flushing
+
+        RENAME is atomic, so views recorded while a flush runs land in a fresh
+        pending hash. A flushing hash left over from a failed run is retried
+        first instead of being overwritten.
+        """
+        if not client.exists(FLUSHING_KEY):
+            try:
+                client.rename(PENDING_KEY, FLUSHING_KEY)
+            except Exception:
+                # No pending key: nothing was viewed since the last flush
+                return {}
+        return client.hgetall(FLUSHING_KEY)
+
+    def _apply(self, db: Session, batch: List[Tuple[int, int]]) -> None:
+        """Add view deltas with one UPDATE ... FROM (VALUES ...) statement"""
+        deltas = values(
+            column("id", Integer), column("delta", Integer), name="deltas"
+        ).data(batch)
+
+        db.execute(
+            update(Product)
+            .where(Product.id == deltas.c.id)
+            .values(
+                view_count=Product.view_count + deltas.c.delta,
+                updated_at=Product.updated_at  # A view is not an edit; skip the onupdate
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def flush(self, db: Session) -> int:
+        """
+        Write buffered view counts to Postgres
+
+        Rows are updated in ascending id order and in short per-batch
+        transactions, so concurrent flushes and checkouts never deadlock and
+        hold each row lock only briefly.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of products whose view_count was updated
+        """
+        client = self._redis()
+        if client is None:
+            return 0
+
+        counts = self._claim(client)
+        if not counts:
+            return 0
+
+        deltas = sorted(
+            (int(product_id), int(delta))
+            for product_id, delta in counts.items()
+            if int(delta) > 0
+        )
+
+        for start in range(0, len(deltas), self.batch_size):
+            batch = deltas[start:start + self.batch_size]
+            self._apply(db, batch)
+            db.commit()
+            # Drop applied fields so a failure further on does not re-apply them
+            client.hdel(FLUSHING_KEY, *[str(product_id) for product_id, _ in batch])
+
+        client.delete(FLUSHING_KEY)
+        return len(deltas)
+
+
+view_counter = ViewCounter(batch_size=settings.VIEW_COUNT_FLUSH_BATCH_SIZE)